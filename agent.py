@@ -68,6 +68,6 @@ class PigAgent(Agent):
         self.BPm += self.weight_gain * 0.18  # Protein mass adjustment
         self.BLm += self.weight_gain * 0.03  # Lipid mass adjustment
 
-        # If the pig exceeds the sell weight, remove it from the simulation
+        # If the pig exceeds the sell weight, sell it at the end of the model step
         if self.weight >= self.model.sell_weight:
-            self.model.schedule.remove(self)
\ No newline at end of file
+            self.model.sell(self)
\ No newline at end of file
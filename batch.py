@@ -0,0 +1,51 @@
+# batch.py
+
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from eventlog import silenced
+from simulation import run_scenario
+
+
+def make_jobs(scenarios, replicates, base_seed=0):
+    """
+    Build (scenario, seed) jobs with independent seeds for every replicate of every scenario
+    """
+    if isinstance(scenarios, dict):
+        scenarios = [scenarios]
+    children = np.random.SeedSequence(base_seed).spawn(len(scenarios) * replicates)
+    seeds = [int(child.generate_state(1)[0]) for child in children]
+    return [(scenario, seeds[i * replicates + j])
+            for i, scenario in enumerate(scenarios)
+            for j in range(replicates)]
+
+
+def run_job(job):
+    """
+    Run one scenario with its own seed and return a summary of the run
+    """
+    scenario, seed = job
+
+    # Batch runs only need the summary, not the per-day status events
+    with silenced():
+        simulation = run_scenario(scenario, seed)
+
+    return dict({'scenario': scenario, 'seed': seed}, **simulation.summary())
+
+
+def run_batch(jobs, max_workers=None):
+    """
+    Run (scenario, seed) jobs across a process pool
+    Yields each run's summary as soon as it finishes, tagged with the job index
+    """
+    jobs = list(jobs)
+    if max_workers == 1:
+        for index, job in enumerate(jobs):
+            yield dict(run_job(job), job=index)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(run_job, job): index for index, job in enumerate(jobs)}
+        for future in as_completed(futures):
+            yield dict(future.result(), job=futures[future])
@@ -0,0 +1,349 @@
+# benchmark.py
+#
+# Performance benchmarks of the simulation hot paths: python -m benchmark --output baseline.json
+
+import argparse
+import datetime
+import itertools
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+from cache import model_version
+from eventlog import silenced
+from herd import REQUIREMENT_VARIABLES
+from recorder import HerdRecorder
+from simulation import DEFAULT_SCENARIO, create_simulation
+
+BENCHMARK_SEED = 1
+BENCHMARK_SIZES = (100, 10_000, 100_000)
+BENCHMARK_HORIZONS = (10, 35, 140)
+
+# Benchmarked code paths: whole simulation engines, PigAgent methods and the Mesa models
+SIMULATION_ENGINES = ('vectorized', 'deterministic', 'event', 'object')
+AGENT_METHODS = ('agent.feed', 'agent.move')
+MESA_MODELS = ('mesa', 'mesa-batch')
+BENCHMARK_ENGINES = SIMULATION_ENGINES + AGENT_METHODS + MESA_MODELS
+
+# Largest herd of the per-pig Python paths, which take minutes per run beyond it
+MAX_PIGS = {'object': 10_000, 'agent.feed': 10_000, 'agent.move': 10_000, 'mesa': 10_000}
+
+# Seconds per pig-day of a case may grow by this factor before compare reports a regression
+REGRESSION_THRESHOLD = 1.2
+
+
+def pigs_per_region(pigs):
+    """
+    Return the scenario pigs_per_region expected to set up about pigs pigs
+    Every region draws between 0 and its maximum pigs of each of 3 breeds, 7.5 times the maximum on average.
+    """
+    return (max(round(pigs / 7.5), 1),) * 5
+
+
+def case_name(engine, pigs, stochastic, rac, nutrients):
+    """
+    Return the name of a benchmark case, which identifies it across baselines
+    """
+    parts = [engine]
+    if engine in SIMULATION_ENGINES or engine == 'agent.feed':
+        parts += ['stochastic' if stochastic else 'fixed', 'rac' if rac else 'no-rac']
+    if engine in SIMULATION_ENGINES:
+        parts.append('nutrients' if nutrients else 'no-nutrients')
+    return '/'.join(parts + [str(pigs)])
+
+
+def benchmark_cases(sizes=BENCHMARK_SIZES, engines=BENCHMARK_ENGINES, max_pigs=None):
+    """
+    Return the cases of a benchmark run as dicts of engine, pigs, stochastic, rac and nutrients
+    Growth and RAC only vary for the simulation engines and PigAgent.feed, and nutrient
+    requirements only for the simulation engines; engines skip sizes above their max_pigs.
+    """
+    max_pigs = dict(MAX_PIGS, **(max_pigs or {}))
+    cases = []
+    for engine in engines:
+        if engine not in BENCHMARK_ENGINES:
+            raise ValueError(f"Unknown benchmark engine: {engine}")
+        growth = itertools.product((False, True), (False, True))
+        if engine in SIMULATION_ENGINES:
+            variants = [(stochastic, rac, nutrients) for (stochastic, rac), nutrients
+                        in itertools.product(growth, (False, True))]
+        elif engine == 'agent.feed':
+            variants = [(stochastic, rac, False) for stochastic, rac in growth]
+        else:
+            variants = [(False, False, False)]
+        for pigs in sizes:
+            if pigs > max_pigs.get(engine, pigs):
+                continue
+            for stochastic, rac, nutrients in variants:
+                cases.append({'name': case_name(engine, pigs, stochastic, rac, nutrients), 'engine': engine,
+                              'pigs': pigs, 'stochastic': stochastic, 'rac': rac, 'nutrients': nutrients})
+    return cases
+
+
+def case_scenario(case, days):
+    """
+    Return the simulation scenario of a case
+    """
+    return dict(DEFAULT_SCENARIO, pigs_per_region=pigs_per_region(case['pigs']), days=days,
+                engine='object' if case['engine'] in AGENT_METHODS else case['engine'],
+                stochastic_weight_gain=case['stochastic'], RAC=case['rac'])
+
+
+def go_arguments(params):
+    """
+    Return the arguments of PigGrowthSimulation.go for a scenario
+    """
+    return (params['environmental_temperature'], params['T'], params['ME_content'],
+            params['stochastic_weight_gain'],
+            params['ME_requirements_for_increased_activity_or_genotype_adjustment'], params['RAC'],
+            params['RAC_level'], params['Dry_matter'], params['ferm_fiber_content'], params['selling_rate'])
+
+
+def run_simulation_case(case, horizons, seed):
+    """
+    Set up and run the simulation of a case
+    Yields (pigs, setup seconds), then (day, pigs fed, seconds) for every day it runs
+    """
+    params = case_scenario(case, max(horizons))
+    simulation = create_simulation(params, seed)
+    if case['nutrients']:
+        # Recording the requirement variables makes every engine compute them every day
+        simulation.add_recorder(HerdRecorder(REQUIREMENT_VARIABLES, params['days'], by='breed'))
+    arguments = go_arguments(params)
+    with silenced():
+        start = time.perf_counter()
+        simulation.setup(*params['pigs_per_region'])
+        yield simulation.pig_count(), time.perf_counter() - start
+        for day in range(1, params['days'] + 1):
+            pigs = simulation.pig_count()
+            start = time.perf_counter()
+            continue_sim = simulation.go(*arguments)
+            yield day, pigs, time.perf_counter() - start
+            if not continue_sim:
+                break
+
+
+def run_agent_case(case, horizons, seed):
+    """
+    Set up an object simulation and call one PigAgent method on every pig every day
+    Only the method calls are timed; the day's random draws are made beforehand, as go does.
+    """
+    params = case_scenario(case, max(horizons))
+    simulation = create_simulation(params, seed)
+    with silenced():
+        start = time.perf_counter()
+        simulation.setup(*params['pigs_per_region'])
+        seconds = time.perf_counter() - start
+    pigs = list(simulation.herd)
+    yield len(pigs), seconds
+    for day in range(1, params['days'] + 1):
+        if case['engine'] == 'agent.move':
+            angles = simulation.rng.uniform(-30, 30, len(pigs)).tolist()
+            start = time.perf_counter()
+            for pig, angle in zip(pigs, angles):
+                pig.move(simulation.region_boundaries, simulation.world_width, simulation.world_height, angle)
+        else:
+            deviations = (simulation.rng.triangular(len(pigs)).tolist() if params['stochastic_weight_gain']
+                          else [None] * len(pigs))
+            start = time.perf_counter()
+            for pig, deviation in zip(pigs, deviations):
+                pig.feed(params['environmental_temperature'], params['T'], params['ME_content'],
+                         params['stochastic_weight_gain'],
+                         params['ME_requirements_for_increased_activity_or_genotype_adjustment'], params['RAC'],
+                         simulation.init_weight_rac, params['RAC_level'], params['Dry_matter'],
+                         params['ferm_fiber_content'], simulation.sell_weight, deviation)
+        yield day, len(pigs), time.perf_counter() - start
+
+
+def run_mesa_case(case, horizons, seed):
+    """
+    Set up a Mesa model of a case's herd, split evenly between gilts, barrows and males, and step it
+    Agent variables are collected every step and spilled to a temporary directory, as long runs do.
+    """
+    from model import BatchPigModel, PigModel
+
+    model_class = PigModel if case['engine'] == 'mesa' else BatchPigModel
+    with tempfile.TemporaryDirectory() as spill_dir:
+        with silenced():
+            start = time.perf_counter()
+            model = model_class(*(max(case['pigs'] // 3, 1),) * 3, seed=seed, spill_dir=spill_dir)
+            seconds = time.perf_counter() - start
+        yield model.num_pigs, seconds
+        for day in range(1, max(horizons) + 1):
+            pigs = model.num_pigs - model.num_sold
+            start = time.perf_counter()
+            model.step()
+            yield day, pigs, time.perf_counter() - start
+
+
+CASE_RUNNERS = dict({engine: run_simulation_case for engine in SIMULATION_ENGINES},
+                    **{engine: run_agent_case for engine in AGENT_METHODS},
+                    **{engine: run_mesa_case for engine in MESA_MODELS})
+
+
+def time_case(case, horizons, seed):
+    """
+    Run a case and return its herd size, setup time and the cumulative time and pig-days at every horizon
+    """
+    runner = CASE_RUNNERS[case['engine']](case, horizons, seed)
+    pigs, setup_seconds = next(runner)
+    checkpoints = {}
+    seconds = 0.0
+    pig_days = 0
+    for day, day_pigs, day_seconds in runner:
+        seconds += day_seconds
+        pig_days += day_pigs
+        if day in horizons:
+            checkpoints[day] = {'days': day, 'seconds': seconds, 'pig_days': pig_days}
+    return pigs, setup_seconds, checkpoints
+
+
+def trace_case(case, horizons, seed):
+    """
+    Run a case again under tracemalloc and return its peak traced memory at setup and at every horizon
+    """
+    tracemalloc.start()
+    try:
+        runner = CASE_RUNNERS[case['engine']](case, horizons, seed)
+        next(runner)
+        setup_peak = tracemalloc.get_traced_memory()[1]
+        peaks = {day: tracemalloc.get_traced_memory()[1] for day, _, _ in runner if day in horizons}
+    finally:
+        tracemalloc.stop()
+    return setup_peak, peaks
+
+
+def run_case(case, horizons=BENCHMARK_HORIZONS, seed=BENCHMARK_SEED, memory=True):
+    """
+    Benchmark a case and return its result
+    Times are wall clock seconds of a run without memory tracing; per_pig_day_ns divides the
+    time to a horizon by the pigs fed up to it, so it compares across herd sizes. Peak memory
+    is the tracemalloc peak of a second, traced run, which also counts NumPy buffers.
+    """
+    horizons = sorted(set(horizons))
+    pigs, setup_seconds, checkpoints = time_case(case, horizons, seed)
+    setup_peak, peaks = trace_case(case, horizons, seed) if memory else (None, {})
+    result = dict(case, seed=seed, initial_pigs=pigs, setup_seconds=setup_seconds,
+                  setup_per_pig_ns=setup_seconds / pigs * 1e9 if pigs else None,
+                  setup_peak_memory_bytes=setup_peak, horizons=[])
+    for days in horizons:
+        if days not in checkpoints:
+            # The simulation stopped before this horizon
+            continue
+        checkpoint = checkpoints[days]
+        checkpoint['per_pig_day_ns'] = (checkpoint['seconds'] / checkpoint['pig_days'] * 1e9
+                                        if checkpoint['pig_days'] else None)
+        checkpoint['peak_memory_bytes'] = peaks.get(days)
+        result['horizons'].append(checkpoint)
+    return result
+
+
+def environment():
+    """
+    Describe the machine and model version a baseline was measured on
+    """
+    return {
+        'created': datetime.datetime.now(datetime.timezone.utc).isoformat(timespec='seconds'),
+        'model_version': model_version(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpus': os.cpu_count(),
+    }
+
+
+def run_benchmarks(cases, horizons=BENCHMARK_HORIZONS, seed=BENCHMARK_SEED, memory=True, progress=None):
+    """
+    Benchmark every case and return the baseline: {'environment', 'horizons', 'seed', 'results'}
+    progress, if given, is called with every result as it finishes
+    """
+    results = []
+    for case in cases:
+        result = run_case(case, horizons, seed, memory)
+        results.append(result)
+        if progress is not None:
+            progress(result)
+    return {'environment': environment(), 'horizons': sorted(set(horizons)), 'seed': seed, 'results': results}
+
+
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """
+    Compare the per-pig-day cost of the cases and horizons two baselines share
+    Returns (name, days, baseline ns, current ns, ratio, regressed) rows
+    """
+    previous = {(result['name'], horizon['days']): horizon['per_pig_day_ns']
+                for result in baseline['results'] for horizon in result['horizons']}
+    rows = []
+    for result in current['results']:
+        for horizon in result['horizons']:
+            old = previous.get((result['name'], horizon['days']))
+            new = horizon['per_pig_day_ns']
+            if not old or new is None:
+                continue
+            ratio = new / old
+            rows.append((result['name'], horizon['days'], old, new, ratio, ratio > threshold))
+    return rows
+
+
+def format_result(result):
+    horizons = ', '.join(f"{horizon['days']}d {horizon['per_pig_day_ns']:.0f} ns/pig-day"
+                         + (f" {horizon['peak_memory_bytes'] / 2 ** 20:.1f} MB"
+                            if horizon['peak_memory_bytes'] is not None else '')
+                         for horizon in result['horizons'] if horizon['per_pig_day_ns'] is not None)
+    return f"{result['name']}: {result['initial_pigs']} pigs, setup {result['setup_seconds']:.3f} s; {horizons}"
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m benchmark', description='Benchmark the simulation engines, '
+                                     'PigAgent methods and Mesa models and write a JSON baseline.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=BENCHMARK_SIZES, help='Herd sizes (pigs)')
+    parser.add_argument('--days', type=int, nargs='+', default=BENCHMARK_HORIZONS, help='Horizons (days)')
+    parser.add_argument('--engines', nargs='+', choices=BENCHMARK_ENGINES, default=BENCHMARK_ENGINES,
+                        help='Benchmarked engines, PigAgent methods and Mesa models')
+    parser.add_argument('--max-pigs', dest='max_pigs', type=int,
+                        help='Run the per-pig Python paths (object, agent.*, mesa) up to this herd size')
+    parser.add_argument('--filter', help='Only run cases whose name contains this text')
+    parser.add_argument('--seed', type=int, default=BENCHMARK_SEED, help='Seed of every case')
+    parser.add_argument('--no-memory', dest='memory', action='store_false',
+                        help='Skip the traced run measuring peak memory')
+    parser.add_argument('--output', help='Write the results to this JSON baseline')
+    parser.add_argument('--compare', help='JSON baseline to compare the per-pig-day cost with')
+    parser.add_argument('--threshold', type=float, default=REGRESSION_THRESHOLD,
+                        help='Cost ratio over the compared baseline reported as a regression')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    max_pigs = dict.fromkeys(MAX_PIGS, args.max_pigs) if args.max_pigs is not None else None
+    cases = benchmark_cases(args.sizes, args.engines, max_pigs)
+    if args.filter:
+        cases = [case for case in cases if args.filter in case['name']]
+
+    results = run_benchmarks(cases, args.days, args.seed, args.memory,
+                             progress=lambda result: print(format_result(result), flush=True))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(results, output_file, indent=2)
+
+    if args.compare:
+        with open(args.compare) as baseline_file:
+            baseline = json.load(baseline_file)
+        rows = compare(baseline, results, args.threshold)
+        for name, days, old, new, ratio, regressed in rows:
+            print(f"{name} {days}d: {old:.0f} -> {new:.0f} ns/pig-day ({ratio:.2f}x)"
+                  + (' REGRESSION' if regressed else ''))
+        if any(row[-1] for row in rows):
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# branch.py
+#
+# What-if branches of a running simulation: python -m branch --at 60 --branch rac '{"RAC": true}'
+
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from checkpoint import load_checkpoint, save_checkpoint
+from eventlog import silenced
+from sharded import DAY_PARAMETERS
+from simulation import DEFAULT_SCENARIO, create_simulation
+
+# Scenario parameters a branch may change: the go() arguments, the marketing weights and the last day
+BRANCH_PARAMETERS = DAY_PARAMETERS + ('sell_weight', 'init_weight_rac', 'days')
+
+
+class Snapshot:
+    """
+    Frozen state of a running simulation that any number of branches continue from
+
+    The state is a checkpoint file (see checkpoint.py) and every branch maps it
+    copy-on-write: branches share the herd arrays and only copy the pages they
+    modify, so a fork costs little more than reading the checkpoint header.
+    Branches in other processes open the same file. Branches continue the
+    snapshot's random stream, so they differ only by their own decisions.
+    """
+    def __init__(self, path, temporary=False):
+        self.path = path
+        self.temporary = temporary
+
+    @classmethod
+    def take(cls, simulation, path=None):
+        """
+        Snapshot a set up simulation into path, or into a temporary file removed by close()
+        """
+        temporary = path is None
+        if temporary:
+            descriptor, path = tempfile.mkstemp(prefix='pigsim-', suffix='.ckpt')
+            os.close(descriptor)
+        save_checkpoint(simulation, path)
+        return cls(path, temporary)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def fork(self):
+        """
+        Return a new simulation continuing from the snapshot
+        """
+        return load_checkpoint(self.path)
+
+    def close(self):
+        """
+        Remove a temporary snapshot file; forked simulations keep their mapped state
+        """
+        if self.temporary:
+            with contextlib.suppress(OSError):
+                os.remove(self.path)
+            self.temporary = False
+
+
+def branch_scenario(scenario, overrides):
+    """
+    Return the scenario of a branch, checking that it only changes BRANCH_PARAMETERS
+    """
+    fixed = set(overrides) - set(BRANCH_PARAMETERS)
+    if fixed:
+        raise ValueError(f"Branches cannot change: {', '.join(sorted(fixed))}")
+    return dict(DEFAULT_SCENARIO, **scenario) | dict(overrides)
+
+
+def continue_branch(simulation, scenario):
+    """
+    Run a forked simulation from its current day to the end of scenario, as run_scenario would
+    Returns the simulation
+    """
+    params = dict(DEFAULT_SCENARIO, **scenario)
+    simulation.sell_weight = params['sell_weight']
+    simulation.init_weight_rac = params['init_weight_rac']
+    while simulation.days < params['days']:
+        if not simulation.go(*(params[name] for name in DAY_PARAMETERS)):
+            break
+    return simulation
+
+
+def run_branch(job):
+    """
+    Fork the snapshot at path and run one branch; job is (path, name, scenario)
+    Returns a summary of the branch
+    """
+    path, name, scenario = job
+
+    # Branch runs only need the summary, not the per-day status events
+    with silenced():
+        simulation = continue_branch(load_checkpoint(path), scenario)
+
+    return dict({'branch': name}, **simulation.summary())
+
+
+def run_branches(snapshot, scenario, branches, max_workers=None):
+    """
+    Run what-if branches of a snapshot across a process pool
+    scenario is the one the snapshot was run with and branches maps branch names to
+    overrides of its BRANCH_PARAMETERS. Yields each branch's summary as soon as it finishes.
+    """
+    jobs = [(snapshot.path, name, branch_scenario(scenario, overrides)) for name, overrides in branches.items()]
+    if max_workers == 1:
+        for job in jobs:
+            yield run_branch(job)
+        return
+
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(run_branch, job) for job in jobs]
+        for future in as_completed(futures):
+            yield future.result()
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m branch', description='Run a scenario to a day, then fork it '
+                                     'into what-if branches that continue with different parameters.')
+    parser.add_argument('--config', help='JSON file of the scenario parameters')
+    parser.add_argument('--seed', type=int, help='Seed of the simulation random stream')
+    parser.add_argument('--at', type=int, default=60, help='Day to branch on')
+    parser.add_argument('--from', dest='checkpoint', help='Branch from this checkpoint instead of running to --at')
+    parser.add_argument('--branch', nargs=2, action='append', default=[], metavar=('NAME', 'JSON'),
+                        help='Branch name and JSON object of the parameters it changes (repeatable)')
+    parser.add_argument('--workers', type=int, help='Worker processes')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    scenario = {}
+    if args.config:
+        with open(args.config) as config_file:
+            scenario = json.load(config_file)
+    unknown = set(scenario) - set(DEFAULT_SCENARIO)
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+    branches = {'baseline': {}}
+    branches.update((name, json.loads(overrides)) for name, overrides in args.branch)
+
+    if args.checkpoint:
+        snapshot = Snapshot(args.checkpoint)
+    else:
+        params = dict(DEFAULT_SCENARIO, **scenario)
+        simulation = create_simulation(params, args.seed)
+        with silenced():
+            simulation.setup(*params['pigs_per_region'])
+            continue_branch(simulation, dict(params, days=args.at))
+        snapshot = Snapshot.take(simulation)
+
+    with snapshot:
+        for result in run_branches(snapshot, scenario, branches, args.workers):
+            print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
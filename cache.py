@@ -0,0 +1,192 @@
+# cache.py
+
+import contextlib
+import functools
+import gzip
+import hashlib
+import json
+import numbers
+import os
+
+import numpy as np
+
+from eventlog import silenced
+from simulation import DEFAULT_SCENARIO, run_scenario
+
+# Source files whose contents define the model version of cached results
+MODEL_FILES = ('simulation.py', 'herd.py', 'reference.py', 'scheduler.py', 'tables.py', 'rng.py')
+
+
+@functools.lru_cache(maxsize=None)
+def model_version():
+    """
+    Return a hash of the model source files, so results of an older model are never reused
+    """
+    digest = hashlib.sha256()
+    directory = os.path.dirname(os.path.abspath(__file__))
+    for name in MODEL_FILES:
+        digest.update(name.encode())
+        with open(os.path.join(directory, name), 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def canonical_value(value):
+    """
+    Return a scenario value in the form it is hashed in: numbers as floats and sequences as lists
+    So 20, 20.0 and numpy.int64(20) are the same parameter, as are a tuple and a list of them.
+    """
+    if isinstance(value, (bool, np.bool_)):
+        return bool(value)
+    if value is None or isinstance(value, str):
+        return value
+    if isinstance(value, numbers.Real):
+        return float(value)
+    if isinstance(value, (list, tuple, np.ndarray)):
+        return [canonical_value(item) for item in value]
+    if isinstance(value, dict):
+        return {key: canonical_value(item) for key, item in value.items()}
+    return value
+
+
+def result_key(scenario, seed):
+    """
+    Return the canonical hash of a run: its full scenario, its seed and the model version
+    """
+    scenario = canonical_value(dict(DEFAULT_SCENARIO, **scenario))
+    seed = int(seed) if seed is not None else None
+    canonical = json.dumps({'scenario': scenario, 'seed': seed, 'model': model_version()},
+                           sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+def simulation_result(simulation):
+    """
+    Return the summary and day series of a finished run as a JSON-serializable dict
+    """
+    return {
+        'seed': simulation.rng.seed,
+        'summary': simulation.summary(),
+        'days_data': list(simulation.days_data),
+        'pig_count_data': [int(count) for count in simulation.pig_count_data],
+        'sold_count_data': [int(count) for count in simulation.sold_count_data],
+        'total_feed_intake_data': [float(value) for value in simulation.total_feed_intake_data],
+        'tracked_pig_data': {breed: {name: [float(value) for value in values] for name, values in data.items()}
+                             for breed, data in simulation.tracked_pig_data.items()},
+    }
+
+
+class ResultCache:
+    """
+    Persistent cache of run results on local disk, addressed by result_key
+
+    Every result is a gzip-compressed JSON file under directory, named by its key.
+    Reads refresh a file's modification time. Writes keep a running total of the
+    cache size, counted once from disk, and only when it exceeds max_bytes evict
+    the least recently used files until the cache fits again. Files are written to a
+    temporary name and renamed, so concurrent readers never see partial results.
+    """
+    def __init__(self, directory, max_bytes=256 * 2 ** 20, compresslevel=6):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.compresslevel = compresslevel
+        self.total = None  # Bytes of cached results, counted on the first write
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.json.gz')
+
+    def get(self, key):
+        """
+        Return the cached result of key, or None
+        """
+        path = self.path(key)
+        try:
+            with gzip.open(path, 'rt') as result_file:
+                result = json.load(result_file)
+        except (FileNotFoundError, EOFError, OSError, ValueError):
+            return None
+        with contextlib.suppress(OSError):
+            os.utime(path)
+        return result
+
+    def put(self, key, result):
+        """
+        Store a result under key and evict old results beyond max_bytes
+        """
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with gzip.open(temporary, 'wt', compresslevel=self.compresslevel) as result_file:
+            json.dump(result, result_file)
+        if self.total is None:
+            self.total = self.size()
+        with contextlib.suppress(OSError):
+            self.total -= os.path.getsize(path)
+        self.total += os.path.getsize(temporary)
+        os.replace(temporary, path)
+        if self.total > self.max_bytes:
+            self.evict()
+
+    def entries(self):
+        """
+        Return (modification time, size, path) of every cached result
+        """
+        entries = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if name.endswith('.json.gz'):
+                    path = os.path.join(root, name)
+                    with contextlib.suppress(OSError):
+                        stat = os.stat(path)
+                        entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def size(self):
+        """
+        Return the total size in bytes of the cached results
+        """
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self):
+        """
+        Remove the least recently used results until the cache fits in max_bytes
+        """
+        entries = sorted(self.entries())
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            with contextlib.suppress(OSError):
+                os.remove(path)
+            total -= size
+        self.total = total
+
+    def clear(self):
+        """
+        Remove every cached result
+        """
+        for _, _, path in self.entries():
+            with contextlib.suppress(OSError):
+                os.remove(path)
+        self.total = 0
+
+
+def cached_run(scenario, seed, cache):
+    """
+    Return the result of a scenario run with seed, from cache if it was run before
+    Runs without a seed are random and always simulated; returns (result, whether it was cached)
+    """
+    key = result_key(scenario, seed) if seed is not None else None
+    if key is not None:
+        result = cache.get(key)
+        if result is not None:
+            return result, True
+
+    # Cached runs only return results, not the per-day status events
+    with silenced():
+        simulation = run_scenario(scenario, seed)
+    result = simulation_result(simulation)
+    if key is not None:
+        cache.put(key, result)
+    return result, False
@@ -0,0 +1,189 @@
+# checkpoint.py
+#
+# Checkpoints of running simulations: save_checkpoint(simulation, 'run.ckpt'), later load_checkpoint('run.ckpt')
+
+import json
+import logging
+import os
+
+import numpy as np
+
+from eventlog import get_logger, log_event
+from simulation import (DEFAULT_SCENARIO, DeterministicPigGrowthSimulation, EventDrivenPigGrowthSimulation,
+                        PigGrowthSimulation, VectorizedPigGrowthSimulation)
+
+logger = get_logger(__name__)
+
+# First bytes of every checkpoint file, followed by the length of its JSON header
+CHECKPOINT_MAGIC = b'PIGCKPT\x00'
+CHECKPOINT_VERSION = 1
+
+# Arrays start on multiples of this many bytes from the end of the header, so mapped arrays are aligned
+ALIGNMENT = 64
+
+# Simulation classes a checkpoint can be restored into, by name
+SIMULATION_CLASSES = {cls.__name__: cls for cls in (PigGrowthSimulation, VectorizedPigGrowthSimulation,
+                                                    DeterministicPigGrowthSimulation,
+                                                    EventDrivenPigGrowthSimulation)}
+
+
+def aligned(size):
+    """
+    Round size up to a multiple of ALIGNMENT
+    """
+    return -(-size // ALIGNMENT) * ALIGNMENT
+
+
+def json_value(value):
+    """
+    Convert the NumPy scalars of a checkpoint header to JSON values
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Cannot store {type(value).__name__} in a checkpoint header")
+
+
+def flatten_arrays(arrays, prefix=''):
+    """
+    Return nested dicts of arrays as one dict keyed by '/'-joined paths, in order
+    """
+    flat = {}
+    for name, value in arrays.items():
+        if isinstance(value, dict):
+            flat.update(flatten_arrays(value, f"{prefix}{name}/"))
+        else:
+            flat[prefix + name] = value
+    return flat
+
+
+def unflatten_arrays(flat):
+    """
+    Return the nested dicts of arrays of flatten_arrays
+    """
+    arrays = {}
+    for path, value in flat.items():
+        *parents, name = path.split('/')
+        node = arrays
+        for parent in parents:
+            node = node.setdefault(parent, {})
+        node[name] = value
+    return arrays
+
+
+def write_checkpoint(path, state, arrays):
+    """
+    Write state (JSON-serializable) and nested dicts of NumPy arrays to a checkpoint file
+
+    The file holds CHECKPOINT_MAGIC, the length of a JSON header as 8 little-endian bytes,
+    the header (state and the dtype, shape and offset of every array), then the raw array
+    data, each array aligned. It is written under a temporary name and renamed, so an
+    interrupted save never replaces a good checkpoint and mapped checkpoints stay intact.
+    """
+    flat = {name: np.ascontiguousarray(values) for name, values in flatten_arrays(arrays).items()}
+    entries = {}
+    size = 0
+    for name, values in flat.items():
+        if values.dtype.hasobject:
+            raise TypeError(f"Cannot store the object array {name} in a checkpoint")
+        entries[name] = {'dtype': values.dtype.str, 'shape': list(values.shape), 'offset': size}
+        size += aligned(values.nbytes)
+    header = json.dumps({'version': CHECKPOINT_VERSION, 'state': state, 'arrays': entries},
+                        default=json_value).encode()
+    start = aligned(len(CHECKPOINT_MAGIC) + 8 + len(header))
+
+    temporary = f"{path}.{os.getpid()}.tmp"
+    with open(temporary, 'wb') as checkpoint_file:
+        checkpoint_file.write(CHECKPOINT_MAGIC)
+        checkpoint_file.write(len(header).to_bytes(8, 'little'))
+        checkpoint_file.write(header)
+        for name, values in flat.items():
+            checkpoint_file.seek(start + entries[name]['offset'])
+            checkpoint_file.write(values.reshape(-1).view(np.uint8).data)
+        checkpoint_file.truncate(start + size)
+    os.replace(temporary, path)
+
+
+def read_checkpoint(path):
+    """
+    Return the state and nested dicts of arrays of a checkpoint file
+    Arrays are copy-on-write views of the memory-mapped file: pages are only read when
+    used and writes to the arrays never reach the file.
+    """
+    with open(path, 'rb') as checkpoint_file:
+        if checkpoint_file.read(len(CHECKPOINT_MAGIC)) != CHECKPOINT_MAGIC:
+            raise ValueError(f"Not a checkpoint file: {path}")
+        length = int.from_bytes(checkpoint_file.read(8), 'little')
+        header = json.loads(checkpoint_file.read(length))
+    if header['version'] != CHECKPOINT_VERSION:
+        raise ValueError(f"Unsupported checkpoint version {header['version']}: {path}")
+    start = aligned(len(CHECKPOINT_MAGIC) + 8 + length)
+
+    data = np.asarray(np.memmap(path, dtype=np.uint8, mode='c'))
+    flat = {}
+    for name, entry in header['arrays'].items():
+        dtype = np.dtype(entry['dtype'])
+        shape = tuple(entry['shape'])
+        offset = start + entry['offset']
+        flat[name] = data[offset:offset + int(np.prod(shape)) * dtype.itemsize].view(dtype).reshape(shape)
+    return header['state'], unflatten_arrays(flat)
+
+
+def save_checkpoint(simulation, path):
+    """
+    Save the full state of a set up simulation: its herd, day counter, sales, recorded series and random stream
+    """
+    state, arrays = simulation.checkpoint_state()
+    write_checkpoint(path, {'class': type(simulation).__name__, 'simulation': state}, arrays)
+    log_event(logger, logging.INFO, 'checkpoint_saved', "Checkpoint saved at day %(day)d: %(path)s",
+              day=simulation.days, path=path)
+
+
+def load_checkpoint(path):
+    """
+    Return a simulation restored from a checkpoint
+    Running it on gives the same results, bit for bit, as the run it was saved from.
+    """
+    state, arrays = read_checkpoint(path)
+    if state['class'] not in SIMULATION_CLASSES:
+        raise ValueError(f"Unknown simulation class in checkpoint: {state['class']}")
+    simulation = SIMULATION_CLASSES[state['class']]()
+    simulation.restore_state(state['simulation'], arrays)
+    log_event(logger, logging.INFO, 'checkpoint_loaded', "Resuming from day %(day)d: %(path)s",
+              day=simulation.days, path=path)
+    return simulation
+
+
+def run_checkpointed(scenario, simulation, path, every=10, setup=True):
+    """
+    Run a scenario on simulation as run_scenario does, saving a checkpoint to path every `every` days
+    and on the last day, so a finished or stopped run is never recomputed.
+    With setup False the simulation continues from its current day, as after load_checkpoint;
+    the scenario must then be the one the checkpoint was run with. Returns the simulation.
+    """
+    params = dict(DEFAULT_SCENARIO, **scenario)
+    if setup:
+        simulation.setup(*params['pigs_per_region'])
+        saved_day = None
+    else:
+        saved_day = simulation.days
+    while simulation.days < params['days']:
+        continue_sim = simulation.go(
+            params['environmental_temperature'],
+            params['T'],
+            params['ME_content'],
+            params['stochastic_weight_gain'],
+            params['ME_requirements_for_increased_activity_or_genotype_adjustment'],
+            params['RAC'],
+            params['RAC_level'],
+            params['Dry_matter'],
+            params['ferm_fiber_content'],
+            params['selling_rate']
+        )
+        if not continue_sim:
+            break
+        if simulation.days % every == 0:
+            save_checkpoint(simulation, path)
+            saved_day = simulation.days
+    if simulation.days != saved_day:
+        save_checkpoint(simulation, path)
+    return simulation
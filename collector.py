@@ -0,0 +1,166 @@
+# collector.py
+
+import os
+
+import numpy as np
+import pandas as pd
+from mesa.datacollection import DataCollector
+
+# Herd aggregates an aggregate reporter can take of an agent variable
+AGGREGATES = {
+    'mean': lambda values: float(values.mean()) if len(values) else float('nan'),
+    'sum': lambda values: float(values.sum()),
+    'min': lambda values: float(values.min()) if len(values) else float('nan'),
+    'max': lambda values: float(values.max()) if len(values) else float('nan'),
+    'count': lambda values: len(values),
+}
+
+
+class HerdDataCollector(DataCollector):
+    """
+    Mesa DataCollector that stores agent variables in typed, chunked columns
+
+    Agent reporters are attribute names, or functions: of an agent for models that
+    keep Agent objects on their schedule (PigModel), and of the model, returning one
+    value per pig, for models that keep their pigs in a columns dict with aligned
+    unique_ids (BatchPigModel). Rows go into preallocated chunk_rows-row buffers of
+    each reporter's dtype; full chunks are kept in memory, or written to spill_dir
+    as .npz files so memory stays bounded by one chunk whatever the run length.
+
+    aggregate_reporters maps model variable names to (aggregate, attribute) pairs,
+    with aggregate one of AGGREGATES, and are computed from the same pass over the
+    herd. Data is only collected on steps that are a multiple of every, counted by
+    the model's schedule.
+
+    Agent records replace DataCollector's through its _new_agent_reporter and
+    _record_agents hooks and its _agent_records store, which are not public Mesa
+    API: this class is written against Mesa 2.4, the version the README pins.
+    """
+
+    def __init__(self, model_reporters=None, agent_reporters=None, aggregate_reporters=None, dtypes=None,
+                 every=1, chunk_rows=2 ** 16, spill_dir=None, **kwargs):
+        self.dtypes = dict(dtypes or {})
+        super().__init__(model_reporters=model_reporters, agent_reporters=agent_reporters, **kwargs)
+        self.aggregate_reporters = dict(aggregate_reporters or {})
+        for name, (aggregate, attribute) in self.aggregate_reporters.items():
+            if aggregate not in AGGREGATES:
+                raise ValueError(f"Unknown aggregate: {aggregate}")
+            self.model_vars[name] = []
+        self.every = every
+        self.chunk_rows = chunk_rows
+        self.spill_dir = spill_dir
+        if spill_dir is not None:
+            os.makedirs(spill_dir, exist_ok=True)
+        self.steps = []
+        self.chunks = []
+        self.buffer = {
+            'Step': np.empty(chunk_rows, dtype=np.int64),
+            'AgentID': np.empty(chunk_rows, dtype=np.int64),
+        }
+        for name in self.agent_reporters:
+            self.buffer[name] = np.empty(chunk_rows, dtype=self.dtypes.get(name, np.float64))
+        self.buffer_rows = 0
+        self.herd = None
+        self.gathered_ids = None
+
+    def _new_agent_reporter(self, name, reporter):
+        self.agent_reporters[name] = reporter
+
+    def gather(self, model):
+        """Read the live herd of the model once for this collection."""
+        if hasattr(model, 'columns'):
+            self.herd = (model, None)
+            return np.asarray(model.unique_ids)
+        agents = list(model.schedule.agents)
+        self.herd = (model, agents)
+        return np.fromiter((agent.unique_id for agent in agents), dtype=np.int64, count=len(agents))
+
+    def values(self, reporter, dtype=np.float64):
+        """Return a reporter's value for every pig of the gathered herd."""
+        model, agents = self.herd
+        if agents is None:
+            values = model.columns[reporter] if isinstance(reporter, str) else reporter(model)
+            return np.asarray(values, dtype=dtype)
+        if isinstance(reporter, str):
+            return np.fromiter((getattr(agent, reporter) for agent in agents), dtype=dtype, count=len(agents))
+        return np.fromiter((reporter(agent) for agent in agents), dtype=dtype, count=len(agents))
+
+    def _record_agents(self, model):
+        """Append the agent variables of the gathered herd to the chunk buffers."""
+        ids = self.gathered_ids
+        columns = {name: self.values(reporter, self.buffer[name].dtype)
+                   for name, reporter in self.agent_reporters.items()}
+        start = 0
+        while start < len(ids):
+            n = min(len(ids) - start, self.chunk_rows - self.buffer_rows)
+            rows = slice(self.buffer_rows, self.buffer_rows + n)
+            self.buffer['Step'][rows] = model.schedule.steps
+            self.buffer['AgentID'][rows] = ids[start:start + n]
+            for name, values in columns.items():
+                self.buffer[name][rows] = values[start:start + n]
+            self.buffer_rows += n
+            start += n
+            if self.buffer_rows == self.chunk_rows:
+                self.flush()
+        return []
+
+    def collect(self, model):
+        """Collect all the data for the given model object, on sampled steps only."""
+        if model.schedule.steps % self.every:
+            return
+        self.steps.append(model.schedule.steps)
+        self.gathered_ids = self.gather(model)
+        try:
+            super().collect(model)
+            for name, (aggregate, attribute) in self.aggregate_reporters.items():
+                self.model_vars[name].append(AGGREGATES[aggregate](self.values(attribute)))
+        finally:
+            self.herd = None
+            self.gathered_ids = None
+        # Only the chunk buffers hold agent records
+        self._agent_records.clear()
+
+    def flush(self):
+        """Move the buffered rows to a chunk, on disk if spill_dir is set."""
+        if not self.buffer_rows:
+            return
+        chunk = {name: column[:self.buffer_rows].copy() for name, column in self.buffer.items()}
+        if self.spill_dir is not None:
+            path = os.path.join(self.spill_dir, f"agents_{len(self.chunks):06d}.npz")
+            np.savez(path, **chunk)
+            chunk = path
+        self.chunks.append(chunk)
+        self.buffer_rows = 0
+
+    def agent_chunks(self):
+        """Yield the agent variables a chunk at a time, as (Step, AgentID) indexed DataFrames."""
+        for chunk in self.chunks:
+            if isinstance(chunk, str):
+                with np.load(chunk) as stored:
+                    chunk = {name: stored[name] for name in stored.files}
+            yield self.chunk_frame(chunk)
+        if self.buffer_rows:
+            yield self.chunk_frame({name: column[:self.buffer_rows] for name, column in self.buffer.items()})
+
+    def chunk_frame(self, chunk):
+        index = pd.MultiIndex.from_arrays([chunk['Step'], chunk['AgentID']], names=["Step", "AgentID"])
+        return pd.DataFrame({name: chunk[name] for name in self.agent_reporters}, index=index)
+
+    def get_model_vars_dataframe(self):
+        """Create a pandas DataFrame from the model variables, indexed by the sampled steps."""
+        if not self.model_vars:
+            raise UserWarning(
+                "No model reporters have been defined in the DataCollector, returning empty DataFrame."
+            )
+        return pd.DataFrame(self.model_vars, index=pd.Index(self.steps, name="Step"))
+
+    def get_agent_vars_dataframe(self):
+        """Create a pandas DataFrame from the agent variables, indexed by Step and AgentID."""
+        if not self.agent_reporters:
+            raise UserWarning(
+                "No agent reporters have been defined in the DataCollector, returning empty DataFrame."
+            )
+        frames = list(self.agent_chunks())
+        if not frames:
+            return self.chunk_frame({name: column[:0] for name, column in self.buffer.items()})
+        return pd.concat(frames)
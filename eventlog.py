@@ -0,0 +1,146 @@
+# eventlog.py
+
+import contextlib
+import json
+import logging
+import logging.handlers
+import sys
+import threading
+
+# Parent of the loggers of every module; configure_logging attaches its handler here
+LOGGER_NAME = 'pigsim'
+
+LOG_LEVELS = ('debug', 'info', 'warning', 'error')
+
+# Levels of the open silenced() contexts of each thread, innermost last
+silence = threading.local()
+
+
+class SilenceFilter(logging.Filter):
+    """
+    Drop the records below the level of the innermost silenced() context of the thread logging them
+    """
+    def filter(self, record):
+        levels = getattr(silence, 'levels', None)
+        return not levels or record.levelno >= levels[-1]
+
+
+SILENCE_FILTER = SilenceFilter()
+
+
+def get_logger(name):
+    """
+    Return the event logger of a module
+    """
+    logger = logging.getLogger(f"{LOGGER_NAME}.{name}")
+    if SILENCE_FILTER not in logger.filters:
+        logger.addFilter(SILENCE_FILTER)
+    return logger
+
+
+def log_event(logger, level, event, message, **fields):
+    """
+    Log a structured event
+    The message is a %-format string of the fields, only formatted if a handler emits it,
+    and JSON output writes the fields themselves. Unconfigured runs log nothing below WARNING.
+    """
+    # logging only treats a non-empty dict as the format arguments
+    args = (fields,) if fields else ()
+    logger.log(level, message, *args, extra={'event': event})
+
+
+@contextlib.contextmanager
+def silenced(level=logging.WARNING):
+    """
+    Drop the simulation events below level logged by this thread while the context is open
+    Other threads, such as a GUI worker next to a configured run, keep logging as before.
+    """
+    levels = silence.__dict__.setdefault('levels', [])
+    levels.append(max(level, levels[-1]) if levels else level)
+    try:
+        yield
+    finally:
+        levels.pop()
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format events as JSON lines of their time, level, logger, event name, fields and message
+    """
+    def format(self, record):
+        entry = {'time': record.created, 'level': record.levelname, 'logger': record.name,
+                 'event': getattr(record, 'event', None)}
+        if isinstance(record.args, dict):
+            entry.update(record.args)
+        entry['message'] = record.getMessage()
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Pass only one in every `every` records of each event at or below level
+    The first record of an event always passes; records above level are never sampled.
+    """
+    def __init__(self, every, level=logging.INFO):
+        super().__init__()
+        self.every = every
+        self.level = level
+        self.counts = {}
+
+    def filter(self, record):
+        if record.levelno > self.level:
+            return True
+        key = (record.name, getattr(record, 'event', record.msg))
+        count = self.counts.get(key, 0)
+        self.counts[key] = count + 1
+        return count % self.every == 0
+
+
+class BatchStreamHandler(logging.handlers.BufferingHandler):
+    """
+    Buffer records and write them to a stream in one write per batch
+
+    A batch is written when capacity records are buffered, when a record at
+    flush_level or above arrives, on flush() and when logging shuts down.
+    """
+    def __init__(self, stream=None, capacity=256, flush_level=logging.WARNING):
+        super().__init__(capacity)
+        self.stream = stream if stream is not None else sys.stdout
+        self.flush_level = flush_level
+
+    def shouldFlush(self, record):
+        return len(self.buffer) >= self.capacity or record.levelno >= self.flush_level
+
+    def flush(self):
+        with self.lock:
+            if not self.buffer:
+                return
+            try:
+                self.stream.write(''.join(self.format(record) + '\n' for record in self.buffer))
+                self.stream.flush()
+            except Exception:
+                self.handleError(self.buffer[0])
+            self.buffer = []
+
+
+def configure_logging(level=logging.INFO, json_output=False, every=1, stream=None, capacity=256):
+    """
+    Send the simulation events at level or above to stream (default stdout), batched and optionally sampled
+    Text output writes each event's message, as the status lines were printed; json_output writes
+    JSON lines. Replaces the handler of an earlier call and returns the new one.
+    """
+    logger = logging.getLogger(LOGGER_NAME)
+    for handler in list(logger.handlers):
+        if isinstance(handler, BatchStreamHandler):
+            handler.close()
+            logger.removeHandler(handler)
+    handler = BatchStreamHandler(stream, capacity)
+    handler.setFormatter(JsonFormatter() if json_output else logging.Formatter('%(message)s'))
+    if every > 1:
+        handler.addFilter(SamplingFilter(every))
+    logger.addHandler(handler)
+    logger.setLevel(level.upper() if isinstance(level, str) else level)
+    logger.propagate = False
+    return handler
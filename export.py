@@ -0,0 +1,133 @@
+# export.py
+
+import numpy as np
+
+from herd import BREEDS, STATE_VARIABLES
+
+EXPORT_FORMATS = ('parquet', 'feather')
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise ImportError("HerdExporter needs pyarrow: pip install pyarrow") from error
+    return pyarrow
+
+
+def export_schema():
+    """
+    Return the Arrow schema of exported herd state: one row per pig per day of each run
+    """
+    pa = _import_pyarrow()
+    fields = [
+        pa.field('run', pa.int32()),
+        pa.field('day', pa.int32()),
+        pa.field('pig_id', pa.int64()),
+        pa.field('breed', pa.dictionary(pa.int8(), pa.string())),
+        pa.field('region', pa.int16()),
+    ]
+    fields.extend(pa.field(name, pa.float64()) for name in STATE_VARIABLES)
+    return pa.schema(fields)
+
+
+class HerdExporter:
+    """
+    Streams the herd state of every simulated day to a Parquet or Feather file
+
+    Attach it with PigGrowthSimulation.add_recorder. Days are buffered as Arrow record
+    batches and written every chunk_days days, so memory stays bounded by one chunk
+    whatever the run length or herd size. Feather files are written uncompressed by
+    default so readers can memory-map them with open_feather. Every setup() of the
+    simulation starts a new run, numbered from 0 in the run column.
+    """
+    def __init__(self, path, format=None, chunk_days=1, compression=None):
+        pa = _import_pyarrow()
+        if format is None:
+            format = 'parquet' if str(path).endswith('.parquet') else 'feather'
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format: {format}")
+        self.path = path
+        self.format = format
+        self.chunk_days = chunk_days
+        self.variables = STATE_VARIABLES
+        self.schema = export_schema()
+        self.breed_dictionary = pa.array(BREEDS, type=pa.string())
+        self.batches = []
+        self.rows_written = 0
+        self.run = 0
+        self.run_rows = 0
+
+        if format == 'parquet':
+            import pyarrow.parquet as pq
+            self.writer = pq.ParquetWriter(path, self.schema, compression=compression or 'snappy')
+        else:
+            options = pa.ipc.IpcWriteOptions(compression=compression)
+            self.writer = pa.ipc.new_file(path, self.schema, options=options)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def record(self, day, ids, breeds, regions, columns):
+        """
+        Buffer one day of the herd and write it out once a chunk is complete
+        Same arguments as HerdRecorder.record
+        """
+        pa = _import_pyarrow()
+        n = len(ids)
+        arrays = [
+            pa.array(np.full(n, self.run, dtype=np.int32)),
+            pa.array(np.full(n, day, dtype=np.int32)),
+            pa.array(np.array(ids, dtype=np.int64)),
+            pa.DictionaryArray.from_arrays(pa.array(np.array(breeds, dtype=np.int8)), self.breed_dictionary),
+            pa.array(np.array(regions, dtype=np.int16)),
+        ]
+        # Copy the columns, the simulation keeps updating its arrays in place
+        arrays.extend(pa.array(np.array(columns[name], dtype=np.float64)) for name in STATE_VARIABLES)
+        self.batches.append(pa.RecordBatch.from_arrays(arrays, schema=self.schema))
+        self.run_rows += n
+
+        if len(self.batches) >= self.chunk_days:
+            self.flush()
+
+    def flush(self):
+        """
+        Write buffered days to the file
+        """
+        if not self.batches:
+            return
+        pa = _import_pyarrow()
+        table = pa.Table.from_batches(self.batches, schema=self.schema)
+        self.writer.write_table(table)
+        self.rows_written += table.num_rows
+        self.batches = []
+
+    def clear(self):
+        """
+        Called when the simulation is reset; writes any buffered days and starts a new run
+        """
+        self.flush()
+        if self.run_rows:
+            self.run += 1
+            self.run_rows = 0
+
+    def close(self):
+        """
+        Flush remaining days and close the file
+        """
+        if self.writer is None:
+            return
+        self.flush()
+        self.writer.close()
+        self.writer = None
+
+
+def open_feather(path):
+    """
+    Memory-map an exported Feather file and return it as an Arrow table
+    """
+    pa = _import_pyarrow()
+    return pa.ipc.open_file(pa.memory_map(str(path), 'r')).read_all()
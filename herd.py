@@ -0,0 +1,639 @@
+# herd.py
+
+import numpy as np
+
+from profiler import NULL_PROFILER
+
+BREEDS = ('gilt', 'barrow', 'male')
+
+# Breed specific constants used by PigAgent
+BREED_PARAMETERS = {
+    'gilt': {'Pd_max': 149.9799, 'BP_at_Pd_max': 11.3016, 'maximum_P_retention': 3.824},
+    'barrow': {'Pd_max': 145.3477, 'BP_at_Pd_max': 10.2483, 'maximum_P_retention': 3.550},
+    'male': {'Pd_max': 165.5064, 'BP_at_Pd_max': 13.6612, 'maximum_P_retention': 4.610},
+}
+
+# Every numeric PigAgent attribute, stored as one float64 column each
+STATE_VARIABLES = (
+    # Position and body composition
+    'x', 'y', 'weight', 'weight_gain', 'BPm', 'BLm', 'init_Gut_fill', 'init_BLm_BPm',
+    # Pd related properties
+    'Pd_max', 'BP_at_Pd_max', 'Prd', 'Prd_1', 'maximum_Pd', 'maximum_pd_after_pd_max_start_decline',
+    'BP_at_maturity', 'Rate_constant', 'Pd_by_energy_int',
+    # Growth and energy
+    'Ash', 'Wat', 'ME_intake', 'ME_intake_rac', 'Lid', 'feed_intake', 'feed_intake_es', 'LCT',
+    'Minimum_space_for_maximum_ME_intake', 'Fraction_of_ME_intake', 'maximum_daily_feed_intake',
+    'standard_maintenance_ME_requirements', 'ME_requirements_for_thermogenesis',
+    'Maintenance_ME_requirements', 'Gut_fill', 'EBW', 'PBT', 'fat_free_lean', 'final_weight',
+    # RAC related properties
+    'RAC_day', 'BWG_rac', 'MEIR', 'increase_Pd_rac', 'Pd_rac_W', 'Pd_rac_d', 'RAC_lean_tissue_gain', 'rac_PBT',
+    # Lysine requirements
+    'GIT_lys_loss', 'Integu_lys_loss', 'SID_lys_for_GIT', 'lys_in_Pd', 'SID_lys_for_pd', 'SID_lys', 'Ferm_SID_thr',
+    # Calcium and Phosphorus
+    'P', 'maximum_P_retention', 'feed_dry_intake', 'STTD_P', 'Total_Ca',
+    # Amino acids
+    'Arg', 'His', 'Ile', 'Leu', 'Met', 'Meth_cys', 'Phe', 'Phe_tyr', 'Thr', 'Trp', 'Val', 'Nit',
+    # Minerals
+    'Sodium', 'Chlorine', 'Magnesium', 'Potassium', 'Copper', 'Iodine', 'Iron', 'Manganese', 'Selenium', 'Zinc',
+    # Vitamins
+    'Vit_A', 'Vit_D3', 'Vit_E', 'Vit_K', 'Biotin', 'Choline', 'Folacin', 'Niacin', 'Pantothenic_acid',
+    'Riboflavin', 'Thiamin', 'Vit_B6', 'Vit_B12', 'Linoleic_acid',
+)
+
+# PigAgent.feed_rac outputs, including the RAC day counter
+RAC_VARIABLES = (
+    'RAC_day', 'BWG_rac', 'MEIR', 'ME_intake_rac', 'increase_Pd_rac', 'Pd_rac_W', 'Pd_rac_d',
+    'RAC_lean_tissue_gain', 'rac_PBT',
+)
+
+# Nutrient requirements, by the calculation that fills them. They are only computed when
+# first read after a feed (see VectorizedHerd.evaluate_requirements)
+REQUIREMENT_GROUPS = {
+    'amino_acids': (
+        'GIT_lys_loss', 'Integu_lys_loss', 'SID_lys_for_GIT', 'lys_in_Pd', 'SID_lys_for_pd', 'SID_lys', 'Ferm_SID_thr',
+        'Arg', 'His', 'Ile', 'Leu', 'Met', 'Meth_cys', 'Phe', 'Phe_tyr', 'Thr', 'Trp', 'Val', 'Nit',
+    ),
+    'minerals': (
+        'Sodium', 'Chlorine', 'Magnesium', 'Potassium', 'Copper', 'Iodine', 'Iron', 'Manganese', 'Selenium', 'Zinc',
+    ),
+    'vitamins': (
+        'Vit_A', 'Vit_D3', 'Vit_E', 'Vit_K', 'Biotin', 'Choline', 'Folacin', 'Niacin', 'Pantothenic_acid',
+        'Riboflavin', 'Thiamin', 'Vit_B6', 'Vit_B12', 'Linoleic_acid',
+    ),
+    'phosphorus': ('maximum_P_retention', 'feed_dry_intake', 'STTD_P', 'Total_Ca'),
+}
+REQUIREMENT_VARIABLES = tuple(name for names in REQUIREMENT_GROUPS.values() for name in names)
+
+# Amino acid requirements as a ratio of SID lysine
+AMINO_ACID_RATIOS = (
+    ('Arg', 0.457), ('His', 0.344), ('Ile', 0.522), ('Leu', 1.007), ('Met', 0.289), ('Meth_cys', 0.564),
+    ('Phe', 0.597), ('Phe_tyr', 0.938), ('Thr', 0.603), ('Trp', 0.171), ('Val', 0.649), ('Nit', 2.148),
+)
+
+# Mineral requirements as (intercept, slope) of ln(weight)
+MINERAL_COEFFICIENTS = (
+    ('Sodium', -2.5588, 1.1335), ('Chlorine', -2.0706, 0.9068), ('Magnesium', -1.0353, 0.4534),
+    ('Potassium', -0.4591, 1.0774), ('Copper', -0.8705, 1.9286), ('Iodine', -0.3624, 0.1587),
+    ('Iron', 34.357, 15.904), ('Manganese', -5.1766, 2.2669), ('Selenium', -0.0924, 0.1048),
+    ('Zinc', -70.251, 43.634),
+)
+
+# Vitamin requirements as (intercept, slope) of ln(weight)
+VITAMIN_COEFFICIENTS = (
+    ('Vit_A', -3364.8, 1473.5), ('Vit_D3', -388.24, 170.02), ('Vit_E', -28.471, 12.468),
+    ('Vit_K', -1.2941, 0.5667), ('Biotin', -0.1294, 0.0567), ('Choline', -0.7765, 0.34),
+    ('Folacin', -0.7765, 0.34), ('Niacin', -77.649, 34.004), ('Pantothenic_acid', -12.202, 6.6304),
+    ('Riboflavin', -2.2184, 1.615), ('Thiamin', -2.5883, 1.1335), ('Vit_B6', -2.5883, 1.1335),
+    ('Vit_B12', 16.64, -0.852), ('Linoleic_acid', -2.5883, 1.1335),
+)
+
+
+def base_weight_gain(breed, weight, stochastic_weight_gain):
+    """
+    Daily weight gain (g/day) before the stochastic deviation, as in PigAgent.feed
+    """
+    if breed == 'gilt':
+        return -0.0477 * weight ** 2 + 8.8503 * weight + 485.17
+    elif breed == 'barrow':
+        return -0.0765 * weight ** 2 + 14.162 * weight + 291.23
+    elif stochastic_weight_gain:
+        return -0.0603 * weight ** 2 + 12.043 * weight + 335.44 - 20
+    return -0.0603 * weight ** 2 + 12.043 * weight + 335.44
+
+
+def intake_curves(breed, weight, ME_content):
+    """
+    ME intake (kcal/day), Prd (g/day) and ME based feed intake (kg/day) at the day's starting weight
+    """
+    if breed == 'gilt':
+        ME_intake = 10967 * (1 - np.exp(-np.exp(-3.803) * weight ** 0.9072))
+        Prd = 137 * (0.7066 + 0.013289 * weight - 0.0001312 * weight ** 2 + 2.8627 * weight ** 3 * 10 ** (-7))
+    elif breed == 'barrow':
+        ME_intake = 10447 * (1 - np.exp(-np.exp(-4.283) * weight ** 1.0843))
+        Prd = 133 * (0.7078 + 0.013764 * weight - 0.00014211 * weight ** 2 + 3.2698 * weight ** 3 * 10 ** (-7))
+    else:
+        ME_intake = 10638 * (1 - np.exp(-np.exp(-3.803) * weight ** 0.9072))
+        Prd = 151 * (0.6558 + 0.012740 * weight - 0.00010390 * weight ** 2 + 1.64001 * weight ** 3 * 10 ** (-7))
+    return {'ME_intake': ME_intake, 'Prd': Prd, 'feed_intake_ME': 1.053 * ME_intake / ME_content}
+
+
+def maintenance_curves(breed, weight, T):
+    """
+    Space, intake capacity, maintenance and thermogenesis terms at the day's updated weight
+    Gilts and barrows also get their weight based feed intake curve as feed_intake
+    """
+    LCT = 17.9 - (0.0375 * weight)
+    standard_maintenance_ME_requirements = 197 * weight ** 0.60
+    curves = {
+        'Minimum_space_for_maximum_ME_intake': 0.0336 * weight ** 0.667,
+        'maximum_daily_feed_intake': 111 * (weight ** 0.803) * (1.00 + 0.025 * (LCT - T)),
+        'standard_maintenance_ME_requirements': standard_maintenance_ME_requirements,
+        'ME_requirements_for_thermogenesis': 0.07425 * (LCT - T) * standard_maintenance_ME_requirements,
+        'Pd_energy_factor': 21 + 20 * np.exp((-0.021) * weight),
+    }
+    if breed == 'gilt':
+        curves['feed_intake'] = 2.755 * (1 - (np.exp(-np.exp(-4.755) * (weight ** 1.214))))
+    elif breed == 'barrow':
+        curves['feed_intake'] = 2.88 * (1 - (np.exp(-np.exp(-5.921) * (weight ** 1.512))))
+    return curves
+
+
+def requirement_curves(weight):
+    """
+    Weight terms of the lysine, mineral and vitamin requirements
+    """
+    return {'weight_ln': np.log(weight), 'Integu_lys_loss': 0.0045 * weight ** 0.75}
+
+
+class PigHerd:
+    """
+    PigAgent objects by breed, with stable ids and per-region views
+
+    Pigs are iterated in herd order (gilts, barrows, males, each in the order they were
+    added), the order the simulation draws random numbers in. Lookups by id and
+    membership tests are O(1), and remove drops a day's sold pigs in one
+    order-preserving pass over the affected breeds.
+    """
+    def __init__(self, num_regions=5):
+        self.by_breed = {breed: [] for breed in BREEDS}
+        self.by_region = {region: {} for region in range(1, num_regions + 1)}
+        self.by_id = {}
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.by_id)
+
+    def __iter__(self):
+        for breed in BREEDS:
+            yield from self.by_breed[breed]
+
+    def __contains__(self, pig):
+        return pig is not None and self.by_id.get(pig.pig_id) is pig
+
+    def add(self, pig, pig_id=None):
+        """
+        Add a pig at the end of its breed and give it the next id, or pig_id when restoring a herd
+        """
+        if pig_id is None:
+            pig_id = self.next_id
+            self.next_id += 1
+        pig.pig_id = pig_id
+        self.by_breed[pig.breed].append(pig)
+        self.by_region[pig.region][pig.pig_id] = pig
+        self.by_id[pig.pig_id] = pig
+
+    def get(self, pig_id):
+        """
+        Return the pig with an id, or None if it has been sold
+        """
+        return self.by_id.get(pig_id)
+
+    def breed(self, breed):
+        """
+        Return the list of pigs of a breed, in herd order
+        """
+        return self.by_breed[breed]
+
+    def region(self, region):
+        """
+        Return the pigs of a region (1-based), in the order they were added
+        """
+        return list(self.by_region[region].values())
+
+    def remove(self, pigs):
+        """
+        Remove the given pigs, keeping the order of the rest
+        """
+        if not pigs:
+            return
+        sold_ids = set()
+        for pig in pigs:
+            sold_ids.add(pig.pig_id)
+            del self.by_id[pig.pig_id]
+            del self.by_region[pig.region][pig.pig_id]
+        for breed in {pig.breed for pig in pigs}:
+            self.by_breed[breed] = [pig for pig in self.by_breed[breed] if pig.pig_id not in sold_ids]
+
+
+class PigView:
+    """
+    Read-only attribute access to one pig's row of a VectorizedHerd
+    """
+    def __init__(self, herd, index):
+        self._herd = herd
+        self._index = index
+
+    @property
+    def breed(self):
+        return BREEDS[self._herd.breed[self._index]]
+
+    @property
+    def region(self):
+        return int(self._herd.region[self._index])
+
+    def __getattr__(self, name):
+        columns = self._herd.columns
+        if name in REQUIREMENT_VARIABLES:
+            self._herd.evaluate_row(self._index)
+        if name in columns:
+            return float(columns[name][self._index])
+        raise AttributeError(name)
+
+
+class VectorizedHerd:
+    """
+    Structure-of-arrays herd that evaluates PigAgent.feed for all pigs of a breed at once
+
+    Pigs are stored contiguously by breed (gilts, barrows, males) in the same order
+    PigGrowthSimulation keeps its breed lists, and each day's random numbers are
+    drawn from the simulation's SimulationRNG in the same blocks, so a fixed seed
+    gives the same herd as the per-object path.
+    """
+    def __init__(self, rng, tables=None, profiler=NULL_PROFILER):
+        self.rng = rng
+        self.tables = tables
+        # Phase timings of step and evaluate_requirements, see PigGrowthSimulation.enable_profiling
+        self.profiler = profiler
+        # Nutrient requirements are only computed when read, from the inputs of the last feed
+        self.requirements_stale = False
+        self.requirement_inputs = None
+        # Rows whose requirements were evaluated alone since the last feed, see evaluate_row
+        self.fresh_rows = set()
+        self.ids = np.empty(0, dtype=np.int64)
+        self.breed = np.empty(0, dtype=np.int8)
+        self.region = np.empty(0, dtype=np.int64)
+        self.columns = {name: np.empty(0) for name in STATE_VARIABLES}
+        self.next_id = 0
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getattr__(self, name):
+        columns = self.__dict__.get('columns')
+        if columns is not None and name in columns:
+            if name in REQUIREMENT_VARIABLES:
+                self.evaluate_requirements()
+            return columns[name]
+        raise AttributeError(name)
+
+    def add_pigs(self, breed, regions, xs, ys, weights):
+        """
+        Append pigs of one breed, initialised like PigAgent.__init__
+        Breeds must be added in BREEDS order to keep the herd contiguous by breed
+        """
+        weights = np.asarray(weights, dtype=float)
+        n = len(weights)
+        parameters = BREED_PARAMETERS[breed]
+
+        new = {name: np.zeros(n) for name in STATE_VARIABLES}
+        new['x'] = np.asarray(xs, dtype=float)
+        new['y'] = np.asarray(ys, dtype=float)
+        new['weight'] = weights
+        new['BPm'] = weights * 0.18
+        new['BLm'] = weights * 0.03
+        new['init_Gut_fill'] = 0.277 * weights ** 0.612
+        new['Pd_max'][:] = parameters['Pd_max']
+        new['BP_at_Pd_max'][:] = parameters['BP_at_Pd_max']
+        new['init_BLm_BPm'] = (0.305 - 0.000875 * parameters['Pd_max']) * weights ** 0.45
+        new['maximum_Pd'][:] = parameters['Pd_max']
+
+        self.ids = np.concatenate([self.ids, np.arange(self.next_id, self.next_id + n)])
+        self.breed = np.concatenate([self.breed, np.full(n, BREEDS.index(breed), dtype=np.int8)])
+        self.region = np.concatenate([self.region, np.asarray(regions, dtype=np.int64)])
+        for name in STATE_VARIABLES:
+            self.columns[name] = np.concatenate([self.columns[name], new[name]])
+        self.next_id += n
+
+    def breed_slice(self, breed):
+        """
+        Return the slice of the herd holding pigs of the given breed
+        """
+        code = BREEDS.index(breed)
+        return slice(int(np.searchsorted(self.breed, code, side='left')),
+                     int(np.searchsorted(self.breed, code, side='right')))
+
+    def count(self, breed):
+        """
+        Return the number of pigs of the given breed
+        """
+        breed_slice = self.breed_slice(breed)
+        return breed_slice.stop - breed_slice.start
+
+    def index_of(self, pig_id):
+        """
+        Return the current row of a pig id, or None if it has been sold
+        """
+        index = int(np.searchsorted(self.ids, pig_id))
+        if index < len(self.ids) and self.ids[index] == pig_id:
+            return index
+        return None
+
+    def pig(self, pig_id):
+        """
+        Return a PigView for a pig id, or None if it has been sold
+        """
+        index = self.index_of(pig_id)
+        if index is None:
+            return None
+        return PigView(self, index)
+
+    def total_feed_intake(self):
+        """
+        Sum feed intake over the herd in the same order as the per-object path
+        """
+        if len(self) == 0:
+            return 0
+        return float(np.cumsum(self.columns['feed_intake'])[-1])
+
+    def remove(self, mask):
+        """
+        Drop the pigs selected by a boolean mask, keeping the order of the rest
+        """
+        if not mask.any():
+            return
+        keep = ~mask
+        # The rows after a removed pig move up, so their evaluations are no longer found by row
+        self.fresh_rows.clear()
+        self.ids = self.ids[keep]
+        self.breed = self.breed[keep]
+        self.region = self.region[keep]
+        for name in STATE_VARIABLES:
+            self.columns[name] = self.columns[name][keep]
+
+    def move(self, region_boundaries, world_width, world_height):
+        """
+        Move every pig randomly within its region, as PigAgent.move
+        """
+        angle = self.rng.uniform(-30, 30, len(self))
+        x = self.columns['x'] + 0.4 * np.cos(np.radians(angle))
+        y = self.columns['y'] + 0.4 * np.sin(np.radians(angle))
+
+        # Keep within the region boundaries and the world boundaries for y
+        boundaries = np.asarray(region_boundaries, dtype=float)
+        self.columns['x'] = np.clip(x, boundaries[self.region - 1, 0], boundaries[self.region - 1, 1])
+        self.columns['y'] = np.clip(y, 1, world_height - 1)
+
+    def step(self, region_boundaries, world_width, world_height, environmental_temperature, T, ME_content,
+             stochastic_weight_gain, ME_requirements_for_increased_activity_or_genotype_adjustment, RAC,
+             init_weight_rac, RAC_level, Dry_matter, ferm_fiber_content, sell_weight, selling_rate=100,
+             on_sale=None):
+        """
+        Move, feed and sell the whole herd for one day
+        on_sale, if given, is called with the mask of the sold pigs before they are removed
+        Returns the number of pigs sold
+        """
+        profiler = self.profiler
+        with profiler.phase('move'):
+            self.move(region_boundaries, world_width, world_height)
+
+        with profiler.phase('feed'):
+            # Draw the day's weight gain deviations for the whole herd in one call
+            deviation = self.rng.triangular(len(self)) if stochastic_weight_gain else None
+
+            over_sell_weight = np.zeros(len(self), dtype=bool)
+            for breed in BREEDS:
+                breed_slice = self.breed_slice(breed)
+                if breed_slice.start == breed_slice.stop:
+                    continue
+                over_sell_weight[breed_slice] = self.feed(
+                    breed, breed_slice, environmental_temperature, T, ME_content,
+                    None if deviation is None else deviation[breed_slice],
+                    ME_requirements_for_increased_activity_or_genotype_adjustment, RAC, init_weight_rac,
+                    RAC_level, Dry_matter, ferm_fiber_content, sell_weight)
+
+        # Sell pigs over the sell weight, with one sale draw each in a single call
+        with profiler.phase('sell'):
+            sold = over_sell_weight.copy()
+            sold[over_sell_weight] = self.rng.sell_draws(int(over_sell_weight.sum())) < selling_rate
+            if on_sale is not None:
+                on_sale(sold)
+            self.remove(sold)
+        return int(sold.sum())
+
+    def feed(self, breed, breed_slice, environmental_temperature, T, ME_content, deviation,
+             ME_requirements_for_increased_activity_or_genotype_adjustment, RAC, init_weight_rac, RAC_level,
+             Dry_matter, ferm_fiber_content, sell_weight):
+        """
+        Evaluate the PigAgent.feed equation chain for every pig of one breed
+        deviation holds the pigs' weight gain deviations, or None for deterministic growth
+        Returns a boolean mask of the pigs over the sell weight
+        """
+        c = {name: column[breed_slice] for name, column in self.columns.items()}
+        weight = c['weight'].copy()
+
+        # Calculate weight gain, ME intake and protein deposition based on breed
+        base_gain = base_weight_gain(breed, weight, deviation is not None)
+        weight_gain = base_gain if deviation is None else base_gain + deviation
+
+        tables = self.tables
+        if tables is None:
+            intake = intake_curves(breed, weight, ME_content)
+        else:
+            intake = tables.intake(breed, ME_content).lookup(weight)
+        ME_intake = intake['ME_intake']
+        Prd = intake['Prd']
+
+        # Update weight
+        weight = weight + (weight_gain / 1000)
+
+        # Update body composition
+        Pd_max = c['Pd_max']
+        BP_at_maturity = 2.7182 * c['BP_at_Pd_max']
+        Rate_constant = 2.7182 * Pd_max / (BP_at_maturity * 1000)
+        BPm = c['BPm'] + Prd / 1000
+        maximum_pd_after_pd_max_start_decline = BPm * 1000 * Rate_constant * np.log(BP_at_maturity / BPm)
+
+        # Update ash and water content
+        Ash = 0.189 * BPm
+        P = 1.1613 + 26.012 * BPm + 0.2299 * BPm ** 2
+        Wat = (4.322 + 0.0044 * Pd_max) * (P ** 0.855)
+
+        # Temperature, space and maintenance requirements
+        if tables is None:
+            maintenance = maintenance_curves(breed, weight, T)
+        else:
+            maintenance = tables.maintenance(breed, T).lookup(weight)
+        LCT = 17.9 - (0.0375 * weight)
+        Minimum_space_for_maximum_ME_intake = maintenance['Minimum_space_for_maximum_ME_intake']
+        Fraction_of_ME_intake = 1 - 0.012914 * (T - (LCT + 3)) - 0.001179 * (T - (LCT + 3)) ** 2
+        maximum_daily_feed_intake = maintenance['maximum_daily_feed_intake']
+        standard_maintenance_ME_requirements = maintenance['standard_maintenance_ME_requirements']
+        ME_requirements_for_thermogenesis = maintenance['ME_requirements_for_thermogenesis']
+        if environmental_temperature:
+            Maintenance_ME_requirements = (standard_maintenance_ME_requirements +
+                                           ME_requirements_for_thermogenesis +
+                                           ME_requirements_for_increased_activity_or_genotype_adjustment)
+        else:
+            Maintenance_ME_requirements = (standard_maintenance_ME_requirements +
+                                           ME_requirements_for_increased_activity_or_genotype_adjustment)
+
+        # Lipid deposition, empty body weight, gut fill and backfat
+        Lid = (ME_intake - Maintenance_ME_requirements - (Prd * 10.6)) / 12.5
+        BLm = c['BLm'] + Lid / 1000
+        EBW = BPm + BLm + Wat + Ash
+        Gut_fill = 0.3043 * EBW ** 0.5977
+        PBT = -5 + (12.3 * BLm / BPm) + (0.13 * BPm)
+
+        # Calculate Pd by energy intake
+        adjustment = 0.001
+        Pd_by_energy_int = (30 + maintenance['Pd_energy_factor'] *
+                            (ME_intake - (1.3 * Maintenance_ME_requirements)) *
+                            (Pd_max / 125) * (1 + (0.015 * (20 - T)))) * adjustment
+
+        # Determine maximum Pd
+        maximum_Pd = np.where(Prd > c['Prd_1'], Pd_max, maximum_pd_after_pd_max_start_decline)
+
+        # Calculate feed intake based on breed
+        if breed == 'male':
+            feed_intake_es = c['feed_intake_es']
+            feed_intake = intake['feed_intake_ME']
+        else:
+            feed_intake_es = intake['feed_intake_ME']
+            feed_intake = maintenance['feed_intake']
+
+        for name, value in (
+                ('weight', weight), ('weight_gain', weight_gain), ('ME_intake', ME_intake), ('Prd', Prd),
+                ('BP_at_maturity', BP_at_maturity), ('Rate_constant', Rate_constant), ('BPm', BPm),
+                ('maximum_pd_after_pd_max_start_decline', maximum_pd_after_pd_max_start_decline),
+                ('Ash', Ash), ('P', P), ('Wat', Wat), ('LCT', LCT),
+                ('Minimum_space_for_maximum_ME_intake', Minimum_space_for_maximum_ME_intake),
+                ('Fraction_of_ME_intake', Fraction_of_ME_intake),
+                ('maximum_daily_feed_intake', maximum_daily_feed_intake),
+                ('standard_maintenance_ME_requirements', standard_maintenance_ME_requirements),
+                ('ME_requirements_for_thermogenesis', ME_requirements_for_thermogenesis),
+                ('Maintenance_ME_requirements', Maintenance_ME_requirements), ('Lid', Lid), ('BLm', BLm),
+                ('EBW', EBW), ('Gut_fill', Gut_fill), ('PBT', PBT), ('Pd_by_energy_int', Pd_by_energy_int),
+                ('maximum_Pd', maximum_Pd), ('Prd_1', Prd), ('feed_intake_es', feed_intake_es),
+                ('feed_intake', feed_intake)):
+            c[name][:] = value
+
+        # Apply ractopamine effects if enabled
+        if RAC:
+            with self.profiler.phase('feed_rac'):
+                self.feed_rac(c, init_weight_rac, RAC_level)
+
+        # Nutrient requirements are evaluated on demand by evaluate_requirements
+        self.requirements_stale = True
+        self.requirement_inputs = (ferm_fiber_content, Dry_matter)
+        self.fresh_rows.clear()
+
+        # Record final weight and lean for pigs over the sell weight
+        over = weight > sell_weight
+        if over.any():
+            c['final_weight'][over] = weight[over]
+            c['fat_free_lean'][over] = (62.073 + 0.0308 * weight[over] - 1.0101 * PBT[over] +
+                                        0.00774 * PBT[over] ** 2)
+
+        return over
+
+    def evaluate_requirements(self, rows=None):
+        """
+        Compute the nutrient requirements of the last feed for the whole herd or a slice of rows
+        Does nothing if they are up to date
+        """
+        if not self.requirements_stale:
+            return
+        rows = slice(None) if rows is None else rows
+        ferm_fiber_content, Dry_matter = self.requirement_inputs
+        c = {name: column[rows] for name, column in self.columns.items()}
+        if self.tables is None:
+            requirements = requirement_curves(c['weight'])
+        else:
+            requirements = self.tables.requirements().lookup(c['weight'])
+
+        profiler = self.profiler
+        with profiler.phase('calculate_amino_acid_requirements'):
+            self.calculate_amino_acid_requirements(c, ferm_fiber_content, requirements['Integu_lys_loss'])
+        with profiler.phase('calculate_minerals'):
+            self.calculate_minerals(c, requirements['weight_ln'])
+        with profiler.phase('calculate_vitamins'):
+            self.calculate_vitamins(c, requirements['weight_ln'])
+        with profiler.phase('calculate_phosphorus_requirements'):
+            maximum_P_retention = np.array([BREED_PARAMETERS[breed]['maximum_P_retention'] for breed in BREEDS])
+            c['maximum_P_retention'][:] = maximum_P_retention[self.breed[rows]]
+            self.calculate_phosphorus_requirements(c, Dry_matter)
+        if rows == slice(None):
+            self.requirements_stale = False
+
+    def evaluate_row(self, index):
+        """
+        Compute the nutrient requirements of the last feed for one pig, once per feed
+        """
+        if self.requirements_stale and index not in self.fresh_rows:
+            self.evaluate_requirements(slice(index, index + 1))
+            self.fresh_rows.add(index)
+
+    @staticmethod
+    def feed_rac(c, init_weight_rac, RAC_level):
+        """
+        Apply ractopamine effects to pigs heavy enough and on RAC for less than 28 days
+        """
+        on_rac = (c['RAC_day'] < 28) & (c['weight'] > init_weight_rac)
+        if not on_rac.any():
+            return
+
+        RAC_day = c['RAC_day'][on_rac]
+        BWG_rac = c['weight'][on_rac] - init_weight_rac
+        MEIR = -0.191263 + (0.019013 * BWG_rac) - (0.000443 * BWG_rac ** 2) + (0.000003539 * BWG_rac ** 3)
+        c['BWG_rac'][on_rac] = BWG_rac
+        c['MEIR'][on_rac] = MEIR
+        c['ME_intake_rac'][on_rac] = (1 - (MEIR * (RAC_level / 20) ** 0.7)) * c['ME_intake'][on_rac]
+        c['increase_Pd_rac'][on_rac] = 0.33 * ((RAC_level / 20) ** 0.33)
+        Pd_rac_W = (1.73 + (0.00776 * BWG_rac) -
+                    (0.00205 * BWG_rac ** 2) +
+                    (0.000017 * BWG_rac ** 3) +
+                    (((0.1 * RAC_level) - 1) * (BWG_rac * 0.001875)))
+        c['Pd_rac_W'][on_rac] = Pd_rac_W
+        c['Pd_rac_d'][on_rac] = (1.714 + (0.01457 * RAC_day) -
+                                 (0.00361 * RAC_day ** 2) +
+                                 (0.000055 * RAC_day ** 3))
+        c['RAC_lean_tissue_gain'][on_rac] = Pd_rac_W / 0.2
+        c['rac_PBT'][on_rac] = c['PBT'][on_rac] * (1 + 0.05 * RAC_day / 10) * ((RAC_level / 20) ** 0.7)
+        c['RAC_day'][on_rac] = RAC_day + 1
+
+    @staticmethod
+    def calculate_amino_acid_requirements(c, ferm_fiber_content, Integu_lys_loss=None):
+        """
+        Calculate lysine and the amino acids derived from it
+        """
+        c['GIT_lys_loss'][:] = c['feed_intake'] * (0.417 / 1000) * 0.88 * 1.1
+        if Integu_lys_loss is None:
+            Integu_lys_loss = requirement_curves(c['weight'])['Integu_lys_loss']
+        c['Integu_lys_loss'][:] = Integu_lys_loss
+        c['SID_lys_for_GIT'][:] = (c['GIT_lys_loss'] + c['Integu_lys_loss']) / (0.75 + 0.002 * (c['maximum_Pd'] - 147.7))
+        c['lys_in_Pd'][:] = (c['Prd'] * 0.0710) + (c['Pd_rac_W'] * 0.0822)
+        c['SID_lys_for_pd'][:] = ((c['lys_in_Pd'] / (0.75 + (0.002 * (c['maximum_Pd'] - 147.7)))) *
+                                  (1 + 0.0547 + (0.002215 * c['weight'])))
+        c['SID_lys'][:] = c['SID_lys_for_GIT'] + c['SID_lys_for_pd']
+        c['Ferm_SID_thr'][:] = (c['feed_intake'] / 1000) * ferm_fiber_content * 0.0042
+        for name, ratio in AMINO_ACID_RATIOS:
+            c[name][:] = c['SID_lys'] * ratio
+
+    @staticmethod
+    def calculate_minerals(c, weight_ln=None):
+        """
+        Calculate mineral requirements
+        """
+        if weight_ln is None:
+            weight_ln = np.log(c['weight'])
+        for name, intercept, slope in MINERAL_COEFFICIENTS:
+            c[name][:] = intercept + slope * weight_ln
+
+    @staticmethod
+    def calculate_vitamins(c, weight_ln=None):
+        """
+        Calculate vitamin requirements
+        """
+        if weight_ln is None:
+            weight_ln = np.log(c['weight'])
+        for name, intercept, slope in VITAMIN_COEFFICIENTS:
+            c[name][:] = intercept + slope * weight_ln
+
+    @staticmethod
+    def calculate_phosphorus_requirements(c, Dry_matter):
+        """
+        Calculate phosphorus and calcium requirements
+        """
+        c['feed_dry_intake'][:] = c['feed_intake'] * Dry_matter
+        c['STTD_P'][:] = 0.85 * ((c['maximum_P_retention'] / 0.77) + 0.19 * c['feed_dry_intake'] + 0.007 * c['weight'])
+        c['Total_Ca'][:] = c['STTD_P'] * 2.15
@@ -1,11 +1,16 @@
 # main.py
 
+from eventlog import configure_logging
 from model import PigModel
 from mesa.space import MultiGrid  # Import MultiGrid for the grid environment
 
 if __name__ == "__main__":
+    # Print the status events, including the initial weight of every pig created
+    handler = configure_logging('debug')
+
     # Create the model
     model = PigModel(num_gilts=10, num_barrows=10, num_males=10, init_weight=20, sell_weight=130)
+    handler.flush()
     
     # Run for 100 steps
     for i in range(100):
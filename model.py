@@ -1,13 +1,27 @@
+import logging
+
+import numpy as np
 from mesa import Model
-from mesa.time import RandomActivation
+from mesa.time import BaseScheduler, RandomActivation
 from mesa.space import MultiGrid
-from mesa.datacollection import DataCollector
 from agent import PigAgent  # Assuming PigAgent is defined in agent.py
-import random
+from collector import HerdDataCollector
+from eventlog import get_logger, log_event
+
+logger = get_logger(__name__)
+
+
+def log_pig_created(pig):
+    """Log the initial weight of a new pig."""
+    log_event(logger, logging.DEBUG, 'pig_created',
+              "(%(pig_type)s %(unique_id)d): 'My init-weight is: %(weight).4f Kg'",
+              pig_type=pig.pig_type, unique_id=pig.unique_id, weight=pig.weight)
 
 
 class PigModel(Model):
-    def __init__(self, num_gilts, num_barrows, num_males, init_weight=20, sell_weight=130, width=10, height=10):
+    def __init__(self, num_gilts, num_barrows, num_males, init_weight=20, sell_weight=130, width=10, height=10, seed=None,
+                 collect_every=1, spill_dir=None):
+        # Mesa seeds self.random from the seed keyword, so all draws below replay for the same seed
         super().__init__()
         self.num_gilts = num_gilts
         self.num_barrows = num_barrows
@@ -24,6 +38,7 @@ class PigModel(Model):
         self.schedule = RandomActivation(self)
         self.num_days = 0
         self.num_sold = 0
+        self.sale_queue = []  # Pigs sold during the current step, removed at its end
        
         
 
@@ -36,9 +51,7 @@ class PigModel(Model):
         self.setup_initial_barrows()
         self.setup_initial_males()
 
-        self.datacollector = DataCollector(
-            agent_reporters={"Weight": "weight"}
-        )
+        self.datacollector = herd_collector(collect_every, spill_dir)
 
     def setup_regions(self, num_regions):
         """Simulate regions by dividing the grid."""
@@ -51,32 +64,169 @@ class PigModel(Model):
 
     def setup_initial_gilts(self):
         """Create the gilts (female pigs) with random initial weights."""
+        debug = logger.isEnabledFor(logging.DEBUG)
         for i in range(self.num_gilts):
-            initial_weight = self.init_weight - 1 + random.uniform(0, 2)
+            initial_weight = self.init_weight - 1 + self.random.uniform(0, 2)
             pig = PigAgent(i, self, "gilt", initial_weight, self.regions[0])
-            print(f"(gilt {i}): 'My init-weight is: {round(initial_weight, 4)} Kg'")
+            if debug:
+                log_pig_created(pig)
             self.grid.place_agent(pig, (self.random.randrange(10), self.random.randrange(10)))
             self.schedule.add(pig)
 
     def setup_initial_barrows(self):
         """Create the barrows (castrated males) with random initial weights."""
+        debug = logger.isEnabledFor(logging.DEBUG)
         for i in range(self.num_barrows):
-            initial_weight = self.init_weight - 1 + random.uniform(0, 2)
+            initial_weight = self.init_weight - 1 + self.random.uniform(0, 2)
             pig = PigAgent(i + self.num_gilts, self, "barrow", initial_weight, self.regions[1])
-            print(f"(barrow {i + self.num_gilts}): 'My init-weight is: {round(initial_weight, 4)} Kg'")
+            if debug:
+                log_pig_created(pig)
             self.grid.place_agent(pig, (self.random.randrange(10), self.random.randrange(10)))
             self.schedule.add(pig)
 
     def setup_initial_males(self):
         """Create the males with random initial weights."""
+        debug = logger.isEnabledFor(logging.DEBUG)
         for i in range(self.num_males):
-            initial_weight = self.init_weight - 1 + random.uniform(0, 2)
+            initial_weight = self.init_weight - 1 + self.random.uniform(0, 2)
             pig = PigAgent(i + self.num_gilts + self.num_barrows, self, "male", initial_weight, self.regions[2])
-            print(f"(male {i + self.num_gilts + self.num_barrows}): 'My init-weight is: {round(initial_weight, 4)} Kg'")
+            if debug:
+                log_pig_created(pig)
             self.grid.place_agent(pig, (self.random.randrange(10), self.random.randrange(10)))
             self.schedule.add(pig)
 
+    def sell(self, pig):
+        """Queue a pig for sale; it leaves the model when the current step ends."""
+        self.sale_queue.append(pig)
+
+    def remove_sold(self):
+        """Remove the pigs sold this step from the schedule, the grid and the model."""
+        for pig in self.sale_queue:
+            self.schedule.remove(pig)
+            self.grid.remove_agent(pig)
+            pig.remove()
+        self.num_sold += len(self.sale_queue)
+        self.sale_queue = []
+
     def step(self):
+        self.schedule.step()
+        self.remove_sold()
+        self.num_days += 1
+        self.datacollector.collect(self)
+
+def herd_collector(every=1, spill_dir=None):
+    """Return the HerdDataCollector of the pig models, sampling every `every` steps."""
+    return HerdDataCollector(
+        model_reporters={"Sold": "num_sold"},
+        aggregate_reporters={"Mean weight": ("mean", "weight"), "Feed intake": ("sum", "feed_intake")},
+        agent_reporters={"Weight": "weight"},
+        every=every,
+        spill_dir=spill_dir,
+    )
+
+
+# Daily feed intake per kg of body weight of each pig type, as in PigAgent.feed
+PIG_TYPES = ("gilt", "barrow", "male")
+FEED_RATES = {"gilt": 0.05, "barrow": 0.06, "male": 0.07}
+
+
+class BatchPigModel(Model):
+    """
+    PigModel with the pigs kept in arrays and stepped all at once
+
+    Draws the same initial weights and positions as PigModel for the same seed, so
+    both models grow the same pigs, but each step runs PigAgent.feed and
+    gain_weight for the whole herd as array operations instead of dispatching to
+    every agent. Pigs are not placed on a MultiGrid (their positions are kept in
+    the x and y columns) and, as the growth step does not depend on the activation
+    order, agents are not shuffled. The pigs are not scheduled either: schedule
+    is an empty BaseScheduler that only advances the model clock on every step.
+    datacollector collects the same reporters as PigModel's.
+    """
+
+    def __init__(self, num_gilts, num_barrows, num_males, init_weight=20, sell_weight=130, width=10, height=10, seed=None,
+                 collect_every=1, spill_dir=None):
+        super().__init__()
+        self.num_gilts = num_gilts
+        self.num_barrows = num_barrows
+        self.num_males = num_males
+        self.num_pigs = num_gilts + num_barrows + num_males
+        self.init_weight = init_weight
+        self.sell_weight = sell_weight
+        self.total_feed_intake = 0
+        self.init_weight_rac = 78
+        self.feed_dry_intake = 0
+        self.region_boundaries = []
+        self.daily_feeding = 0
+        self.width = width
+        self.height = height
+        self.schedule = BaseScheduler(self)
+        self.num_days = 0
+        self.num_sold = 0
+
+        self.setup_regions(5)
+        self.setup_pigs()
+
+        self.datacollector = herd_collector(collect_every, spill_dir)
+
+    def setup_regions(self, num_regions):
+        """Simulate regions by dividing the grid."""
+        region_width = self.width // num_regions
+        self.regions = []
+        for i in range(num_regions):
+            region_start = i * region_width
+            region_end = (i + 1) * region_width
+            self.regions.append((region_start, region_end))
+
+    def setup_pigs(self):
+        """Create the gilts, barrows and males with random initial weights, as PigModel does."""
+        counts = (self.num_gilts, self.num_barrows, self.num_males)
+        draws = np.array([(self.init_weight - 1 + self.random.uniform(0, 2),
+                           self.random.randrange(10), self.random.randrange(10))
+                          for _ in range(self.num_pigs)]).reshape(-1, 3)
+        weight = draws[:, 0]
+
+        # Each pig type lives in its own region, gilts in the first
+        self.pig_type = np.repeat(np.arange(len(PIG_TYPES), dtype=np.int8), counts)
+        self.unique_ids = np.arange(self.num_pigs)
+        self.region = self.pig_type.astype(np.int64)
+        self.feed_rate = np.array([FEED_RATES[pig_type] for pig_type in PIG_TYPES])[self.pig_type]
+        self.columns = {
+            "weight": weight,
+            "feed_intake": np.zeros(self.num_pigs),
+            "weight_gain": np.zeros(self.num_pigs),
+            "BPm": weight * 0.18,
+            "BLm": weight * 0.03,
+            "x": draws[:, 1],
+            "y": draws[:, 2],
+        }
+
+    def pig_count(self):
+        """Return the number of pigs not yet sold."""
+        return len(self.unique_ids)
+
+    def step(self):
+        columns = self.columns
+
+        # PigAgent.feed and gain_weight for every pig
+        columns["feed_intake"] = columns["weight"] * self.feed_rate
+        columns["weight_gain"] = columns["feed_intake"] * 0.1
+        columns["weight"] = columns["weight"] + columns["weight_gain"]
+        columns["BPm"] = columns["BPm"] + columns["weight_gain"] * 0.18
+        columns["BLm"] = columns["BLm"] + columns["weight_gain"] * 0.03
+
+        # Pigs over the sell weight leave the model
+        sold = columns["weight"] >= self.sell_weight
+        if sold.any():
+            keep = ~sold
+            self.num_sold += int(sold.sum())
+            self.unique_ids = self.unique_ids[keep]
+            self.pig_type = self.pig_type[keep]
+            self.region = self.region[keep]
+            self.feed_rate = self.feed_rate[keep]
+            for name in columns:
+                columns[name] = columns[name][keep]
+
         self.schedule.step()
         self.num_days += 1
-        self.datacollector.collect(self)
\ No newline at end of file
+        self.datacollector.collect(self)
@@ -0,0 +1,173 @@
+# plots.py
+
+import numpy as np
+
+from herd import BREEDS
+
+# Series of the herd totals, keyed like simulation_series
+HERD_SERIES = (('pigs', 'Pigs'), ('sold', 'Sold Pigs'), ('feed', 'Daily Feed Intake (kg)'))
+
+
+def breed_series(variable):
+    """
+    Return the (key, label) of the tracked pig series of a variable for every breed
+    """
+    return tuple(((breed, variable), breed.capitalize()) for breed in BREEDS)
+
+
+# (title, y label, series) of every panel of PigGrowthSimulation.create_plots
+RESULT_PANELS = (
+    ('External Parameters', 'Count / kg', HERD_SERIES),
+    ('Weight', 'Weight (kg)', breed_series('weight')),
+    ('Protein Deposition', 'Pd (g/day)', breed_series('Prd')),
+    ('Lipid Deposition', 'Ld (g/day)', breed_series('Lid')),
+    ('Metabolizable Energy Intake', 'ME Intake (kcal/day)', breed_series('ME_intake')),
+    ('Feed Intake', 'Feed Intake (kg/day)', breed_series('feed_intake')),
+)
+ADDITIONAL_PANELS = (
+    ('Probe Backfat Thickness', 'PBT (mm)', breed_series('PBT')),
+    ('Daily Weight Gain', 'Weight Gain (g/day)', breed_series('weight_gain')),
+    ('Standardized Ileal Digestible Lysine Requirements', 'SID Lysine (g/day)', breed_series('SID_lys')),
+)
+
+
+def simulation_series(simulation):
+    """
+    Return the plotted series of a simulation as {key: (days, values)}
+    Tracked pig series start on the first day and stop when the pig is sold
+    """
+    days = np.asarray(simulation.days_data)
+    series = {
+        'pigs': (days, simulation.pig_count_data),
+        'sold': (days, simulation.sold_count_data),
+        'feed': (days, simulation.total_feed_intake_data),
+    }
+    for breed, data in simulation.tracked_pig_data.items():
+        for variable, values in data.items():
+            series[breed, variable] = (days[:len(values)], values)
+    return series
+
+
+def decimate(x, y, columns):
+    """
+    Reduce a series to the minimum and maximum of each of `columns` runs of points
+    Series of at most 2 * columns points are returned unchanged. The points are
+    assumed evenly spaced in x, as days are, so a run is one pixel column wide.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    columns = max(int(columns), 1)
+    if n <= 2 * columns:
+        return x, y
+    starts = np.linspace(0, n, columns + 1).astype(np.int64)[:-1]
+    decimated_x = np.repeat(x[starts], 2)
+    decimated_y = np.empty(2 * columns)
+    decimated_y[0::2] = np.fmin.reduceat(y, starts)
+    decimated_y[1::2] = np.fmax.reduceat(y, starts)
+    return decimated_x, decimated_y
+
+
+class LivePlot:
+    """
+    Panels of line plots whose artists are created once and updated in place
+
+    panels are (title, y label, series) as in RESULT_PANELS, laid out on a rows x
+    cols grid of fig. update() sets the data of every line from {key: (x, y)},
+    decimated to about two points per pixel column so the draw cost does not grow
+    with the length of the run.
+
+    With blit=True the lines are animated artists: draw() restores the cached
+    background and redraws only the lines, and a full redraw only happens when the
+    data outgrows the axis limits, which grow with some headroom. Use blit=False
+    for static figures, which autoscale to their data.
+    """
+    def __init__(self, fig, panels, rows, cols, colors=None, blit=False, headroom=0.5):
+        self.fig = fig
+        self.blit = blit
+        self.headroom = headroom
+        self.axes = []
+        self.lines = {}
+        self.background = None
+        self.stale = True
+        colors = colors or {}
+        for i, (title, ylabel, series) in enumerate(panels):
+            ax = fig.add_subplot(rows, cols, i + 1)
+            for key, label in series:
+                color = colors.get(key[0] if isinstance(key, tuple) else key)
+                self.lines[key] = ax.plot([], [], label=label, color=color, animated=blit)[0]
+            ax.set_xlabel('Days')
+            ax.set_ylabel(ylabel)
+            ax.set_title(title)
+            ax.legend()
+            ax.grid(True)
+            self.axes.append(ax)
+        if blit:
+            fig.canvas.mpl_connect('draw_event', self.on_draw)
+
+    def on_draw(self, event):
+        """
+        Cache the background of a full redraw and draw the lines on it
+        """
+        self.background = self.fig.canvas.copy_from_bbox(self.fig.bbox)
+        self.draw_lines()
+        self.stale = False
+
+    def draw_lines(self):
+        for line in self.lines.values():
+            line.axes.draw_artist(line)
+
+    def reset(self, days=None):
+        """
+        Clear every line and shrink the axes back for a new run of up to days days
+        """
+        for line in self.lines.values():
+            line.set_data([], [])
+        for ax in self.axes:
+            ax.set_xlim(0, days or 1)
+            ax.set_ylim(0, 1)
+        self.stale = True
+
+    def update(self, series):
+        """
+        Set the data of every line with a series in series
+        """
+        for key, line in self.lines.items():
+            if key in series:
+                x, y = series[key]
+                line.set_data(*decimate(x, y, line.axes.bbox.width))
+        for ax in self.axes:
+            if self.blit:
+                self.stale |= self.grow_limits(ax)
+            else:
+                ax.relim()
+                ax.autoscale_view()
+
+    def grow_limits(self, ax):
+        """
+        Widen the axis limits, with headroom, if the data no longer fits; return whether they changed
+        """
+        ax.relim()
+        if ax.dataLim.width < 0 or not np.isfinite(ax.dataLim.bounds).all():
+            return False
+        changed = False
+        for (low, high), (data_low, data_high), set_limits in (
+                (ax.get_xlim(), ax.dataLim.intervalx, ax.set_xlim),
+                (ax.get_ylim(), ax.dataLim.intervaly, ax.set_ylim)):
+            if data_low < low or data_high > high:
+                margin = self.headroom * max(data_high - data_low, abs(data_high), 1)
+                set_limits(min(low, data_low), max(high, data_high + margin))
+                changed = True
+        return changed
+
+    def draw(self):
+        """
+        Redraw the figure, by blitting the lines when the background is still valid
+        """
+        canvas = self.fig.canvas
+        if not self.blit or self.stale or self.background is None:
+            canvas.draw_idle()
+            return
+        canvas.restore_region(self.background)
+        self.draw_lines()
+        canvas.blit(self.fig.bbox)
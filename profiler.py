@@ -0,0 +1,181 @@
+# profiler.py
+
+import contextlib
+import json
+import os
+import time
+
+# Shared no-op context of disabled profiling
+NULL_PHASE = contextlib.nullcontext()
+
+
+class NullProfiler:
+    """
+    Profiler of simulations that are not profiled: every phase is a shared no-op context
+    """
+    def phase(self, name, day=None):
+        return NULL_PHASE
+
+    def counted(self, name):
+        return NULL_PHASE
+
+
+NULL_PROFILER = NullProfiler()
+
+
+class PhaseProfiler:
+    """
+    Wall time and call counts of the phases of every simulated day
+
+    Phases nest: go() opens a 'go' phase for its day, and move, feed, sell, record
+    and log phases inside it, so a phase is identified by its path from 'go'.
+    Spans opened with phase() are kept individually for the Chrome trace. Phases
+    opened with counted() run once per pig, so their calls are only summed per
+    day and path; traces lay each day's sum out from the start of its parent span.
+
+    Times are wall clock nanoseconds from clock.
+    """
+    def __init__(self, clock=time.perf_counter_ns):
+        self.clock = clock
+        self.origin = clock()
+        self.day = 0
+        self.stack = ()
+        self.calls = {}
+        self.spans = []
+
+    def clear(self):
+        """
+        Forget every recorded call and span
+        """
+        self.origin = self.clock()
+        self.day = 0
+        self.stack = ()
+        self.calls = {}
+        self.spans = []
+
+    def add(self, path, elapsed):
+        key = (self.day, path)
+        entry = self.calls.get(key)
+        if entry is None:
+            self.calls[key] = [1, elapsed]
+        else:
+            entry[0] += 1
+            entry[1] += elapsed
+
+    @contextlib.contextmanager
+    def phase(self, name, day=None):
+        """
+        Time a phase of the current day, or of day if given
+        """
+        if day is not None:
+            self.day = day
+        parent = self.stack
+        path = parent + (name,)
+        self.stack = path
+        start = self.clock()
+        try:
+            yield
+        finally:
+            elapsed = self.clock() - start
+            self.stack = parent
+            self.add(path, elapsed)
+            self.spans.append((self.day, path, start - self.origin, elapsed))
+
+    @contextlib.contextmanager
+    def counted(self, name):
+        """
+        Time a phase run once per pig, adding its time to the day's sum without keeping a span
+        """
+        parent = self.stack
+        path = parent + (name,)
+        self.stack = path
+        start = self.clock()
+        try:
+            yield
+        finally:
+            self.stack = parent
+            self.add(path, self.clock() - start)
+
+    def days(self):
+        """
+        Return the profiled days in order
+        """
+        return sorted({day for day, _ in self.calls})
+
+    def stats(self, day=None):
+        """
+        Return {phase path: {'calls', 'seconds', 'self_seconds'}} over every day, or one day
+        Paths join phase names with '/'; seconds include nested phases and self_seconds exclude them.
+        """
+        totals = {}
+        for (call_day, path), (calls, elapsed) in self.calls.items():
+            if day is None or call_day == day:
+                entry = totals.setdefault(path, [0, 0])
+                entry[0] += calls
+                entry[1] += elapsed
+        children = {}
+        for path, (_, elapsed) in totals.items():
+            if len(path) > 1:
+                children[path[:-1]] = children.get(path[:-1], 0) + elapsed
+        return {'/'.join(path): {'calls': calls, 'seconds': elapsed / 1e9,
+                                 'self_seconds': (elapsed - children.get(path, 0)) / 1e9}
+                for path, (calls, elapsed) in sorted(totals.items())}
+
+    def day_stats(self):
+        """
+        Return the stats of every profiled day, keyed by day
+        """
+        return {day: self.stats(day) for day in self.days()}
+
+    def report(self, day=None):
+        """
+        Return the stats as a text table, slowest phases first
+        """
+        stats = self.stats(day)
+        total = sum(entry['self_seconds'] for entry in stats.values()) or 1.0
+        lines = [f"{'phase':<60} {'calls':>10} {'seconds':>10} {'self':>10} {'self %':>7}"]
+        for path, entry in sorted(stats.items(), key=lambda item: -item[1]['self_seconds']):
+            lines.append(f"{path:<60} {entry['calls']:>10} {entry['seconds']:>10.4f} {entry['self_seconds']:>10.4f} "
+                         f"{100 * entry['self_seconds'] / total:>6.1f}%")
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """
+        Return the phases as a Chrome trace (chrome://tracing, Perfetto, speedscope)
+        """
+        pid = os.getpid()
+        events = []
+        starts = {}
+        for day, path, start, elapsed in self.spans:
+            starts[day, path] = start
+            events.append({'name': path[-1], 'cat': 'phase', 'ph': 'X', 'ts': start / 1000, 'dur': elapsed / 1000,
+                           'pid': pid, 'tid': 0, 'args': {'day': day, 'path': '/'.join(path)}})
+
+        # Instrumented calls, summed per day, follow each other from the start of their parent's last span
+        spanned = {(day, path) for day, path, _, _ in self.spans}
+        offsets = {}
+        for (day, path), (calls, elapsed) in sorted(self.calls.items(), key=lambda item: len(item[0][1])):
+            parent = (day, path[:-1])
+            if (day, path) in spanned or parent not in starts:
+                continue
+            start = starts[parent] + offsets.get(parent, 0)
+            offsets[parent] = offsets.get(parent, 0) + elapsed
+            starts[day, path] = start
+            events.append({'name': path[-1], 'cat': 'calls', 'ph': 'X', 'ts': start / 1000, 'dur': elapsed / 1000,
+                           'pid': pid, 'tid': 0, 'args': {'day': day, 'path': '/'.join(path), 'calls': calls}})
+        return {'traceEvents': sorted(events, key=lambda event: event['ts']), 'displayTimeUnit': 'ms'}
+
+    def write_chrome_trace(self, path):
+        with open(path, 'w') as trace_file:
+            json.dump(self.chrome_trace(), trace_file)
+
+    def folded(self):
+        """
+        Return the phases as folded stacks ('go;feed;feed_rac microseconds' lines) for flame graph tools
+        """
+        return [f"{path.replace('/', ';')} {round(entry['self_seconds'] * 1e6)}"
+                for path, entry in self.stats().items()]
+
+    def write_folded(self, path):
+        with open(path, 'w') as folded_file:
+            folded_file.write('\n'.join(self.folded()) + '\n')
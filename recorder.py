@@ -0,0 +1,129 @@
+# recorder.py
+
+import numpy as np
+
+from herd import BREEDS
+
+# How a HerdRecorder groups pigs: every pig, mean per breed, or mean per region
+RECORD_MODES = ('pig', 'breed', 'region')
+
+
+class HerdRecorder:
+    """
+    Preallocated, columnar time series of selected PigAgent variables
+
+    Values are written straight into a (days, groups, variables) NumPy buffer, where
+    groups are pig ids in 'pig' mode, breeds in 'breed' mode and regions in 'region'
+    mode. Aggregated modes store the mean over the live pigs of each group, with the
+    number of pigs in counts. Sold pigs and empty groups read as NaN.
+    """
+    def __init__(self, variables, days=140, by='pig', max_pigs=None, num_regions=5, dtype=np.float64):
+        if by not in RECORD_MODES:
+            raise ValueError(f"Unknown recording mode: {by}")
+        self.variables = tuple(variables)
+        self.days = days
+        self.by = by
+        self.max_pigs = max_pigs
+        self.num_regions = num_regions
+        self.dtype = dtype
+        self.data = None
+        self.counts = None
+        self.day_numbers = np.zeros(days, dtype=np.int64)
+        self.length = 0
+
+    def num_groups(self, num_pigs):
+        """
+        Return the size of the group axis for a herd of num_pigs
+        """
+        if self.by == 'pig':
+            return self.max_pigs if self.max_pigs is not None else num_pigs
+        elif self.by == 'breed':
+            return len(BREEDS)
+        return self.num_regions
+
+    def allocate(self, num_pigs):
+        """
+        Allocate the buffers for a herd of num_pigs
+        """
+        groups = self.num_groups(num_pigs)
+        self.data = np.full((self.days, groups, len(self.variables)), np.nan, dtype=self.dtype)
+        self.counts = np.zeros((self.days, groups), dtype=np.int64)
+        self.day_numbers[:] = 0
+        self.length = 0
+
+    def clear(self):
+        """
+        Drop all recorded data; buffers are reallocated on the next record
+        """
+        self.data = None
+        self.counts = None
+        self.day_numbers[:] = 0
+        self.length = 0
+
+    def checkpoint_state(self):
+        """
+        Return the settings and buffers of the recorder as (JSON-serializable values, NumPy arrays)
+        """
+        state = {'variables': list(self.variables), 'days': self.days, 'by': self.by, 'max_pigs': self.max_pigs,
+                 'num_regions': self.num_regions, 'dtype': np.dtype(self.dtype).str, 'length': self.length}
+        arrays = {'day_numbers': self.day_numbers}
+        if self.data is not None:
+            arrays['data'] = self.data
+            arrays['counts'] = self.counts
+        return state, arrays
+
+    @classmethod
+    def from_checkpoint_state(cls, state, arrays):
+        """
+        Return a recorder holding the data of a checkpoint_state
+        """
+        recorder = cls(state['variables'], state['days'], state['by'], state['max_pigs'], state['num_regions'],
+                       np.dtype(state['dtype']))
+        recorder.data = arrays.get('data')
+        recorder.counts = arrays.get('counts')
+        recorder.day_numbers = arrays['day_numbers']
+        recorder.length = state['length']
+        return recorder
+
+    def record(self, day, ids, breeds, regions, columns):
+        """
+        Record one day of the herd
+        ids, breeds (BREEDS index) and regions (1-based) are aligned arrays, one entry per
+        live pig, and columns maps every recorded variable to an aligned array of values
+        """
+        if self.data is None:
+            self.allocate(int(ids.max()) + 1 if len(ids) else 0)
+        if self.length >= self.days:
+            raise ValueError(f"Recorder is full after {self.days} days")
+
+        row = self.length
+        self.day_numbers[row] = day
+        if self.by == 'pig':
+            self.counts[row, ids] = 1
+            for j, name in enumerate(self.variables):
+                self.data[row, ids, j] = columns[name]
+        else:
+            groups = breeds if self.by == 'breed' else regions - 1
+            num_groups = self.data.shape[1]
+            counts = np.bincount(groups, minlength=num_groups)
+            self.counts[row] = counts
+            for j, name in enumerate(self.variables):
+                sums = np.bincount(groups, weights=columns[name], minlength=num_groups)
+                np.divide(sums, counts, out=self.data[row, :, j], where=counts > 0)
+        self.length += 1
+
+    def series(self, variable, group=None):
+        """
+        Return the recorded days and values of a variable
+        With group (a pig id, breed name or region number) returns one group's series,
+        otherwise a (days, groups) array
+        """
+        j = self.variables.index(variable)
+        values = self.data[:self.length, :, j] if self.data is not None else np.empty((0, 0))
+        if group is not None:
+            if self.by == 'breed':
+                group = BREEDS.index(group)
+            elif self.by == 'region':
+                group = group - 1
+            values = values[:, group]
+        return self.day_numbers[:self.length], values
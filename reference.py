@@ -0,0 +1,106 @@
+# reference.py
+
+import numpy as np
+
+from herd import STATE_VARIABLES, VectorizedHerd
+
+
+class ReferenceTrajectories:
+    """
+    Deterministic state trajectories of one breed for a grid of initial weights
+
+    With stochastic weight gain and RAC off, PigAgent.feed makes a pig's state on a
+    given day a smooth function of its breed and initial weight. The grid pigs are
+    integrated once with VectorizedHerd.feed and any other pig's state is read off
+    them by linear interpolation on its initial weight.
+    """
+    def __init__(self, breed, weight_min, weight_max, grid_size, days, environmental_temperature, T,
+                 ME_content, ME_requirements_for_increased_activity_or_genotype_adjustment, Dry_matter,
+                 ferm_fiber_content, sell_weight):
+        self.breed = breed
+        self.weight_min = weight_min
+        self.weight_max = weight_max
+        self.initial_weights = np.linspace(weight_min, weight_max, grid_size)
+        self.days = days
+
+        herd = VectorizedHerd(rng=None)
+        herd.add_pigs(breed, np.ones(grid_size), np.zeros(grid_size), np.zeros(grid_size), self.initial_weights)
+        grid = slice(0, grid_size)
+
+        # states[day, grid point, variable] holds the state after `day` days of feeding
+        self.states = np.empty((days + 1, grid_size, len(STATE_VARIABLES)))
+        self.store(0, herd)
+        for day in range(1, days + 1):
+            herd.feed(breed, grid, environmental_temperature, T, ME_content, None,
+                      ME_requirements_for_increased_activity_or_genotype_adjustment, False, 0, 0,
+                      Dry_matter, ferm_fiber_content, sell_weight)
+            self.store(day, herd)
+
+    @classmethod
+    def from_states(cls, breed, weight_min, weight_max, states):
+        """
+        Return trajectories integrated earlier from their states array, as stored in a checkpoint
+        """
+        references = cls.__new__(cls)
+        references.breed = breed
+        references.weight_min = weight_min
+        references.weight_max = weight_max
+        references.initial_weights = np.linspace(weight_min, weight_max, states.shape[1])
+        references.days = states.shape[0] - 1
+        references.states = states
+        return references
+
+    def store(self, day, herd):
+        herd.evaluate_requirements()
+        for j, name in enumerate(STATE_VARIABLES):
+            self.states[day, :, j] = herd.columns[name]
+
+    def interpolation(self, initial_weights):
+        """
+        Return the grid index and fraction of each initial weight
+        """
+        grid_size = len(self.initial_weights)
+        position = (np.asarray(initial_weights) - self.weight_min) / (self.weight_max - self.weight_min) * (grid_size - 1)
+        index = np.clip(np.floor(position).astype(np.int64), 0, grid_size - 2)
+        return index, position - index
+
+    def values(self, day, variable, index, fraction):
+        """
+        Interpolate a variable on a given day, or on each pig's own day, for pigs at the given grid positions
+        """
+        j = STATE_VARIABLES.index(variable)
+        if np.ndim(day) == 0:
+            column = self.states[day, :, j]
+            return column[index] * (1 - fraction) + column[index + 1] * fraction
+        return self.states[day, index, j] * (1 - fraction) + self.states[day, index + 1, j] * fraction
+
+    def first_day_over(self, variable, threshold, index, fraction):
+        """
+        Return the first day on which an increasing variable exceeds threshold, for each pig
+        Pigs that never exceed it within the trajectories get days + 1
+        """
+        low = np.zeros(len(index), dtype=np.int64)
+        high = np.full(len(index), self.days + 1, dtype=np.int64)
+        # Bisect on days (low is never over, high is over or past the end)
+        while True:
+            open_ = high - low > 1
+            if not open_.any():
+                return np.maximum(high, 1)
+            middle = (low + high) // 2
+            over = open_ & (self.values(np.minimum(middle, self.days), variable, index, fraction) > threshold)
+            high = np.where(over, middle, high)
+            low = np.where(open_ & ~over, middle, low)
+
+    def grid_weights(self, index, fraction):
+        """
+        Return how much each grid point contributes to a herd at the given grid positions
+        """
+        grid_size = len(self.initial_weights)
+        return (np.bincount(index, weights=1 - fraction, minlength=grid_size) +
+                np.bincount(index + 1, weights=fraction, minlength=grid_size))
+
+    def total(self, day, variable, grid_weights):
+        """
+        Sum a variable over a herd described by grid_weights
+        """
+        return float(np.dot(self.states[day, :, STATE_VARIABLES.index(variable)], grid_weights))
@@ -0,0 +1,120 @@
+# rng.py
+
+import math
+
+import numpy as np
+
+# Parameters of the weight gain deviation drawn by PigAgent.random_triangular
+TRIANGULAR_DEVIATION = (-20, 0, 20)
+
+
+def triangular_deviation(U, a=TRIANGULAR_DEVIATION[0], b=TRIANGULAR_DEVIATION[1], c=TRIANGULAR_DEVIATION[2]):
+    """
+    Map uniform draws onto PigAgent.random_triangular deviations
+    """
+    if np.ndim(U) == 0:
+        if U < (c - a) / (b - a):
+            return a + math.sqrt(U * (b - a) * (c - a))
+        return b - math.sqrt((1 - U) * (b - a) * (b - c))
+    U = np.asarray(U, dtype=float)
+    lower = a + np.sqrt(U * (b - a) * (c - a))
+    upper = b - np.sqrt(np.abs((1 - U) * (b - a) * (b - c)))
+    return np.where(U < (c - a) / (b - a), lower, upper)
+
+
+class SimulationRNG:
+    """
+    Random number stream owned by one simulation
+
+    Wraps a numpy Generator seeded from a SeedSequence, so a run can be replayed
+    from its seed and independent child streams can be spawned for parallel runs.
+    Scalar and block draws consume the stream identically, which lets the
+    per-object and vectorized engines share one draw order.
+    """
+    def __init__(self, seed=None):
+        if isinstance(seed, np.random.SeedSequence):
+            self.seed_sequence = seed
+        else:
+            self.seed_sequence = np.random.SeedSequence(seed)
+        self.generator = np.random.default_rng(self.seed_sequence)
+
+    @property
+    def seed(self):
+        """
+        Entropy of the seed sequence, enough to replay this stream
+        """
+        return self.seed_sequence.entropy
+
+    def spawn(self, n):
+        """
+        Return n independent child streams
+        """
+        return [SimulationRNG(child) for child in self.seed_sequence.spawn(n)]
+
+    def random(self, size=None):
+        """
+        Draw uniform numbers in [0, 1)
+        """
+        return self.generator.random(size)
+
+    def uniform(self, low, high, size=None):
+        """
+        Draw uniform numbers in [low, high)
+        """
+        return self.generator.uniform(low, high, size)
+
+    def herd_sizes(self, pigs_per_region, num_breeds):
+        """
+        Draw the number of pigs of each breed in each region, between 0 and the region's maximum
+        Returns a (regions, breeds) integer array
+        """
+        high = np.asarray(pigs_per_region, dtype=np.int64)[:, None] + 1
+        return self.generator.integers(0, high, size=(len(pigs_per_region), num_breeds))
+
+    def triangular(self, size=None, a=TRIANGULAR_DEVIATION[0], b=TRIANGULAR_DEVIATION[1], c=TRIANGULAR_DEVIATION[2]):
+        """
+        Draw weight gain deviations as PigAgent.random_triangular
+        """
+        return triangular_deviation(self.generator.random(size), a, b, c)
+
+    def sell_draws(self, size=None):
+        """
+        Draw integers in [0, 99] compared against the selling rate
+        """
+        return (self.generator.random(size) * 100).astype(np.int64)
+
+    def get_state(self):
+        """
+        Return the bit generator state
+        """
+        return self.generator.bit_generator.state
+
+    def set_state(self, state):
+        """
+        Restore a bit generator state returned by get_state
+        """
+        self.generator.bit_generator.state = state
+
+    def checkpoint_state(self):
+        """
+        Return the seed sequence and bit generator state as JSON-serializable values
+        """
+        seed_sequence = self.seed_sequence
+        return {
+            'entropy': seed_sequence.entropy,
+            'spawn_key': list(seed_sequence.spawn_key),
+            'pool_size': seed_sequence.pool_size,
+            'n_children_spawned': seed_sequence.n_children_spawned,
+            'bit_generator': self.get_state(),
+        }
+
+    @classmethod
+    def from_checkpoint_state(cls, state):
+        """
+        Return a stream continuing exactly where the stream of a checkpoint_state left off
+        """
+        rng = cls(np.random.SeedSequence(state['entropy'], spawn_key=tuple(state['spawn_key']),
+                                         pool_size=state['pool_size'],
+                                         n_children_spawned=state['n_children_spawned']))
+        rng.set_state(state['bit_generator'])
+        return rng
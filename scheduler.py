@@ -0,0 +1,47 @@
+# scheduler.py
+
+import heapq
+
+import numpy as np
+
+# Per-pig events in the order they are handled on the same day
+EVENT_KINDS = ('sale',)
+
+
+class EventQueue:
+    """
+    Priority queue of predicted per-pig events, ordered by day
+
+    Events are (day, kind, pig_id) with kind one of EVENT_KINDS. pop_due returns the
+    pig ids of every event of each kind due by a given day, in id order, which is the
+    herd order the simulation draws random numbers in.
+    """
+    def __init__(self):
+        self.heap = []
+
+    def __len__(self):
+        return len(self.heap)
+
+    def push(self, days, kind, pig_ids):
+        """
+        Schedule an event of one kind for each pig on the matching day
+        """
+        k = EVENT_KINDS.index(kind)
+        events = [(int(day), k, int(pig_id)) for day, pig_id in zip(days, pig_ids)]
+        if len(events) > len(self.heap):
+            self.heap.extend(events)
+            heapq.heapify(self.heap)
+        else:
+            for event in events:
+                heapq.heappush(self.heap, event)
+
+    def pop_due(self, day):
+        """
+        Remove the events due on or before day and return their pig ids by kind
+        """
+        due = {kind: [] for kind in EVENT_KINDS}
+        heap = self.heap
+        while heap and heap[0][0] <= day:
+            _, k, pig_id = heapq.heappop(heap)
+            due[EVENT_KINDS[k]].append(pig_id)
+        return {kind: np.sort(np.array(pig_ids, dtype=np.int64)) for kind, pig_ids in due.items()}
@@ -0,0 +1,246 @@
+# sharded.py
+
+import logging
+import multiprocessing
+import os
+
+import numpy as np
+
+from eventlog import get_logger, log_event, silenced
+from herd import BREEDS
+from simulation import DEFAULT_SCENARIO, create_simulation
+
+logger = get_logger(__name__)
+
+# Scenario keys passed to PigGrowthSimulation.go every day
+DAY_PARAMETERS = (
+    'environmental_temperature', 'T', 'ME_content', 'stochastic_weight_gain',
+    'ME_requirements_for_increased_activity_or_genotype_adjustment', 'RAC', 'RAC_level',
+    'Dry_matter', 'ferm_fiber_content', 'selling_rate',
+)
+
+
+def barn_seeds(num_barns, base_seed=0):
+    """
+    Return independent integer seeds for num_barns barns
+    """
+    children = np.random.SeedSequence(base_seed).spawn(num_barns)
+    return [int(child.generate_state(1)[0]) for child in children]
+
+
+def barn_aggregates(simulation):
+    """
+    Return the day's aggregates of one barn: counts, feed totals and per-breed sums
+    The sums come from the engine's breed_totals, so projected engines never build herd columns.
+    """
+    return {
+        'pig_count': simulation.pig_count(),
+        'sold_count': simulation.sold_count,
+        'total_feed_intake': float(simulation.total_feed_intake),
+        'breed_count': [simulation.breed_count(breed) for breed in BREEDS],
+        'breed_weight': simulation.breed_totals('weight'),
+        'breed_feed_intake': simulation.breed_totals('feed_intake'),
+    }
+
+
+def shard_worker(connection, barns):
+    """
+    Own the simulations of a shard's barns and advance them a day per 'go' message
+    barns is a list of (scenario, seed); replies with one aggregate dict per barn. A barn
+    stops after its scenario's days or when its simulation stops, and is not run again.
+    """
+    simulations = []
+    scenarios = []
+    # Shards only report aggregates, not the per-day status events
+    with silenced():
+        while True:
+            message = connection.recv()
+            if message is None:
+                break
+            command, overrides = message
+            try:
+                if command == 'setup':
+                    scenarios = [dict(DEFAULT_SCENARIO, **scenario) for scenario, seed in barns]
+                    simulations = [create_simulation(scenario, seed) for scenario, (_, seed) in zip(scenarios, barns)]
+                    for simulation, scenario in zip(simulations, scenarios):
+                        simulation.setup(*scenario['pigs_per_region'])
+                    continuing = [True] * len(simulations)
+                    aggregates = [barn_aggregates(simulation) for simulation in simulations]
+                else:
+                    for i, (simulation, scenario) in enumerate(zip(simulations, scenarios)):
+                        if not continuing[i]:
+                            # Finished barns keep their pigs and sales but no longer feed
+                            aggregates[i] = dict(aggregates[i], total_feed_intake=0.0,
+                                                 breed_feed_intake=[0.0] * len(BREEDS))
+                            continue
+                        params = dict(scenario, **overrides)
+                        continuing[i] = (simulation.go(*(params[name] for name in DAY_PARAMETERS)) and
+                                         simulation.days < params['days'])
+                        aggregates[i] = barn_aggregates(simulation)
+                connection.send(('ok', [dict(barn, continuing=flag) for barn, flag in zip(aggregates, continuing)]))
+            except Exception as error:
+                connection.send(('error', repr(error)))
+    connection.close()
+
+
+class ShardedSimulation:
+    """
+    Many barns, each a simulation of num_regions pens, advanced in lockstep across worker processes
+
+    Barns are scenarios (see DEFAULT_SCENARIO) and are dealt round-robin to the shards.
+    Every shard keeps its barns' simulations in its own process and only sends back
+    per-barn aggregates at the end of each day, which the coordinator combines into
+    the same day series PigGrowthSimulation keeps. Each barn has its own seed from
+    barn_seeds, so results do not depend on the number of workers.
+    """
+    def __init__(self, barns, seed=None, max_workers=None):
+        self.barns = [dict(barn) for barn in barns]
+        self.seeds = barn_seeds(len(self.barns), seed)
+        if max_workers is None:
+            max_workers = os.cpu_count() or 1
+        self.num_shards = max(1, min(max_workers, len(self.barns)))
+        self.connections = []
+        self.processes = []
+        self.reset()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def reset(self):
+        """
+        Reset the day counter and the recorded series
+        """
+        self.days = 0
+        self.sold_count = 0
+        self.total_feed_intake = 0
+        self.barn_data = []
+        self.days_data = []
+        self.total_feed_intake_data = []
+        self.pig_count_data = []
+        self.sold_count_data = []
+        self.breed_data = {breed: {'count': [], 'mean_weight': [], 'feed_intake': []} for breed in BREEDS}
+
+    def start(self):
+        """
+        Start the shard processes
+        """
+        self.close()
+        context = multiprocessing.get_context()
+        for shard in range(self.num_shards):
+            barns = [(self.barns[i], self.seeds[i]) for i in range(shard, len(self.barns), self.num_shards)]
+            parent, child = context.Pipe()
+            process = context.Process(target=shard_worker, args=(child, barns), daemon=True)
+            process.start()
+            child.close()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+    def close(self):
+        """
+        Stop the shard processes
+        """
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+
+    def request(self, command, overrides=None):
+        """
+        Send a command to every shard and return the barn aggregates in barn order
+        """
+        for connection in self.connections:
+            connection.send((command, overrides or {}))
+        barn_data = [None] * len(self.barns)
+        for shard, connection in enumerate(self.connections):
+            status, result = connection.recv()
+            if status != 'ok':
+                raise RuntimeError(f"Shard {shard} failed: {result}")
+            for i, aggregates in zip(range(shard, len(self.barns), self.num_shards), result):
+                barn_data[i] = aggregates
+        return barn_data
+
+    def setup(self):
+        """
+        Start the shards and set up every barn
+        """
+        self.reset()
+        self.start()
+        self.barn_data = self.request('setup')
+        log_event(logger, logging.INFO, 'setup',
+                  "Simulation setup complete.\nInitial populations - %(barns)d barns on %(shards)d shards: %(pigs)d pigs",
+                  barns=len(self.barns), shards=self.num_shards, pigs=self.pig_count())
+
+    def go(self, **overrides):
+        """
+        Run one day in every barn
+        Each barn uses its own scenario's day parameters, updated with overrides
+        """
+        self.days += 1
+        self.barn_data = self.request('go', overrides)
+
+        self.sold_count = sum(barn['sold_count'] for barn in self.barn_data)
+        self.total_feed_intake = sum(barn['total_feed_intake'] for barn in self.barn_data)
+
+        # Store data for plotting
+        self.days_data.append(self.days)
+        self.total_feed_intake_data.append(self.total_feed_intake)
+        self.pig_count_data.append(self.pig_count())
+        self.sold_count_data.append(self.sold_count)
+        for i, breed in enumerate(BREEDS):
+            count = sum(barn['breed_count'][i] for barn in self.barn_data)
+            weight = sum(barn['breed_weight'][i] for barn in self.barn_data)
+            data = self.breed_data[breed]
+            data['count'].append(count)
+            data['mean_weight'].append(weight / count if count else float('nan'))
+            data['feed_intake'].append(sum(barn['breed_feed_intake'][i] for barn in self.barn_data))
+
+        log_event(logger, logging.INFO, 'day',
+                  "Day %(day)d: Total pigs = %(pigs)d, Feed intake = %(feed_intake).2f kg, Sold = %(sold)d",
+                  day=self.days, pigs=self.pig_count(), feed_intake=float(self.total_feed_intake),
+                  sold=self.sold_count)
+
+        return any(barn['continuing'] for barn in self.barn_data)
+
+    def pig_count(self):
+        """
+        Return the number of pigs currently in all barns
+        """
+        return sum(barn['pig_count'] for barn in self.barn_data)
+
+    def summary(self):
+        """
+        Return the headline numbers of the run so far
+        """
+        return {
+            'days': self.days,
+            'barns': len(self.barns),
+            'initial_pigs': self.sold_count + self.pig_count(),
+            'sold': self.sold_count,
+            'remaining': self.pig_count(),
+            'total_feed_intake': float(sum(self.total_feed_intake_data)),
+            'final_daily_feed_intake': float(self.total_feed_intake),
+        }
+
+
+def run_sharded(barns, seed=None, days=None, max_workers=None):
+    """
+    Set up and run barns across worker processes until every barn stops
+    days defaults to the longest barn scenario; returns the closed ShardedSimulation
+    """
+    if days is None:
+        days = max(dict(DEFAULT_SCENARIO, **barn)['days'] for barn in barns)
+    with ShardedSimulation(barns, seed, max_workers) as simulation:
+        simulation.setup()
+        for _ in range(days):
+            if not simulation.go():
+                break
+    return simulation
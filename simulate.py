@@ -0,0 +1,128 @@
+# simulate.py
+#
+# Headless entry point: python -m simulate --pigs-per-region 20 20 20 20 20 --rac --quiet
+
+import argparse
+import json
+import os
+import sys
+
+from cache import ResultCache, cached_run
+from checkpoint import load_checkpoint, run_checkpointed
+from eventlog import LOG_LEVELS, configure_logging
+from simulation import DEFAULT_SCENARIO, create_simulation, run_scenario
+
+
+def build_parser():
+    """
+    Build the command line parser; every run_simulation_gui parameter is a flag
+    """
+    parser = argparse.ArgumentParser(prog='python -m simulate', description='Run the pig growth simulation without a GUI.')
+    parser.add_argument('--config', help='JSON file of scenario parameters; flags override it')
+    parser.add_argument('--seed', type=int, help='Seed of the simulation random stream')
+
+    # Basic parameters
+    parser.add_argument('--pigs-per-region', dest='pigs_per_region', type=int, nargs=5, metavar='N',
+                        help='Maximum initial pigs of each breed in regions 1-5')
+    parser.add_argument('--init-weight', dest='init_weight', type=float, help='Initial weight (kg)')
+    parser.add_argument('--sell-weight', dest='sell_weight', type=float, help='Sell weight (kg)')
+    parser.add_argument('--init-weight-rac', dest='init_weight_rac', type=float, help='RAC start weight (kg)')
+    parser.add_argument('--selling-rate', dest='selling_rate', type=int, help='Selling rate (%%)')
+
+    # Environmental parameters
+    parser.add_argument('--temperature', dest='T', type=float, help='Temperature (C)')
+    parser.add_argument('--me-content', dest='ME_content', type=float, help='ME content (kcal/kg)')
+    parser.add_argument('--dry-matter', dest='Dry_matter', type=float, help='Dry matter content')
+    parser.add_argument('--ferm-fiber-content', dest='ferm_fiber_content', type=float,
+                        help='Fermentable fiber content')
+    parser.add_argument('--environmental-temperature', dest='environmental_temperature',
+                        action=argparse.BooleanOptionalAction, help='Consider environmental temperature')
+    parser.add_argument('--stochastic-weight-gain', dest='stochastic_weight_gain',
+                        action=argparse.BooleanOptionalAction, help='Stochastic weight gain')
+
+    # Pig parameters
+    parser.add_argument('--me-activity', dest='ME_requirements_for_increased_activity_or_genotype_adjustment',
+                        type=float, help='ME requirements for activity')
+    parser.add_argument('--rac', dest='RAC', action=argparse.BooleanOptionalAction, help='Use ractopamine (RAC)')
+    parser.add_argument('--rac-level', dest='RAC_level', type=float, help='RAC level (ppm)')
+
+    # Run options
+    parser.add_argument('--days', type=int, help='Maximum number of days to simulate')
+    parser.add_argument('--engine', choices=('vectorized', 'deterministic', 'event', 'object'), help='Herd engine')
+    parser.add_argument('--table-tolerance', dest='table_tolerance', type=float,
+                        help='Use growth curve lookup tables with this relative accuracy (vectorized engines)')
+    parser.add_argument('--cache', help='Directory of cached results; seeded runs seen before are not re-simulated '
+                        '(only the summary is printed, not with --checkpoint)')
+    parser.add_argument('--cache-size', dest='cache_size', type=float, default=256,
+                        help='Maximum size of the result cache (MB)')
+    parser.add_argument('--checkpoint', help='Save the run state to this file every --checkpoint-every days; '
+                        'if it exists, resume the run from it')
+    parser.add_argument('--checkpoint-every', dest='checkpoint_every', type=int, default=10, metavar='N',
+                        help='Days between checkpoints')
+    parser.add_argument('--trace', help='Profile the phases of every day and write a Chrome trace to this file')
+    parser.add_argument('--flamegraph', help='Profile the phases of every day and write folded stacks to this file')
+    parser.add_argument('--quiet', action='store_true', help='Do not print the per-day status lines')
+    parser.add_argument('--log-level', dest='log_level', choices=LOG_LEVELS, default='info',
+                        help='Lowest level of the printed events')
+    parser.add_argument('--log-json', dest='log_json', action='store_true', help='Print events as JSON lines')
+    parser.add_argument('--log-every', dest='log_every', type=int, default=1, metavar='N',
+                        help='Print only one in every N status events of each kind')
+    parser.add_argument('--plot', action='store_true', help='Show the detailed plots after the run')
+    return parser
+
+
+def load_scenario(args):
+    """
+    Merge the config file and the flags into a scenario
+    """
+    scenario = {}
+    if args.config:
+        with open(args.config) as config_file:
+            scenario.update(json.load(config_file))
+    unknown = set(scenario) - set(DEFAULT_SCENARIO)
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+    scenario.update({name: value for name, value in vars(args).items()
+                     if name in DEFAULT_SCENARIO and value is not None})
+    return scenario
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.cache and args.checkpoint:
+        # Cached runs return stored results and never save or resume run state
+        parser.error('--cache cannot be combined with --checkpoint')
+    scenario = load_scenario(args)
+    profile = args.trace or args.flamegraph
+    if args.cache and not args.plot and not profile:
+        result, _ = cached_run(scenario, args.seed, ResultCache(args.cache, int(args.cache_size * 2 ** 20)))
+        print(json.dumps(dict(result['summary'], seed=result['seed'])))
+        return 0
+
+    handler = configure_logging('warning' if args.quiet else args.log_level, args.log_json, args.log_every)
+    resume = args.checkpoint is not None and os.path.exists(args.checkpoint)
+    simulation = load_checkpoint(args.checkpoint) if resume else create_simulation(scenario, args.seed)
+    profiler = simulation.enable_profiling() if profile else None
+
+    if args.checkpoint:
+        run_checkpointed(scenario, simulation, args.checkpoint, args.checkpoint_every, setup=not resume)
+    else:
+        run_scenario(scenario, simulation=simulation)
+    handler.flush()
+
+    print(json.dumps(dict(simulation.summary(), seed=simulation.rng.seed)))
+    if profiler is not None:
+        print(profiler.report(), file=sys.stderr)
+        if args.trace:
+            profiler.write_chrome_trace(args.trace)
+        if args.flamegraph:
+            profiler.write_folded(args.flamegraph)
+
+    if args.plot:
+        simulation.create_plots()
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
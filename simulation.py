@@ -0,0 +1,1736 @@
+import logging
+import math
+
+import numpy as np
+
+from eventlog import get_logger, log_event
+from herd import (BREEDS, RAC_VARIABLES, REQUIREMENT_GROUPS, REQUIREMENT_VARIABLES, STATE_VARIABLES, PigHerd,
+                  VectorizedHerd)
+from profiler import NULL_PROFILER, PhaseProfiler
+from recorder import HerdRecorder
+from reference import ReferenceTrajectories
+from rng import TRIANGULAR_DEVIATION, SimulationRNG
+from scheduler import EventQueue
+from tables import GrowthTables
+
+logger = get_logger(__name__)
+
+# Scenario parameters and their defaults, matching run_simulation_gui
+DEFAULT_SCENARIO = {
+    'pigs_per_region': (5, 5, 5, 5, 5),
+    'init_weight': 20,
+    'sell_weight': 130,
+    'init_weight_rac': 78,
+    'selling_rate': 100,
+    'environmental_temperature': True,
+    'T': 20,
+    'ME_content': 3300,
+    'stochastic_weight_gain': True,
+    'ME_requirements_for_increased_activity_or_genotype_adjustment': 0,
+    'RAC': False,
+    'RAC_level': 5,
+    'Dry_matter': 0.88,
+    'ferm_fiber_content': 0.15,
+    'days': 140,
+    'engine': 'vectorized',
+    'table_tolerance': None,
+}
+
+# Running totals over sold pigs behind the sale means of PigGrowthSimulation.summary
+SALE_TOTALS = ('pigs', 'day', 'final_weight', 'fat_free_lean')
+
+class PigAgent:
+    # Growth state lives in slots; nutrient requirements are REQUIREMENT_GROUPS sub-objects
+    __slots__ = (('breed', 'region', 'pig_id', 'rng', 'profiler', 'requirement_inputs', 'feeds') +
+                 tuple(REQUIREMENT_GROUPS) +
+                 tuple(name for name in STATE_VARIABLES if name not in REQUIREMENT_VARIABLES))
+    
+    def __init__(self, breed, region, x, y, initial_weight=20, *, rng, profiler=NULL_PROFILER):
+        # Basic properties
+        self.breed = breed  # 'gilt', 'barrow', or 'male'
+        self.region = region
+        self.pig_id = None  # Stable id assigned by the simulation
+        self.x = x
+        self.y = y
+        self.rng = rng  # The owning simulation's stream
+        self.profiler = profiler  # The owning simulation's profiler, timing the per-pig phases
+        self.requirement_inputs = None  # Inputs of the last feed needed by the requirement calculations
+        self.weight = initial_weight - 1 + self.rng.uniform(0, 2.0)
+        
+        # Body composition
+        self.BPm = self.weight * 0.18    # Initial whole-body protein mass
+        self.BLm = self.weight * 0.03    # Initial whole-body lipid mass
+        self.init_Gut_fill = 0.277 * self.weight ** 0.612
+        
+        # Pd related properties
+        if breed == 'gilt':
+            self.Pd_max = 149.9799
+            self.BP_at_Pd_max = 11.3016
+        elif breed == 'barrow':
+            self.Pd_max = 145.3477
+            self.BP_at_Pd_max = 10.2483
+        else:  # male
+            self.Pd_max = 165.5064
+            self.BP_at_Pd_max = 13.6612
+            
+        self.init_BLm_BPm = (0.305 - 0.000875 * self.Pd_max) * self.weight ** 0.45
+        self.Prd_1 = 0
+        self.RAC_day = 0
+        
+        # Additional properties required for simulation
+        self.Ash = 0
+        self.Wat = 0
+        self.ME_intake = 0
+        self.ME_intake_rac = 0
+        self.Prd = 0
+        self.maximum_Pd = self.Pd_max
+        self.maximum_pd_after_pd_max_start_decline = 0
+        self.BP_at_maturity = 0
+        self.Rate_constant = 0
+        self.Lid = 0
+        self.feed_intake = 0
+        self.feed_intake_es = 0
+        self.LCT = 0
+        self.Minimum_space_for_maximum_ME_intake = 0
+        self.Fraction_of_ME_intake = 0
+        self.maximum_daily_feed_intake = 0
+        self.standard_maintenance_ME_requirements = 0
+        self.ME_requirements_for_thermogenesis = 0
+        self.Maintenance_ME_requirements = 0
+        self.Gut_fill = 0
+        self.EBW = 0
+        self.PBT = 0
+        self.fat_free_lean = 0
+        self.final_weight = 0
+        self.Pd_by_energy_int = 0
+        
+        # RAC related properties
+        self.BWG_rac = 0
+        self.MEIR = 0
+        self.increase_Pd_rac = 0
+        self.Pd_rac_W = 0
+        self.Pd_rac_d = 0
+        self.RAC_lean_tissue_gain = 0
+        self.rac_PBT = 0
+        
+        # Phosphorus content
+        self.P = 0
+        
+        # Nutrient requirement groups, allocated when first read (see requirement_group)
+        self.feeds = 0
+        self.amino_acids = None
+        self.minerals = None
+        self.vitamins = None
+        self.phosphorus = None
+        
+        # Track weight gain
+        self.weight_gain = 0
+
+    def move(self, region_boundaries, world_width, world_height, angle=None):
+        # Move the pig randomly within its region
+        if angle is None:
+            angle = self.rng.uniform(-30, 30)
+        self.x += 0.4 * math.cos(math.radians(angle))
+        self.y += 0.4 * math.sin(math.radians(angle))
+        
+        # Keep within the region boundaries
+        region_min_x = region_boundaries[self.region-1][0]
+        region_max_x = region_boundaries[self.region-1][1]
+        
+        if self.x < region_min_x:
+            self.x = region_min_x
+        elif self.x > region_max_x:
+            self.x = region_max_x
+            
+        # Keep within world boundaries for y
+        if self.y > world_height - 1:
+            self.y = world_height - 1
+        elif self.y < 1:
+            self.y = 1
+
+    def feed(self, environmental_temperature, T, ME_content, stochastic_weight_gain,
+             ME_requirements_for_increased_activity_or_genotype_adjustment, RAC, 
+             init_weight_rac, RAC_level, Dry_matter, ferm_fiber_content, sell_weight, deviation=None):
+        """
+        Simulate feeding and growth for a pig
+        deviation is the stochastic weight gain deviation, drawn from the pig's stream if not given
+        Returns True if pig should be sold, False otherwise
+        """
+        # Calculate weight gain based on breed
+        if self.breed == 'gilt':
+            if stochastic_weight_gain:
+                base_weight_gain = -0.0477 * self.weight ** 2 + 8.8503 * self.weight + 485.17
+                if deviation is None:
+                    deviation = self.random_triangular(*TRIANGULAR_DEVIATION)
+                self.weight_gain = base_weight_gain + deviation
+            else:
+                self.weight_gain = -0.0477 * self.weight ** 2 + 8.8503 * self.weight + 485.17
+                
+            # Calculate ME intake
+            self.ME_intake = 10967 * (1 - math.exp(-math.exp(-3.803) * self.weight ** 0.9072))
+            
+            # Calculate protein deposition
+            self.Prd = 137 * (0.7066 + 0.013289 * self.weight - 0.0001312 * self.weight ** 2 + 2.8627 * self.weight ** 3 * 10 ** (-7))
+            
+        elif self.breed == 'barrow':
+            if stochastic_weight_gain:
+                base_weight_gain = -0.0765 * self.weight ** 2 + 14.162 * self.weight + 291.23
+                if deviation is None:
+                    deviation = self.random_triangular(*TRIANGULAR_DEVIATION)
+                self.weight_gain = base_weight_gain + deviation
+            else:
+                self.weight_gain = -0.0765 * self.weight ** 2 + 14.162 * self.weight + 291.23
+                
+            # Calculate ME intake
+            self.ME_intake = 10447 * (1 - math.exp(-math.exp(-4.283) * self.weight ** 1.0843))
+            
+            # Calculate protein deposition
+            self.Prd = 133 * (0.7078 + 0.013764 * self.weight - 0.00014211 * self.weight ** 2 + 3.2698 * self.weight ** 3 * 10 ** (-7))
+            
+        else:  # male
+            if stochastic_weight_gain:
+                base_weight_gain = -0.0603 * self.weight ** 2 + 12.043 * self.weight + 335.44 - 20
+                if deviation is None:
+                    deviation = self.random_triangular(*TRIANGULAR_DEVIATION)
+                self.weight_gain = base_weight_gain + deviation
+            else:
+                self.weight_gain = -0.0603 * self.weight ** 2 + 12.043 * self.weight + 335.44
+                
+            # Calculate ME intake
+            self.ME_intake = 10638 * (1 - math.exp(-math.exp(-3.803) * self.weight ** 0.9072))
+            
+            # Calculate protein deposition
+            self.Prd = 151 * (0.6558 + 0.012740 * self.weight - 0.00010390 * self.weight ** 2 + 1.64001 * self.weight ** 3 * 10 ** (-7))
+        
+        # Update weight
+        self.weight += (self.weight_gain / 1000)
+        
+        # Update body composition
+        self.BP_at_maturity = 2.7182 * self.BP_at_Pd_max
+        self.Rate_constant = 2.7182 * self.Pd_max / (self.BP_at_maturity * 1000)
+        
+        # Update protein mass
+        self.BPm += self.Prd / 1000
+        
+        # Calculate maximum protein deposition after Pd max starts to decline
+        self.maximum_pd_after_pd_max_start_decline = self.BPm * 1000 * self.Rate_constant * math.log(self.BP_at_maturity / self.BPm)
+        
+        # Update ash and water content
+        self.Ash = 0.189 * self.BPm
+        self.P = 1.1613 + 26.012 * self.BPm + 0.2299 * self.BPm ** 2
+        self.Wat = (4.322 + 0.0044 * self.Pd_max) * (self.P ** 0.855)
+        
+        # Update Lower Critical Temperature (LCT)
+        self.LCT = 17.9 - (0.0375 * self.weight)
+        
+        # Update space requirements
+        self.Minimum_space_for_maximum_ME_intake = 0.0336 * self.weight ** 0.667
+        
+        # Calculate fraction of ME intake based on temperature
+        self.Fraction_of_ME_intake = 1 - 0.012914 * (T - (self.LCT + 3)) - 0.001179 * (T - (self.LCT + 3)) ** 2
+        
+        # Calculate maximum daily feed intake
+        self.maximum_daily_feed_intake = 111 * (self.weight ** 0.803) * (1.00 + 0.025 * (self.LCT - T))
+        
+        # Calculate standard maintenance ME requirements
+        self.standard_maintenance_ME_requirements = 197 * self.weight ** 0.60
+        
+        # Calculate ME requirements for thermogenesis
+        self.ME_requirements_for_thermogenesis = 0.07425 * (self.LCT - T) * self.standard_maintenance_ME_requirements
+        
+        # Calculate total maintenance ME requirements
+        if environmental_temperature:
+            self.Maintenance_ME_requirements = (self.standard_maintenance_ME_requirements + 
+                                             self.ME_requirements_for_thermogenesis + 
+                                             ME_requirements_for_increased_activity_or_genotype_adjustment)
+        else:
+            self.Maintenance_ME_requirements = (self.standard_maintenance_ME_requirements + 
+                                            ME_requirements_for_increased_activity_or_genotype_adjustment)
+        
+        # Calculate lipid deposition
+        self.Lid = (self.ME_intake - self.Maintenance_ME_requirements - (self.Prd * 10.6)) / 12.5
+        
+        # Update lipid mass
+        self.BLm += self.Lid / 1000
+        
+        # Calculate empty body weight (EBW)
+        self.EBW = self.BPm + self.BLm + self.Wat + self.Ash
+        
+        # Calculate gut fill
+        self.Gut_fill = 0.3043 * self.EBW ** 0.5977
+        
+        # Calculate probe backfat thickness
+        self.PBT = -5 + (12.3 * self.BLm / self.BPm) + (0.13 * self.BPm)
+        
+        # Calculate Pd by energy intake
+        adjustment = 0.001
+        self.Pd_by_energy_int = (30 + (21 + 20 * math.exp((-0.021) * self.weight)) * 
+                               (self.ME_intake - (1.3 * self.Maintenance_ME_requirements)) * 
+                               (self.Pd_max / 125) * (1 + (0.015 * (20 - T)))) * adjustment
+        
+        # Determine maximum Pd
+        if self.Prd > self.Prd_1:
+            self.maximum_Pd = self.Pd_max
+        else:
+            self.maximum_Pd = self.maximum_pd_after_pd_max_start_decline
+        
+        self.Prd_1 = self.Prd
+        
+        # Calculate feed intake based on breed
+        self.update_feed_intake(ME_content)
+        
+        # Apply ractopamine effects if enabled
+        if RAC:
+            with self.profiler.counted('feed_rac'):
+                self.feed_rac(init_weight_rac, RAC_level)
+        
+        # Nutrient requirements are calculated by requirement_group when first read
+        self.feeds += 1
+        self.requirement_inputs = (ferm_fiber_content, Dry_matter)
+        
+        # Check if the pig should be sold
+        if self.weight > sell_weight:
+            self.final_weight = self.weight
+            self.fat_free_lean = 62.073 + 0.0308 * self.final_weight - 1.0101 * self.PBT + 0.00774 * self.PBT ** 2
+            return True
+        
+        return False
+    
+    def random_triangular(self, a, b, c):
+        """
+        Generate a random number from a triangular distribution
+        """
+        U = self.rng.random()
+        if U < (c - a) / (b - a):
+            return a + math.sqrt(U * (b - a) * (c - a))
+        else:
+            return b - math.sqrt((1 - U) * (b - a) * (b - c))
+    
+    def update_feed_intake(self, ME_content):
+        """
+        Update feed intake based on pig breed
+        """
+        if self.breed == 'gilt':
+            self.feed_intake_es = 1.053 * self.ME_intake / ME_content
+            self.feed_intake = 2.755 * (1 - (math.exp(-math.exp(-4.755) * (self.weight ** 1.214))))
+        elif self.breed == 'barrow':
+            self.feed_intake_es = 1.053 * self.ME_intake / ME_content
+            self.feed_intake = 2.88 * (1 - (math.exp(-math.exp(-5.921) * (self.weight ** 1.512))))
+        else:  # male
+            self.feed_intake = 1.053 * self.ME_intake / ME_content
+    
+    def feed_rac(self, init_weight_rac, RAC_level):
+        """
+        Apply ractopamine effects if the pig is heavy enough and has been on RAC for less than 28 days
+        """
+        if self.RAC_day < 28:
+            if self.weight > init_weight_rac:
+                self.BWG_rac = self.weight - init_weight_rac
+                
+                # Calculate MEIR (proportional reduction in ME intake)
+                self.MEIR = -0.191263 + (0.019013 * self.BWG_rac) - (0.000443 * self.BWG_rac ** 2) + (0.000003539 * self.BWG_rac ** 3)
+                
+                # Calculate ME intake with RAC
+                self.ME_intake_rac = (1 - (self.MEIR * (RAC_level / 20) ** 0.7)) * self.ME_intake
+                
+                # Calculate increase in Pd due to RAC
+                self.increase_Pd_rac = 0.33 * ((RAC_level / 20) ** 0.33)
+                
+                # Calculate Pd_rac_W and Pd_rac_d
+                self.Pd_rac_W = (1.73 + (0.00776 * self.BWG_rac) - 
+                                (0.00205 * self.BWG_rac ** 2) + 
+                                (0.000017 * self.BWG_rac ** 3) + 
+                                (((0.1 * RAC_level) - 1) * (self.BWG_rac * 0.001875)))
+                
+                self.Pd_rac_d = (1.714 + (0.01457 * self.RAC_day) - 
+                                (0.00361 * self.RAC_day ** 2) + 
+                                (0.000055 * self.RAC_day ** 3))
+                
+                # Calculate RAC-induced lean tissue gain
+                self.RAC_lean_tissue_gain = self.Pd_rac_W / 0.2
+                
+                # Calculate probe backfat thickness adjusted for RAC
+                self.rac_PBT = self.PBT * (1 + 0.05 * self.RAC_day / 10) * ((RAC_level / 20) ** 0.7)
+                
+                # Increment RAC day
+                self.RAC_day += 1
+    
+    def requirement_group(self, group, update=True):
+        """
+        Return a REQUIREMENT_GROUPS sub-object, allocating it on first use
+        With update, recalculates it if the pig has been fed since it was last calculated
+        """
+        values = getattr(self, group)
+        if values is None:
+            values = REQUIREMENT_CLASSES[group]()
+            setattr(self, group, values)
+        if update and values.feeds != self.feeds:
+            values.feeds = self.feeds
+            ferm_fiber_content, Dry_matter = self.requirement_inputs
+            if group == 'amino_acids':
+                with self.profiler.counted('calculate_amino_acid_requirements'):
+                    self.calculate_amino_acid_requirements(ferm_fiber_content)
+            elif group == 'minerals':
+                with self.profiler.counted('calculate_minerals'):
+                    self.calculate_minerals()
+            elif group == 'vitamins':
+                with self.profiler.counted('calculate_vitamins'):
+                    self.calculate_vitamins()
+            else:
+                with self.profiler.counted('calculate_phosphorus_requirements'):
+                    self.calculate_phosphorus_requirements(Dry_matter)
+        return values
+    
+    def calculate_amino_acid_requirements(self, ferm_fiber_content):
+        """
+        Calculate amino acid requirements
+        """
+        # Lysine requirements
+        self.GIT_lys_loss = self.feed_intake * (0.417 / 1000) * 0.88 * 1.1
+        self.Integu_lys_loss = 0.0045 * self.weight ** 0.75
+        self.SID_lys_for_GIT = (self.GIT_lys_loss + self.Integu_lys_loss) / (0.75 + 0.002 * (self.maximum_Pd - 147.7))
+        self.lys_in_Pd = (self.Prd * 0.0710) + (self.Pd_rac_W * 0.0822)
+        self.SID_lys_for_pd = (self.lys_in_Pd / (0.75 + (0.002 * (self.maximum_Pd - 147.7)))) * (1 + 0.0547 + (0.002215 * self.weight))
+        self.SID_lys = self.SID_lys_for_GIT + self.SID_lys_for_pd
+        self.Ferm_SID_thr = (self.feed_intake / 1000) * ferm_fiber_content * 0.0042
+        
+        # Calculate other amino acids based on SID_lys
+        self.Arg = self.SID_lys * 0.457
+        self.His = self.SID_lys * 0.344
+        self.Ile = self.SID_lys * 0.522
+        self.Leu = self.SID_lys * 1.007
+        self.Met = self.SID_lys * 0.289
+        self.Meth_cys = self.SID_lys * 0.564
+        self.Phe = self.SID_lys * 0.597
+        self.Phe_tyr = self.SID_lys * 0.938
+        self.Thr = self.SID_lys * 0.603
+        self.Trp = self.SID_lys * 0.171
+        self.Val = self.SID_lys * 0.649
+        self.Nit = self.SID_lys * 2.148
+    
+    def calculate_minerals(self):
+        """
+        Calculate mineral requirements
+        """
+        weight_ln = math.log(self.weight)
+        self.Sodium = -2.5588 + 1.1335 * weight_ln
+        self.Chlorine = -2.0706 + 0.9068 * weight_ln
+        self.Magnesium = -1.0353 + 0.4534 * weight_ln
+        self.Potassium = -0.4591 + 1.0774 * weight_ln
+        self.Copper = -0.8705 + 1.9286 * weight_ln
+        self.Iodine = -0.3624 + 0.1587 * weight_ln
+        self.Iron = 34.357 + 15.904 * weight_ln
+        self.Manganese = -5.1766 + 2.2669 * weight_ln
+        self.Selenium = -0.0924 + 0.1048 * weight_ln
+        self.Zinc = -70.251 + 43.634 * weight_ln
+    
+    def calculate_vitamins(self):
+        """
+        Calculate vitamin requirements
+        """
+        weight_ln = math.log(self.weight)
+        self.Vit_A = -3364.8 + 1473.5 * weight_ln
+        self.Vit_D3 = -388.24 + 170.02 * weight_ln
+        self.Vit_E = -28.471 + 12.468 * weight_ln
+        self.Vit_K = -1.2941 + 0.5667 * weight_ln
+        self.Biotin = -0.1294 + 0.0567 * weight_ln
+        self.Choline = -0.7765 + 0.34 * weight_ln
+        self.Folacin = -0.7765 + 0.34 * weight_ln
+        self.Niacin = -77.649 + 34.004 * weight_ln
+        self.Pantothenic_acid = -12.202 + 6.6304 * weight_ln
+        self.Riboflavin = -2.2184 + 1.615 * weight_ln
+        self.Thiamin = -2.5883 + 1.1335 * weight_ln
+        self.Vit_B6 = -2.5883 + 1.1335 * weight_ln
+        self.Vit_B12 = 16.64 + (-0.852) * weight_ln
+        self.Linoleic_acid = -2.5883 + 1.1335 * weight_ln
+    
+    def calculate_phosphorus_requirements(self, Dry_matter):
+        """
+        Calculate phosphorus and calcium requirements
+        """
+        # Set maximum P retention based on breed
+        if self.breed == 'gilt':
+            self.maximum_P_retention = 3.824
+        elif self.breed == 'barrow':
+            self.maximum_P_retention = 3.550
+        else:  # male
+            self.maximum_P_retention = 4.610
+        
+        self.feed_dry_intake = self.feed_intake * Dry_matter
+        self.STTD_P = 0.85 * ((self.maximum_P_retention / 0.77) + 0.19 * self.feed_dry_intake + 0.007 * self.weight)
+        self.Total_Ca = self.STTD_P * 2.15
+
+
+class RequirementGroup:
+    """
+    Block of PigAgent nutrient requirements, allocated the first time one of them is read
+    feeds is the PigAgent.feeds count the values were calculated for
+    """
+    __slots__ = ('feeds',)
+    
+    def __init__(self):
+        self.feeds = 0
+        for name in self.__slots__:
+            setattr(self, name, 0)
+
+
+class AminoAcidRequirements(RequirementGroup):
+    __slots__ = REQUIREMENT_GROUPS['amino_acids']
+
+
+class MineralRequirements(RequirementGroup):
+    __slots__ = REQUIREMENT_GROUPS['minerals']
+
+
+class VitaminRequirements(RequirementGroup):
+    __slots__ = REQUIREMENT_GROUPS['vitamins']
+
+
+class PhosphorusRequirements(RequirementGroup):
+    __slots__ = REQUIREMENT_GROUPS['phosphorus']
+
+
+REQUIREMENT_CLASSES = {
+    'amino_acids': AminoAcidRequirements,
+    'minerals': MineralRequirements,
+    'vitamins': VitaminRequirements,
+    'phosphorus': PhosphorusRequirements,
+}
+
+
+class LazyRequirement:
+    """
+    PigAgent nutrient requirement attribute, stored in its requirement group
+    """
+    def __init__(self, name, group):
+        self.name = name
+        self.group = group
+    
+    def __get__(self, pig, owner=None):
+        if pig is None:
+            return self
+        return getattr(pig.requirement_group(self.group), self.name)
+    
+    def __set__(self, pig, value):
+        setattr(pig.requirement_group(self.group, update=False), self.name, value)
+
+
+for group, names in REQUIREMENT_GROUPS.items():
+    for name in names:
+        setattr(PigAgent, name, LazyRequirement(name, group))
+del group, names, name
+
+
+class PigGrowthSimulation:
+    def __init__(self, seed=None):
+        # Random number stream owned by this simulation; the same seed replays the same run
+        self.rng = SimulationRNG(seed)
+        
+        # Simulation parameters
+        self.init_weight = 20
+        self.sell_weight = 130
+        self.total_feed_intake = 0
+        self.init_weight_rac = 78
+        self.days = 0
+        self.sold_count = 0
+        
+        # Configure world and regions
+        self.world_width = 30  # equivalent to max-pxcor - min-pxcor + 1
+        self.world_height = 30  # equivalent to max-pycor - min-pycor + 1
+        self.num_regions = 5
+        self.region_boundaries = self.calculate_region_boundaries(self.num_regions)
+        
+        # Pig agents by breed and region
+        self.herd = PigHerd(self.num_regions)
+        
+        # Data for plotting
+        self.days_data = []
+        self.total_feed_intake_data = []
+        self.pig_count_data = []
+        self.sold_count_data = []
+        
+        # Data for individual pig tracking
+        self.tracked_pig_data = {
+            'gilt': {'weight': [], 'feed_intake': [], 'ME_intake': [], 'Prd': [], 'Lid': [], 'BPm': [], 'BLm': [], 'PBT': [], 'weight_gain': [], 'SID_lys': []},
+            'barrow': {'weight': [], 'feed_intake': [], 'ME_intake': [], 'Prd': [], 'Lid': [], 'BPm': [], 'BLm': [], 'PBT': [], 'weight_gain': [], 'SID_lys': []},
+            'male': {'weight': [], 'feed_intake': [], 'ME_intake': [], 'Prd': [], 'Lid': [], 'BPm': [], 'BLm': [], 'PBT': [], 'weight_gain': [], 'SID_lys': []}
+        }
+        
+        # Track specific pigs
+        self.tracked_gilt = None
+        self.tracked_barrow = None
+        self.tracked_male = None
+        
+        # Recorders capturing selected variables for the whole herd every day
+        self.recorders = []
+        
+        # Phase timings of go(), recorded once enable_profiling is called
+        self.profiler = NULL_PROFILER
+    
+    def calculate_region_boundaries(self, num_regions):
+        """
+        Calculate the boundaries of each region
+        Returns a list of [min_x, max_x] for each region
+        """
+        region_width = self.world_width / num_regions
+        boundaries = []
+        
+        for i in range(num_regions):
+            min_x = -self.world_width/2 + i * region_width
+            max_x = min_x + region_width - 1
+            boundaries.append([min_x, max_x])
+        
+        return boundaries
+    
+    def setup(self, pig_R1, pig_R2, pig_R3, pig_R4, pig_R5):
+        """
+        Initialize the simulation
+        """
+        self.reset()
+        
+        # Create initial populations of pigs in each region
+        pigs_per_region = [pig_R1, pig_R2, pig_R3, pig_R4, pig_R5]
+        
+        # Draw how many pigs of each breed start in each region
+        herd_sizes = self.rng.herd_sizes(pigs_per_region, len(BREEDS))
+        new_pigs = {breed: [] for breed in BREEDS}
+        
+        for region_num, region_sizes in enumerate(herd_sizes.tolist(), 1):
+            for breed, num_pigs in zip(BREEDS, region_sizes):
+                for _ in range(num_pigs):
+                    x = self.rng.uniform(self.region_boundaries[region_num-1][0], self.region_boundaries[region_num-1][1])
+                    y = self.rng.uniform(-self.world_height/2 + 1, self.world_height/2 - 1)
+                    pig = PigAgent(breed, region_num, x, y, self.init_weight, rng=self.rng, profiler=self.profiler)
+                    new_pigs[breed].append(pig)
+        
+        # Add pigs in herd order so ids match VectorizedHerd
+        for breed in BREEDS:
+            for pig in new_pigs[breed]:
+                self.herd.add(pig)
+        gilts, barrows, males = (self.breed_list(breed) for breed in BREEDS)
+        
+        # Set up tracked pigs (one of each breed if available)
+        if gilts:
+            self.tracked_gilt = gilts[0]
+        if barrows:
+            self.tracked_barrow = barrows[0]
+        if males:
+            self.tracked_male = males[0]
+        
+        self.log_setup()
+    
+    def reset(self):
+        """
+        Reset simulation variables, pig lists and recorded data
+        """
+        # Reset simulation variables
+        self.days = 0
+        self.sold_count = 0
+        self.total_feed_intake = 0
+        self.sale_totals = dict.fromkeys(SALE_TOTALS, 0.0)
+        
+        # Clear the herd
+        self.herd = PigHerd(self.num_regions)
+        
+        # Clear data for plotting
+        self.days_data = []
+        self.total_feed_intake_data = []
+        self.pig_count_data = []
+        self.sold_count_data = []
+        
+        # Reset tracked pig data
+        for breed in self.tracked_pig_data:
+            for data_type in self.tracked_pig_data[breed]:
+                self.tracked_pig_data[breed][data_type] = []
+        for recorder in self.recorders:
+            recorder.clear()
+    
+    def go(self, environmental_temperature, T, ME_content, stochastic_weight_gain, 
+           ME_requirements_for_increased_activity_or_genotype_adjustment, RAC, 
+           RAC_level, Dry_matter, ferm_fiber_content, selling_rate=100):
+        """
+        Run one day of the simulation
+        """
+        self.days += 1
+        profiler = self.profiler
+        
+        with profiler.phase('go', self.days):
+            pigs = list(self.herd)
+            
+            # Move all pigs, drawing the day's headings in one call
+            with profiler.phase('move'):
+                angles = self.rng.uniform(-30, 30, len(pigs)).tolist()
+                for pig, angle in zip(pigs, angles):
+                    pig.move(self.region_boundaries, self.world_width, self.world_height, angle)
+            
+            # Feed all pigs and find those over the sell weight
+            with profiler.phase('feed'):
+                # Draw the day's weight gain deviations for the whole herd in one call
+                if stochastic_weight_gain:
+                    deviations = self.rng.triangular(len(pigs)).tolist()
+                else:
+                    deviations = [None] * len(pigs)
+                
+                over_sell_weight = []
+                for pig, deviation in zip(pigs, deviations):
+                    if pig.feed(environmental_temperature, T, ME_content, stochastic_weight_gain,
+                                ME_requirements_for_increased_activity_or_genotype_adjustment, RAC,
+                                self.init_weight_rac, RAC_level, Dry_matter, ferm_fiber_content, self.sell_weight,
+                                deviation):
+                        over_sell_weight.append(pig)
+            
+            # Sell pigs over the sell weight, with one sale draw each in a single call
+            with profiler.phase('sell'):
+                sell_draws = self.rng.sell_draws(len(over_sell_weight)).tolist()
+                sold_pigs = [pig for pig, draw in zip(over_sell_weight, sell_draws) if draw < selling_rate]
+                self.sold_count += len(sold_pigs)
+                self.record_sales([pig.final_weight for pig in sold_pigs], [pig.fat_free_lean for pig in sold_pigs])
+                
+                # Remove sold pigs in one pass
+                self.herd.remove(sold_pigs)
+            
+            with profiler.phase('record'):
+                # Calculate total feed intake
+                self.total_feed_intake = sum(pig.feed_intake for pig in self.herd)
+                
+                # Store data for plotting
+                self.days_data.append(self.days)
+                self.total_feed_intake_data.append(self.total_feed_intake)
+                self.pig_count_data.append(self.pig_count())
+                self.sold_count_data.append(self.sold_count)
+                
+                # Store data for tracked pigs and recorders
+                self.record_tracked_pigs()
+                self.record_herd()
+            
+            with profiler.phase('log'):
+                self.log_day()
+        
+        # Check if simulation should end
+        if self.days >= 140:
+            return False
+        return True
+    
+    def log_setup(self):
+        """
+        Log the initial population of every breed
+        """
+        log_event(logger, logging.INFO, 'setup',
+                  "Simulation setup complete.\nInitial populations - Gilts: %(gilts)d, Barrows: %(barrows)d, "
+                  "Males: %(males)d", **{f"{breed}s": self.breed_count(breed) for breed in BREEDS})
+    
+    def log_day(self):
+        """
+        Log the status of the day just simulated
+        """
+        log_event(logger, logging.INFO, 'day',
+                  "Day %(day)d: Total pigs = %(pigs)d, Feed intake = %(feed_intake).2f kg, Sold = %(sold)d",
+                  day=self.days, pigs=self.pig_count(), feed_intake=float(self.total_feed_intake),
+                  sold=self.sold_count)
+    
+    def pig_count(self):
+        """
+        Return the number of pigs currently in the herd
+        """
+        return len(self.herd)
+    
+    def summary(self):
+        """
+        Return the headline numbers of the run so far
+        """
+        return {
+            'days': self.days,
+            'initial_pigs': self.sold_count + self.pig_count(),
+            'sold': self.sold_count,
+            'remaining': self.pig_count(),
+            'total_feed_intake': float(sum(self.total_feed_intake_data)),
+            'final_daily_feed_intake': float(self.total_feed_intake),
+            'mean_sale_day': self.sale_mean('day'),
+            'mean_final_weight': self.sale_mean('final_weight'),
+            'mean_fat_free_lean': self.sale_mean('fat_free_lean'),
+        }
+    
+    def record_sales(self, final_weight, fat_free_lean):
+        """
+        Add the pigs sold today, given their sale weights and fat-free lean, to sale_totals
+        """
+        count = len(final_weight)
+        if count:
+            self.sale_totals['pigs'] += count
+            self.sale_totals['day'] += count * self.days
+            self.sale_totals['final_weight'] += float(np.sum(final_weight))
+            self.sale_totals['fat_free_lean'] += float(np.sum(fat_free_lean))
+    
+    def sale_mean(self, name):
+        """
+        Return the mean of a sale total over the pigs sold so far, or NaN if none were sold
+        """
+        pigs = self.sale_totals['pigs']
+        return self.sale_totals[name] / pigs if pigs else float('nan')
+    
+    def breed_list(self, breed):
+        """
+        Return the list holding the pigs of a breed
+        """
+        return self.herd.breed(breed)
+    
+    def breed_count(self, breed):
+        """
+        Return the number of pigs of a breed in the herd
+        """
+        return len(self.breed_list(breed))
+    
+    def breed_totals(self, variable):
+        """
+        Return the sum of a state variable over the pigs of each breed, in BREEDS order
+        """
+        return [float(sum(getattr(pig, variable) for pig in self.breed_list(breed))) for breed in BREEDS]
+    
+    def display_pig_info(self):
+        """
+        Display information about tracked pigs
+        """
+        for breed, pig in self.tracked_pigs().items():
+            print(f"\nTracked {breed.capitalize()} Information:")
+            print(f"Weight: {pig.weight:.2f} kg")
+            print(f"ME intake: {pig.ME_intake:.2f} kcal/day")
+            print(f"Pd: {pig.Prd:.2f} g/day")
+            print(f"Ld: {pig.Lid:.2f} g/day")
+            print(f"BP: {pig.BPm:.2f} kg")
+            print(f"BL: {pig.BLm:.2f} kg")
+            print(f"Feed intake: {pig.feed_intake:.2f} kg")
+    
+    def tracked_pigs(self):
+        """
+        Return the tracked pigs still in the herd, keyed by breed
+        """
+        tracked = {}
+        if self.tracked_gilt in self.herd:
+            tracked['gilt'] = self.tracked_gilt
+        if self.tracked_barrow in self.herd:
+            tracked['barrow'] = self.tracked_barrow
+        if self.tracked_male in self.herd:
+            tracked['male'] = self.tracked_male
+        return tracked
+    
+    def record_tracked_pigs(self):
+        """
+        Append the current values of the tracked pigs to tracked_pig_data
+        """
+        for breed, pig in self.tracked_pigs().items():
+            for data_type, values in self.tracked_pig_data[breed].items():
+                values.append(getattr(pig, data_type))
+    
+    def enable_profiling(self, profiler=None):
+        """
+        Record the wall time and calls of every phase of go() in a PhaseProfiler, which is returned
+        """
+        self.profiler = profiler if profiler is not None else PhaseProfiler()
+        self.share_profiler()
+        return self.profiler
+    
+    def disable_profiling(self):
+        """
+        Stop recording phase timings
+        """
+        self.profiler = NULL_PROFILER
+        self.share_profiler()
+    
+    def share_profiler(self):
+        """
+        Give the pigs the simulation's profiler, so each simulation only times its own pigs
+        """
+        for pig in self.herd:
+            pig.profiler = self.profiler
+    
+    def add_recorder(self, recorder):
+        """
+        Attach a HerdRecorder that captures the herd after every day
+        """
+        self.recorders.append(recorder)
+        return recorder
+    
+    def record_herd(self):
+        """
+        Write the current herd into every attached recorder
+        """
+        if not self.recorders:
+            return
+        variables = {name for recorder in self.recorders for name in recorder.variables}
+        ids, breeds, regions, columns = self.herd_columns(variables)
+        for recorder in self.recorders:
+            recorder.record(self.days, ids, breeds, regions, columns)
+    
+    def herd_columns(self, variables):
+        """
+        Gather pig ids, breed indices, regions and the given variables as aligned arrays
+        """
+        pigs = list(self.herd)
+        ids = np.fromiter((pig.pig_id for pig in pigs), dtype=np.int64, count=len(pigs))
+        breeds = np.fromiter((BREEDS.index(pig.breed) for pig in pigs), dtype=np.int64, count=len(pigs))
+        regions = np.fromiter((pig.region for pig in pigs), dtype=np.int64, count=len(pigs))
+        columns = {name: np.fromiter((getattr(pig, name) for pig in pigs), dtype=float, count=len(pigs))
+                   for name in variables}
+        return ids, breeds, regions, columns
+    
+    def checkpoint_state(self):
+        """
+        Return the full state of the simulation as (JSON-serializable values, nested dicts of NumPy arrays)
+        restore_state continues a new simulation of the same class from them, see checkpoint.py
+        """
+        state = {name: getattr(self, name) for name in ('init_weight', 'sell_weight', 'init_weight_rac', 'days',
+                                                         'sold_count', 'total_feed_intake', 'world_width',
+                                                         'world_height', 'num_regions')}
+        state['rng'] = self.rng.checkpoint_state()
+        state['sale_totals'] = dict(self.sale_totals)
+        state['tracked_pig_data'] = {breed: list(data) for breed, data in self.tracked_pig_data.items()}
+        arrays = {
+            'days_data': np.array(self.days_data, dtype=np.int64),
+            'total_feed_intake_data': np.array(self.total_feed_intake_data, dtype=float),
+            'pig_count_data': np.array(self.pig_count_data, dtype=np.int64),
+            'sold_count_data': np.array(self.sold_count_data, dtype=np.int64),
+            'tracked_pig_data': {breed: {name: np.array(values, dtype=float) for name, values in data.items()}
+                                 for breed, data in self.tracked_pig_data.items()},
+            'recorders': {},
+        }
+        state['recorders'] = []
+        for i, recorder in enumerate(self.recorders):
+            recorder_state, arrays['recorders'][str(i)] = recorder.checkpoint_state()
+            state['recorders'].append(recorder_state)
+        state['herd'], arrays['herd'] = self.herd_state()
+        return state, arrays
+    
+    def restore_state(self, state, arrays):
+        """
+        Continue from the state returned by checkpoint_state
+        """
+        self.rng = SimulationRNG.from_checkpoint_state(state['rng'])
+        for name in ('init_weight', 'sell_weight', 'init_weight_rac', 'days', 'sold_count', 'total_feed_intake',
+                     'world_width', 'world_height', 'num_regions'):
+            setattr(self, name, state[name])
+        self.region_boundaries = self.calculate_region_boundaries(self.num_regions)
+        self.sale_totals = dict(state['sale_totals'])
+        for name in ('days_data', 'total_feed_intake_data', 'pig_count_data', 'sold_count_data'):
+            setattr(self, name, arrays[name].tolist())
+        self.tracked_pig_data = {breed: {name: arrays['tracked_pig_data'][breed][name].tolist() for name in names}
+                                 for breed, names in state['tracked_pig_data'].items()}
+        self.recorders = [HerdRecorder.from_checkpoint_state(recorder_state, arrays['recorders'][str(i)])
+                          for i, recorder_state in enumerate(state['recorders'])]
+        self.restore_herd(state['herd'], arrays['herd'])
+    
+    def herd_state(self):
+        """
+        Return the pigs of the herd as (JSON-serializable values, NumPy arrays) for checkpoint_state
+        Every PigAgent slot is a column in herd order; requirement groups are stored for the pigs that have them.
+        """
+        pigs = list(self.herd)
+        state = {'next_id': self.herd.next_id,
+                 'tracked_ids': {breed: pig.pig_id for breed, pig in self.tracked_pigs().items()}}
+        arrays = {
+            'ids': np.array([pig.pig_id for pig in pigs], dtype=np.int64),
+            'breed': np.array([BREEDS.index(pig.breed) for pig in pigs], dtype=np.int8),
+            'region': np.array([pig.region for pig in pigs], dtype=np.int64),
+            'feeds': np.array([pig.feeds for pig in pigs], dtype=np.int64),
+            'has_requirement_inputs': np.array([pig.requirement_inputs is not None for pig in pigs], dtype=bool),
+            'requirement_inputs': np.array([pig.requirement_inputs or (math.nan, math.nan) for pig in pigs],
+                                           dtype=float).reshape(-1, 2),
+            # Slots keep their type: columns of ints (such as RAC_day) stay int64
+            'state': {name: np.array([getattr(pig, name) for pig in pigs])
+                      for name in STATE_VARIABLES if name not in REQUIREMENT_VARIABLES},
+        }
+        for group, names in REQUIREMENT_GROUPS.items():
+            values = [getattr(pig, group) for pig in pigs]
+            present = [requirements for requirements in values if requirements is not None]
+            arrays[group] = {name: np.array([getattr(requirements, name) for requirements in present], dtype=float)
+                             for name in names}
+            arrays[group]['present'] = np.array([requirements is not None for requirements in values], dtype=bool)
+            arrays[group]['feeds'] = np.array([requirements.feeds for requirements in present], dtype=np.int64)
+        return state, arrays
+    
+    def restore_herd(self, state, arrays):
+        """
+        Rebuild the herd and tracked pigs from the values returned by herd_state
+        """
+        self.herd = PigHerd(self.num_regions)
+        ids = arrays['ids'].tolist()
+        breeds = arrays['breed'].tolist()
+        regions = arrays['region'].tolist()
+        feeds = arrays['feeds'].tolist()
+        has_inputs = arrays['has_requirement_inputs'].tolist()
+        inputs = arrays['requirement_inputs'].tolist()
+        columns = [(name, values.tolist()) for name, values in arrays['state'].items()]
+        pigs = []
+        for i, pig_id in enumerate(ids):
+            pig = PigAgent.__new__(PigAgent)
+            pig.breed = BREEDS[breeds[i]]
+            pig.region = regions[i]
+            pig.rng = self.rng
+            pig.profiler = self.profiler
+            pig.feeds = feeds[i]
+            pig.requirement_inputs = tuple(inputs[i]) if has_inputs[i] else None
+            for group in REQUIREMENT_GROUPS:
+                setattr(pig, group, None)
+            for name, values in columns:
+                setattr(pig, name, values[i])
+            self.herd.add(pig, pig_id)
+            pigs.append(pig)
+        self.herd.next_id = state['next_id']
+        
+        for group, names in REQUIREMENT_GROUPS.items():
+            group_arrays = arrays[group]
+            group_values = [(name, group_arrays[name].tolist()) for name in names]
+            group_feeds = group_arrays['feeds'].tolist()
+            for j, i in enumerate(np.flatnonzero(group_arrays['present']).tolist()):
+                requirements = REQUIREMENT_CLASSES[group]()
+                requirements.feeds = group_feeds[j]
+                for name, values in group_values:
+                    setattr(requirements, name, values[j])
+                setattr(pigs[i], group, requirements)
+        
+        tracked_ids = state['tracked_ids']
+        self.tracked_gilt = self.herd.get(tracked_ids.get('gilt'))
+        self.tracked_barrow = self.herd.get(tracked_ids.get('barrow'))
+        self.tracked_male = self.herd.get(tracked_ids.get('male'))
+    
+    def create_plots(self):
+        """
+        Create and display plots for the simulation results
+        """
+        # Imported here so headless runs never load matplotlib
+        import matplotlib.pyplot as plt
+        from plots import ADDITIONAL_PANELS, RESULT_PANELS, LivePlot, simulation_series
+        
+        series = simulation_series(self)
+        for title, panels, rows, figsize in (('Pig Growth Simulation Results', RESULT_PANELS, 2, (15, 10)),
+                                             ('Additional Pig Growth Metrics', ADDITIONAL_PANELS, 1, (15, 5))):
+            fig = plt.figure(figsize=figsize)
+            fig.suptitle(title, fontsize=16)
+            plot = LivePlot(fig, panels, rows, 3)
+            plt.tight_layout(rect=[0, 0, 1, 0.95])
+            plot.update(series)
+            plt.show()
+
+
+
+class VectorizedPigGrowthSimulation(PigGrowthSimulation):
+    """
+    PigGrowthSimulation backed by a NumPy VectorizedHerd instead of PigAgent objects
+    Gives the same results as PigGrowthSimulation for the same random seed
+    """
+    def __init__(self, seed=None, tables=None):
+        super().__init__(seed)
+        # Optional GrowthTables replacing the weight formulas of the feed chain by lookups
+        self.tables = tables
+        self.herd = VectorizedHerd(self.rng, tables)
+        self.tracked_ids = {}
+    
+    def share_profiler(self):
+        """
+        Give the herd the simulation's profiler
+        """
+        self.herd.profiler = self.profiler
+    
+    def setup(self, pig_R1, pig_R2, pig_R3, pig_R4, pig_R5):
+        """
+        Initialize the simulation
+        """
+        self.reset()
+        self.herd = VectorizedHerd(self.rng, self.tables, self.profiler)
+        
+        # Draw herd sizes, positions and initial weights in the same order as PigGrowthSimulation.setup
+        pigs_per_region = [pig_R1, pig_R2, pig_R3, pig_R4, pig_R5]
+        new_pigs = {breed: {'region': [], 'x': [], 'y': [], 'weight': []} for breed in BREEDS}
+        y_min = -self.world_height/2 + 1
+        y_max = self.world_height/2 - 1
+        
+        herd_sizes = self.rng.herd_sizes(pigs_per_region, len(BREEDS))
+        draws = self.rng.random((int(herd_sizes.sum()), 3))
+        
+        start = 0
+        for region_num, region_sizes in enumerate(herd_sizes.tolist(), 1):
+            x_min, x_max = self.region_boundaries[region_num-1]
+            for breed, num_pigs in zip(BREEDS, region_sizes):
+                region_draws = draws[start:start + num_pigs]
+                start += num_pigs
+                new_pigs[breed]['region'].append(np.full(num_pigs, region_num))
+                new_pigs[breed]['x'].append(x_min + (x_max - x_min) * region_draws[:, 0])
+                new_pigs[breed]['y'].append(y_min + (y_max - y_min) * region_draws[:, 1])
+                new_pigs[breed]['weight'].append(self.init_weight - 1 + (0 + 2.0 * region_draws[:, 2]))
+        
+        for breed in BREEDS:
+            columns = {name: np.concatenate(values) for name, values in new_pigs[breed].items()}
+            self.herd.add_pigs(breed, columns['region'], columns['x'], columns['y'], columns['weight'])
+        
+        # Set up tracked pigs (one of each breed if available)
+        self.tracked_ids = {}
+        for breed in BREEDS:
+            breed_slice = self.herd.breed_slice(breed)
+            if breed_slice.start < breed_slice.stop:
+                self.tracked_ids[breed] = int(self.herd.ids[breed_slice.start])
+        
+        self.log_setup()
+    
+    def go(self, environmental_temperature, T, ME_content, stochastic_weight_gain, 
+           ME_requirements_for_increased_activity_or_genotype_adjustment, RAC, 
+           RAC_level, Dry_matter, ferm_fiber_content, selling_rate=100):
+        """
+        Run one day of the simulation
+        """
+        self.days += 1
+        profiler = self.profiler
+        
+        with profiler.phase('go', self.days):
+            # Move, feed and sell the whole herd
+            self.sold_count += self.step_herd(environmental_temperature, T, ME_content, stochastic_weight_gain,
+                                              ME_requirements_for_increased_activity_or_genotype_adjustment, RAC,
+                                              RAC_level, Dry_matter, ferm_fiber_content, selling_rate)
+            
+            with profiler.phase('record'):
+                # Calculate total feed intake
+                self.total_feed_intake = self.herd_feed_intake()
+                
+                # Store data for plotting
+                self.days_data.append(self.days)
+                self.total_feed_intake_data.append(self.total_feed_intake)
+                self.pig_count_data.append(self.pig_count())
+                self.sold_count_data.append(self.sold_count)
+                
+                # Store data for tracked pigs and recorders
+                self.record_tracked_pigs()
+                self.record_herd()
+            
+            with profiler.phase('log'):
+                self.log_day()
+        
+        # Check if simulation should end
+        if self.days >= 140:
+            return False
+        return True
+    
+    def step_herd(self, environmental_temperature, T, ME_content, stochastic_weight_gain,
+                  ME_requirements_for_increased_activity_or_genotype_adjustment, RAC,
+                  RAC_level, Dry_matter, ferm_fiber_content, selling_rate=100):
+        """
+        Move, feed and sell the herd for the current day
+        Returns the number of pigs sold
+        """
+        return self.herd.step(self.region_boundaries, self.world_width, self.world_height,
+                              environmental_temperature, T, ME_content, stochastic_weight_gain,
+                              ME_requirements_for_increased_activity_or_genotype_adjustment, RAC,
+                              self.init_weight_rac, RAC_level, Dry_matter, ferm_fiber_content,
+                              self.sell_weight, selling_rate, self.record_sold_rows)
+    
+    def record_sold_rows(self, sold):
+        """
+        Record the sale of the herd rows selected by a boolean mask
+        """
+        columns = self.herd.columns
+        self.record_sales(columns['final_weight'][sold], columns['fat_free_lean'][sold])
+    
+    def herd_feed_intake(self):
+        """
+        Return the total daily feed intake of the herd
+        """
+        return self.herd.total_feed_intake()
+    
+    def pig_count(self):
+        """
+        Return the number of pigs currently in the herd
+        """
+        return len(self.herd)
+    
+    def breed_count(self, breed):
+        """
+        Return the number of pigs of a breed in the herd
+        """
+        return self.herd.count(breed)
+    
+    def breed_totals(self, variable):
+        """
+        Return the sum of a state variable over the pigs of each breed, in BREEDS order
+        """
+        herd = self.herd
+        if variable in REQUIREMENT_VARIABLES:
+            herd.evaluate_requirements()
+        return [float(herd.columns[variable][herd.breed_slice(breed)].sum()) for breed in BREEDS]
+    
+    def herd_columns(self, variables):
+        """
+        Return the herd's ids, breed indices, regions and the given state columns
+        """
+        herd = self.herd
+        if any(name in REQUIREMENT_VARIABLES for name in variables):
+            herd.evaluate_requirements()
+        return herd.ids, herd.breed.astype(np.int64), herd.region, {name: herd.columns[name] for name in variables}
+    
+    def tracked_pigs(self):
+        """
+        Return views of the tracked pigs still in the herd, keyed by breed
+        """
+        tracked = {}
+        for breed, pig_id in self.tracked_ids.items():
+            pig = self.herd.pig(pig_id)
+            if pig is not None:
+                tracked[breed] = pig
+        return tracked
+
+    def checkpoint_state(self):
+        """
+        Return the full state of the simulation as (JSON-serializable values, nested dicts of NumPy arrays)
+        """
+        state, arrays = super().checkpoint_state()
+        tables = self.tables
+        state['tables'] = None if tables is None else {
+            'tolerance': tables.tolerance, 'weight_min': tables.weight_min, 'weight_max': tables.weight_max,
+            'cache_size': tables.cache_size}
+        return state, arrays
+
+    def restore_state(self, state, arrays):
+        """
+        Continue from the state returned by checkpoint_state
+        """
+        self.tables = GrowthTables(**state['tables']) if state['tables'] is not None else None
+        super().restore_state(state, arrays)
+
+    def herd_state(self):
+        """
+        Return the herd columns as (JSON-serializable values, NumPy arrays) for checkpoint_state
+        """
+        herd = self.herd
+        state = {'next_id': herd.next_id, 'requirements_stale': herd.requirements_stale,
+                 'requirement_inputs': herd.requirement_inputs, 'tracked_ids': dict(self.tracked_ids)}
+        arrays = {'ids': herd.ids, 'breed': herd.breed, 'region': herd.region, 'columns': dict(herd.columns)}
+        return state, arrays
+
+    def restore_herd(self, state, arrays):
+        """
+        Rebuild the herd and tracked pigs from the values returned by herd_state
+        """
+        herd = VectorizedHerd(self.rng, self.tables, self.profiler)
+        herd.ids = arrays['ids']
+        herd.breed = arrays['breed']
+        herd.region = arrays['region']
+        herd.columns = {name: arrays['columns'][name] for name in STATE_VARIABLES}
+        herd.next_id = state['next_id']
+        herd.requirements_stale = state['requirements_stale']
+        if state['requirement_inputs'] is not None:
+            herd.requirement_inputs = tuple(state['requirement_inputs'])
+        self.herd = herd
+        self.tracked_ids = dict(state['tracked_ids'])
+
+
+class DeterministicPigGrowthSimulation(VectorizedPigGrowthSimulation):
+    """
+    VectorizedPigGrowthSimulation that projects deterministic runs from reference trajectories
+
+    With stochastic weight gain and RAC off, a pig's state on a given day depends only on
+    its breed and initial weight. go() then integrates grid_size reference pigs per breed
+    once and maps every pig onto them by interpolating on its initial weight, so a day costs
+    about as much as a few hundred pigs plus the moves and sale checks of the herd. Herd
+    variables other than x and y are only interpolated when recorders or tracked pigs ask
+    for them. Falls back to the exact VectorizedHerd step for the rest of the run as soon as
+    stochastic weight gain or RAC is on or the feeding parameters change.
+    """
+    def __init__(self, seed=None, tables=None, grid_size=257, max_days=140):
+        super().__init__(seed, tables)
+        self.grid_size = grid_size
+        self.max_days = max_days
+        self.references = {}
+        self.reference_params = None
+        self.initial_weights = np.empty(0)
+        self.grid_index = np.empty(0, dtype=np.int64)
+        self.grid_fraction = np.empty(0)
+        self.exact = False
+    
+    def setup(self, pig_R1, pig_R2, pig_R3, pig_R4, pig_R5):
+        """
+        Initialize the simulation
+        """
+        super().setup(pig_R1, pig_R2, pig_R3, pig_R4, pig_R5)
+        # Pig ids are the herd rows at setup, so initial weights and grid positions are looked up by id
+        self.initial_weights = self.herd.columns['weight'].copy()
+        self.grid_index = np.zeros(len(self.herd), dtype=np.int64)
+        self.grid_fraction = np.zeros(len(self.herd))
+        self.references = {}
+        self.reference_params = None
+        self.exact = False
+    
+    def step_herd(self, environmental_temperature, T, ME_content, stochastic_weight_gain,
+                  ME_requirements_for_increased_activity_or_genotype_adjustment, RAC,
+                  RAC_level, Dry_matter, ferm_fiber_content, selling_rate=100):
+        """
+        Move and sell the herd for the current day, reading weights off the reference trajectories
+        Returns the number of pigs sold
+        """
+        params = (environmental_temperature, T, ME_content,
+                  ME_requirements_for_increased_activity_or_genotype_adjustment, Dry_matter,
+                  ferm_fiber_content, self.sell_weight)
+        projectable = self.projectable(stochastic_weight_gain, RAC, RAC_level)
+        if not self.exact and self.reference_params is None:
+            # References only describe runs that are deterministic from day 1
+            if self.days == 1 and projectable:
+                self.reference_params = params
+            else:
+                self.exact = True
+        if not self.exact and (not projectable or params != self.reference_params or self.days > self.max_days):
+            # The herd's history no longer follows the references: continue exactly from here
+            self.materialize(day=self.days - 1)
+            self.exact = True
+        if self.exact:
+            return super().step_herd(environmental_temperature, T, ME_content, stochastic_weight_gain,
+                                     ME_requirements_for_increased_activity_or_genotype_adjustment, RAC,
+                                     RAC_level, Dry_matter, ferm_fiber_content, selling_rate)
+        return self.project_day(selling_rate)
+    
+    def projectable(self, stochastic_weight_gain, RAC, RAC_level):
+        """
+        Return whether a day with these parameters follows the reference trajectories
+        """
+        return not (stochastic_weight_gain or RAC)
+    
+    def project_day(self, selling_rate):
+        """
+        Move and sell the herd for the current day, reading weights off the reference trajectories
+        Returns the number of pigs sold
+        """
+        herd = self.herd
+        with self.profiler.phase('move'):
+            herd.move(self.region_boundaries, self.world_width, self.world_height)
+        
+        # Sell pigs over the sell weight, drawing as VectorizedHerd.step does
+        with self.profiler.phase('sell'):
+            weight = self.interpolate('weight')
+            over_sell_weight = weight > self.sell_weight
+            sold = over_sell_weight.copy()
+            sold[over_sell_weight] = self.rng.sell_draws(int(over_sell_weight.sum())) < selling_rate
+            self.record_sold_rows(sold)
+            herd.remove(sold)
+        return int(sold.sum())
+    
+    def record_sold_rows(self, sold):
+        """
+        Record the sale of the herd rows selected by a boolean mask, interpolating their sale records
+        """
+        self.materialize(('final_weight', 'fat_free_lean'), np.flatnonzero(sold))
+        super().record_sold_rows(sold)
+    
+    def herd_feed_intake(self):
+        """
+        Return the total daily feed intake of the herd
+        """
+        if self.exact:
+            return super().herd_feed_intake()
+        total = 0.0
+        for breed, (reference, index, fraction) in self.grid_positions().items():
+            total += reference.total(self.days, 'feed_intake', reference.grid_weights(index, fraction))
+        return total
+    
+    def breed_totals(self, variable):
+        """
+        Return the sum of a growth variable (such as weight) over the pigs of each breed, in BREEDS order
+        Projected herds are summed from their grid weights, without interpolating every pig.
+        """
+        if self.exact or self.reference_params is None:
+            return super().breed_totals(variable)
+        totals = [0.0] * len(BREEDS)
+        for breed, (reference, index, fraction) in self.grid_positions().items():
+            totals[BREEDS.index(breed)] = reference.total(self.days, variable, reference.grid_weights(index, fraction))
+        return totals
+    
+    def reference(self, breed):
+        """
+        Return the reference trajectories of a breed, integrating them on first use
+        """
+        if breed not in self.references:
+            with self.profiler.phase('reference'):
+                (environmental_temperature, T, ME_content, ME_requirements_for_increased_activity_or_genotype_adjustment,
+                 Dry_matter, ferm_fiber_content, sell_weight) = self.reference_params
+                self.references[breed] = ReferenceTrajectories(
+                    breed, self.init_weight - 1, self.init_weight + 1, self.grid_size, self.max_days,
+                    environmental_temperature, T, ME_content,
+                    ME_requirements_for_increased_activity_or_genotype_adjustment, Dry_matter,
+                    ferm_fiber_content, sell_weight)
+                ids = self.herd.ids[self.herd.breed_slice(breed)]
+                self.grid_index[ids], self.grid_fraction[ids] = self.references[breed].interpolation(
+                    self.initial_weights[ids])
+        return self.references[breed]
+    
+    def grid_positions(self, rows=None):
+        """
+        Return the reference, grid indices and fractions of the herd's pigs (or the given rows), by breed
+        """
+        positions = {}
+        for breed in BREEDS:
+            breed_slice = self.herd.breed_slice(breed)
+            if breed_slice.start == breed_slice.stop:
+                continue
+            ids = self.herd.ids[breed_slice]
+            if rows is not None:
+                ids = self.herd.ids[rows[(rows >= breed_slice.start) & (rows < breed_slice.stop)]]
+                if not len(ids):
+                    continue
+            positions[breed] = (self.reference(breed), self.grid_index[ids], self.grid_fraction[ids])
+        return positions
+    
+    def interpolate(self, variable, day=None):
+        """
+        Return a herd variable on a day (default today) as an array aligned with the herd
+        """
+        day = self.days if day is None else day
+        values = np.empty(len(self.herd))
+        for breed, (reference, index, fraction) in self.grid_positions().items():
+            values[self.herd.breed_slice(breed)] = reference.values(day, variable, index, fraction)
+        return values
+    
+    def materialize(self, variables=STATE_VARIABLES, rows=None, day=None):
+        """
+        Write interpolated variables into the herd columns, for every pig or the given rows
+        """
+        if self.exact or self.reference_params is None:
+            return
+        day = self.days if day is None else day
+        rows = np.arange(len(self.herd)) if rows is None else np.asarray(rows, dtype=np.int64)
+        for breed, (reference, index, fraction) in self.grid_positions(rows).items():
+            breed_slice = self.herd.breed_slice(breed)
+            breed_rows = rows[(rows >= breed_slice.start) & (rows < breed_slice.stop)]
+            for name in variables:
+                if name not in ('x', 'y', 'final_weight', 'fat_free_lean'):
+                    self.herd.columns[name][breed_rows] = reference.values(day, name, index, fraction)
+            # Sale records jump when a pig passes the sell weight, so derive them from weight and PBT
+            if 'final_weight' in variables or 'fat_free_lean' in variables:
+                weight = reference.values(day, 'weight', index, fraction)
+                PBT = reference.values(day, 'PBT', index, fraction)
+                over = weight > self.sell_weight
+                self.herd.columns['final_weight'][breed_rows] = np.where(over, weight, 0)
+                self.herd.columns['fat_free_lean'][breed_rows] = np.where(
+                    over, 62.073 + 0.0308 * weight - 1.0101 * PBT + 0.00774 * PBT ** 2, 0)
+    
+    def herd_columns(self, variables):
+        """
+        Return the herd's ids, breed indices, regions and the given state columns
+        """
+        with self.profiler.phase('materialize'):
+            self.materialize(variables)
+        return super().herd_columns(variables)
+    
+    def tracked_pigs(self):
+        """
+        Return views of the tracked pigs still in the herd, keyed by breed
+        """
+        rows = [self.herd.index_of(pig_id) for pig_id in self.tracked_ids.values()]
+        with self.profiler.phase('materialize'):
+            self.materialize(rows=[row for row in rows if row is not None])
+        return super().tracked_pigs()
+
+    def checkpoint_state(self):
+        """
+        Return the full state of the simulation as (JSON-serializable values, nested dicts of NumPy arrays)
+        Integrated reference trajectories are stored too, so a restored run does not integrate them again.
+        """
+        state, arrays = super().checkpoint_state()
+        state.update(grid_size=self.grid_size, max_days=self.max_days, reference_params=self.reference_params,
+                     exact=self.exact)
+        state['references'] = {breed: [reference.weight_min, reference.weight_max]
+                               for breed, reference in self.references.items()}
+        arrays.update(initial_weights=self.initial_weights, grid_index=self.grid_index,
+                      grid_fraction=self.grid_fraction,
+                      references={breed: reference.states for breed, reference in self.references.items()})
+        return state, arrays
+
+    def restore_state(self, state, arrays):
+        """
+        Continue from the state returned by checkpoint_state
+        """
+        super().restore_state(state, arrays)
+        self.grid_size = state['grid_size']
+        self.max_days = state['max_days']
+        self.references = {breed: ReferenceTrajectories.from_states(breed, weight_min, weight_max,
+                                                                   arrays['references'][breed])
+                           for breed, (weight_min, weight_max) in state['references'].items()}
+        self.reference_params = tuple(state['reference_params']) if state['reference_params'] is not None else None
+        self.exact = state['exact']
+        self.initial_weights = arrays['initial_weights']
+        self.grid_index = arrays['grid_index']
+        self.grid_fraction = arrays['grid_fraction']
+
+
+class EventDrivenPigGrowthSimulation(DeterministicPigGrowthSimulation):
+    """
+    DeterministicPigGrowthSimulation driven by a queue of predicted per-pig events
+
+    Projected weights only grow, so the day each pig passes sell_weight and the day it
+    passes init_weight_rac (opening its 28-day RAC window) are known once the references
+    are built. Sale days are pushed to an EventQueue once; a day then only pops the sales
+    due, draws sales for the pigs over the sell weight and updates the feed total from
+    per-grid-point herd weights. RAC does not change growth, so RAC runs stay projected
+    here, with RAC variables computed from each pig's window when read.
+
+    Pigs still move every day, which costs O(herd) per day: only with move_pigs off
+    are the daily moves skipped (their random draws are still made, so sales are
+    unchanged). Recorders then only run every record_every days.
+    """
+    def __init__(self, seed=None, tables=None, grid_size=257, max_days=140, move_pigs=True, record_every=1):
+        super().__init__(seed, tables, grid_size, max_days)
+        self.move_pigs = move_pigs
+        self.record_every = record_every
+        self.events = EventQueue()
+        self.rac_params = None
+        self.scheduled = False
+        self.pig_breed = np.empty(0, dtype=np.int8)
+        self.sold = np.empty(0, dtype=bool)
+        self.sale_day = np.empty(0, dtype=np.int64)
+        self.rac_start = np.empty(0, dtype=np.int64)
+        self.over_ids = np.empty(0, dtype=np.int64)
+        self.herd_grid_weights = {}
+    
+    def setup(self, pig_R1, pig_R2, pig_R3, pig_R4, pig_R5):
+        """
+        Initialize the simulation
+        """
+        super().setup(pig_R1, pig_R2, pig_R3, pig_R4, pig_R5)
+        num_pigs = len(self.herd)
+        self.events = EventQueue()
+        self.rac_params = None
+        self.scheduled = False
+        self.pig_breed = self.herd.breed.copy()
+        self.sold = np.zeros(num_pigs, dtype=bool)
+        self.sale_day = np.full(num_pigs, self.max_days + 1, dtype=np.int64)
+        self.rac_start = np.full(num_pigs, self.max_days + 1, dtype=np.int64)
+        self.over_ids = np.empty(0, dtype=np.int64)
+        self.herd_grid_weights = {}
+    
+    def projectable(self, stochastic_weight_gain, RAC, RAC_level):
+        """
+        Return whether a day with these parameters follows the reference trajectories
+        RAC is allowed but must keep its day 1 settings
+        """
+        rac_params = (True, self.init_weight_rac, RAC_level) if RAC else (False,)
+        if self.rac_params is None:
+            self.rac_params = rac_params
+        return not stochastic_weight_gain and rac_params == self.rac_params
+    
+    def schedule(self):
+        """
+        Predict every pig's sale and RAC days and queue the sales
+        """
+        for breed, (reference, index, fraction) in self.grid_positions().items():
+            ids = self.herd.ids[self.herd.breed_slice(breed)]
+            self.sale_day[ids] = reference.first_day_over('weight', self.sell_weight, index, fraction)
+            self.events.push(self.sale_day[ids], 'sale', ids)
+            if self.rac_params[0]:
+                self.rac_start[ids] = reference.first_day_over('weight', self.init_weight_rac, index, fraction)
+            self.herd_grid_weights[breed] = reference.grid_weights(index, fraction)
+        self.scheduled = True
+    
+    def project_day(self, selling_rate):
+        """
+        Move the herd, handle the day's events and sell pigs over the sell weight
+        Returns the number of pigs sold
+        """
+        profiler = self.profiler
+        if not self.scheduled:
+            with profiler.phase('schedule'):
+                self.schedule()
+        herd = self.herd
+        with profiler.phase('move'):
+            if self.move_pigs:
+                herd.move(self.region_boundaries, self.world_width, self.world_height)
+            else:
+                # Keep the random stream in step with VectorizedHerd.move
+                self.rng.uniform(-30, 30, len(herd))
+        
+        with profiler.phase('sell'):
+            return self.sell_due(selling_rate)
+    
+    def sell_due(self, selling_rate):
+        """
+        Handle the day's events and sell pigs over the sell weight
+        Returns the number of pigs sold
+        """
+        herd = self.herd
+        due = self.events.pop_due(self.days)
+        if len(due['sale']):
+            self.over_ids = np.union1d(self.over_ids, due['sale'])
+        if not len(self.over_ids):
+            return 0
+        
+        # Sell pigs over the sell weight in herd order, drawing as VectorizedHerd.step does
+        sold = self.rng.sell_draws(len(self.over_ids)) < selling_rate
+        sold_ids = self.over_ids[sold]
+        self.over_ids = self.over_ids[~sold]
+        if not len(sold_ids):
+            return 0
+        self.sold[sold_ids] = True
+        
+        mask = np.zeros(len(herd), dtype=bool)
+        mask[np.searchsorted(herd.ids, sold_ids)] = True
+        self.record_sold_rows(mask)
+        herd.remove(mask)
+        for breed, grid_weights in self.herd_grid_weights.items():
+            if herd.count(breed) == 0:
+                grid_weights[:] = 0
+                continue
+            breed_ids = sold_ids[self.pig_breed[sold_ids] == BREEDS.index(breed)]
+            grid_weights -= self.references[breed].grid_weights(self.grid_index[breed_ids],
+                                                                self.grid_fraction[breed_ids])
+        return len(sold_ids)
+    
+    def herd_feed_intake(self):
+        """
+        Return the total daily feed intake of the herd
+        """
+        if self.exact:
+            return VectorizedPigGrowthSimulation.herd_feed_intake(self)
+        return sum(self.references[breed].total(self.days, 'feed_intake', grid_weights)
+                   for breed, grid_weights in self.herd_grid_weights.items())
+    
+    def breed_totals(self, variable):
+        """
+        Return the sum of a growth variable (such as weight) over the pigs of each breed, in BREEDS order
+        Uses the herd grid weights kept up to date by sell_due.
+        """
+        if self.exact or not self.scheduled:
+            return super().breed_totals(variable)
+        totals = [0.0] * len(BREEDS)
+        for breed, grid_weights in self.herd_grid_weights.items():
+            totals[BREEDS.index(breed)] = self.references[breed].total(self.days, variable, grid_weights)
+        return totals
+    
+    def record_herd(self):
+        """
+        Write the current herd into every attached recorder every record_every days
+        """
+        if self.days % self.record_every == 0:
+            super().record_herd()
+    
+    def pig_values(self, ids, days, variable):
+        """
+        Interpolate a variable for the given pigs, each on its own day
+        """
+        values = np.empty(len(ids))
+        for i, breed in enumerate(BREEDS):
+            mine = self.pig_breed[ids] == i
+            if mine.any():
+                breed_ids = ids[mine]
+                values[mine] = self.reference(breed).values(days[mine], variable, self.grid_index[breed_ids],
+                                                            self.grid_fraction[breed_ids])
+        return values
+    
+    def materialize(self, variables=STATE_VARIABLES, rows=None, day=None):
+        """
+        Write interpolated variables into the herd columns, for every pig or the given rows
+        RAC variables, and the amino acid requirements that depend on them, follow each pig's RAC window
+        """
+        super().materialize(variables, rows, day)
+        if self.exact or self.reference_params is None or not self.rac_params[0]:
+            return
+        amino_acids = any(name in REQUIREMENT_GROUPS['amino_acids'] for name in variables)
+        if not amino_acids and not any(name in RAC_VARIABLES for name in variables):
+            return
+        
+        day = self.days if day is None else day
+        rows = np.arange(len(self.herd)) if rows is None else np.asarray(rows, dtype=np.int64)
+        ids = self.herd.ids[rows]
+        started = self.rac_start[ids] <= day
+        rows, ids = rows[started], ids[started]
+        if not len(rows):
+            return
+        
+        # Replay feed_rac on each pig's latest RAC day
+        start = self.rac_start[ids]
+        RAC_day = np.minimum(day - start, 27)
+        c = {name: np.zeros(len(rows)) for name in RAC_VARIABLES}
+        c['RAC_day'] = RAC_day.astype(float)
+        for name in ('weight', 'PBT', 'ME_intake'):
+            c[name] = self.pig_values(ids, start + RAC_day, name)
+        _, init_weight_rac, RAC_level = self.rac_params
+        VectorizedHerd.feed_rac(c, init_weight_rac, RAC_level)
+        columns = self.herd.columns
+        for name in RAC_VARIABLES:
+            columns[name][rows] = c[name]
+        
+        if amino_acids:
+            DeterministicPigGrowthSimulation.materialize(
+                self, ('feed_intake', 'weight', 'maximum_Pd', 'Prd', 'Integu_lys_loss'), rows, day)
+            c = {name: columns[name][rows] for name in
+                 ('feed_intake', 'weight', 'maximum_Pd', 'Prd', 'Pd_rac_W') + REQUIREMENT_GROUPS['amino_acids']}
+            VectorizedHerd.calculate_amino_acid_requirements(c, self.reference_params[5], c['Integu_lys_loss'])
+            for name in REQUIREMENT_GROUPS['amino_acids']:
+                columns[name][rows] = c[name]
+
+    def checkpoint_state(self):
+        """
+        Return the full state of the simulation as (JSON-serializable values, nested dicts of NumPy arrays)
+        """
+        state, arrays = super().checkpoint_state()
+        state.update(move_pigs=self.move_pigs, record_every=self.record_every, rac_params=self.rac_params,
+                     scheduled=self.scheduled)
+        arrays.update(events=np.array(self.events.heap, dtype=np.int64).reshape(-1, 3), pig_breed=self.pig_breed,
+                      sold=self.sold, sale_day=self.sale_day, rac_start=self.rac_start, over_ids=self.over_ids,
+                      herd_grid_weights=dict(self.herd_grid_weights))
+        return state, arrays
+
+    def restore_state(self, state, arrays):
+        """
+        Continue from the state returned by checkpoint_state
+        """
+        super().restore_state(state, arrays)
+        self.move_pigs = state['move_pigs']
+        self.record_every = state['record_every']
+        self.rac_params = tuple(state['rac_params']) if state['rac_params'] is not None else None
+        self.scheduled = state['scheduled']
+        # The heap is stored in heap order, so it is still a valid heap
+        self.events = EventQueue()
+        self.events.heap = [tuple(event) for event in arrays['events'].tolist()]
+        for name in ('pig_breed', 'sold', 'sale_day', 'rac_start', 'over_ids'):
+            setattr(self, name, arrays[name])
+        self.herd_grid_weights = dict(arrays.get('herd_grid_weights', {}))
+
+
+def create_simulation(scenario, seed=None):
+    """
+    Create a simulation for a scenario, without setting it up
+    """
+    params = dict(DEFAULT_SCENARIO, **scenario)
+    tables = GrowthTables(params['table_tolerance']) if params['table_tolerance'] else None
+    if params['engine'] == 'vectorized':
+        simulation = VectorizedPigGrowthSimulation(seed, tables)
+    elif params['engine'] == 'deterministic':
+        simulation = DeterministicPigGrowthSimulation(seed, tables)
+    elif params['engine'] == 'event':
+        simulation = EventDrivenPigGrowthSimulation(seed, tables)
+    elif params['engine'] == 'object':
+        simulation = PigGrowthSimulation(seed)
+    else:
+        raise ValueError(f"Unknown engine: {params['engine']}")
+    simulation.init_weight = params['init_weight']
+    simulation.sell_weight = params['sell_weight']
+    simulation.init_weight_rac = params['init_weight_rac']
+    return simulation
+
+
+def run_scenario(scenario, seed=None, simulation=None):
+    """
+    Set up and run a scenario for its number of days or until the simulation stops
+    Missing scenario keys take their DEFAULT_SCENARIO values; returns the simulation
+    """
+    params = dict(DEFAULT_SCENARIO, **scenario)
+    if simulation is None:
+        simulation = create_simulation(params, seed)
+    simulation.setup(*params['pigs_per_region'])
+    for _ in range(params['days']):
+        continue_sim = simulation.go(
+            params['environmental_temperature'],
+            params['T'],
+            params['ME_content'],
+            params['stochastic_weight_gain'],
+            params['ME_requirements_for_increased_activity_or_genotype_adjustment'],
+            params['RAC'],
+            params['RAC_level'],
+            params['Dry_matter'],
+            params['ferm_fiber_content'],
+            params['selling_rate']
+        )
+        if not continue_sim:
+            break
+    return simulation
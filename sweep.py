@@ -0,0 +1,302 @@
+# sweep.py
+#
+# Feeding strategy sweeps: python -m sweep --method lhs --samples 32 --config scenario.json
+
+import argparse
+import json
+import math
+import os
+import sys
+
+import numpy as np
+
+from batch import make_jobs, run_batch
+from cache import result_key
+from simulation import DEFAULT_SCENARIO
+
+# Default ranges of the swept feeding and marketing parameters
+SWEEP_SPACE = {
+    'ME_content': (2800, 3800),
+    'RAC_level': (0, 20),
+    'init_weight_rac': (60, 100),
+    'T': (10, 30),
+    'sell_weight': (100, 150),
+}
+
+# Sweep objectives and whether each is minimized or maximized
+OBJECTIVES = (('days_to_market', 'min'), ('feed_per_pig', 'min'), ('fat_free_lean', 'max'))
+
+SWEEP_METHODS = ('grid', 'lhs', 'bayesian')
+
+
+def point_scenario(base_scenario, point):
+    """
+    Return the scenario of a sweep point; sweeping RAC_level turns RAC on for levels above 0
+    """
+    scenario = dict(base_scenario, **point)
+    if 'RAC_level' in point:
+        scenario['RAC'] = point['RAC_level'] > 0
+    return scenario
+
+
+def run_metrics(summary):
+    """
+    Return the sweep objectives of a run summary
+    Pigs still unsold at the end of the run count as going to market on its last day
+    """
+    initial_pigs = summary['initial_pigs']
+    if not initial_pigs:
+        return dict.fromkeys([name for name, _ in OBJECTIVES] + ['sold_fraction'], math.nan)
+    sale_days = summary['mean_sale_day'] * summary['sold'] if summary['sold'] else 0.0
+    return {
+        'days_to_market': (sale_days + summary['days'] * summary['remaining']) / initial_pigs,
+        'feed_per_pig': summary['total_feed_intake'] / initial_pigs,
+        'fat_free_lean': summary['mean_fat_free_lean'],
+        'sold_fraction': summary['sold'] / initial_pigs,
+    }
+
+
+class SweepCache:
+    """
+    Run metrics keyed by cache.result_key, optionally kept in a JSON lines file across sweeps
+    """
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        if path is not None and os.path.exists(path):
+            with open(path) as cache_file:
+                for line in cache_file:
+                    entry = json.loads(line)
+                    self.entries[entry['key']] = entry['metrics']
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        return self.entries.get(key)
+
+    def put(self, key, metrics):
+        self.entries[key] = metrics
+        if self.path is not None:
+            with open(self.path, 'a') as cache_file:
+                cache_file.write(json.dumps({'key': key, 'metrics': metrics}) + '\n')
+
+
+def evaluate(points, base_scenario=None, replicates=1, seed=0, max_workers=None, cache=None):
+    """
+    Run every sweep point for replicates seeds in parallel and return one result per point
+    Every point uses the same seeds, so points are compared on the same random streams.
+    Results are {'point', 'metrics', 'runs'} with metrics averaged over the replicates.
+    """
+    base_scenario = dict(base_scenario or {})
+    cache = cache if cache is not None else SweepCache()
+    seeds = [job_seed for _, job_seed in make_jobs(base_scenario, replicates, seed)]
+
+    jobs = []
+    keys = []
+    queued = set()
+    for point in points:
+        scenario = point_scenario(base_scenario, point)
+        for job_seed in seeds:
+            key = result_key(scenario, job_seed)
+            keys.append(key)
+            if cache.get(key) is None and key not in queued:
+                queued.add(key)
+                jobs.append((key, (scenario, job_seed)))
+
+    for result in run_batch([job for _, job in jobs], max_workers):
+        cache.put(jobs[result['job']][0], run_metrics(result))
+
+    results = []
+    for i, point in enumerate(points):
+        runs = [cache.get(key) for key in keys[i * len(seeds):(i + 1) * len(seeds)]]
+        metrics = {name: float(np.mean([run[name] for run in runs])) for name in runs[0]}
+        results.append({'point': dict(point), 'metrics': metrics, 'runs': len(runs)})
+    return results
+
+
+def grid_points(space, levels=3):
+    """
+    Return every combination of levels evenly spaced values of each parameter
+    """
+    names = list(space)
+    axes = [np.linspace(low, high, levels) for low, high in space.values()]
+    mesh = np.meshgrid(*axes, indexing='ij')
+    return [dict(zip(names, map(float, values))) for values in zip(*(axis.ravel() for axis in mesh))]
+
+
+def latin_hypercube(space, samples, rng):
+    """
+    Return samples points with every parameter's range split into samples strata, each used once
+    """
+    unit = (rng.permuted(np.tile(np.arange(samples), (len(space), 1)), axis=1).T +
+            rng.random((samples, len(space)))) / samples
+    return unit_points(space, unit)
+
+
+def unit_points(space, unit):
+    """
+    Map points of the unit cube onto the parameter ranges
+    """
+    low = np.array([bounds[0] for bounds in space.values()], dtype=float)
+    high = np.array([bounds[1] for bounds in space.values()], dtype=float)
+    values = low + unit * (high - low)
+    return [dict(zip(space, map(float, row))) for row in values]
+
+
+def point_units(space, points):
+    """
+    Map points back onto the unit cube
+    """
+    low = np.array([bounds[0] for bounds in space.values()], dtype=float)
+    high = np.array([bounds[1] for bounds in space.values()], dtype=float)
+    values = np.array([[point[name] for name in space] for point in points], dtype=float)
+    return (values - low) / np.where(high > low, high - low, 1)
+
+
+def objective_matrix(results, objectives=OBJECTIVES):
+    """
+    Return the results' objectives as a (results, objectives) array to minimize
+    """
+    return np.array([[result['metrics'][name] * (1 if sense == 'min' else -1) for name, sense in objectives]
+                     for result in results], dtype=float)
+
+
+def pareto_front(results, objectives=OBJECTIVES):
+    """
+    Return the results no other result beats on every objective, in their original order
+    """
+    values = objective_matrix(results, objectives)
+    finite = np.isfinite(values).all(axis=1)
+    front = []
+    for i in np.flatnonzero(finite):
+        others = values[finite]
+        dominated = ((others <= values[i]).all(axis=1) & (others < values[i]).any(axis=1)).any()
+        if not dominated:
+            front.append(results[i])
+    return front
+
+
+def expected_improvement(x_train, y_train, x_candidates, length_scale=0.3, noise=1e-4):
+    """
+    Expected improvement over the best y_train, to minimize, of a Gaussian process with an RBF kernel
+    """
+    mean = y_train.mean()
+    scale = y_train.std() or 1.0
+    y = (y_train - mean) / scale
+
+    def kernel(a, b):
+        distances = ((a[:, None, :] - b[None, :, :]) ** 2).sum(axis=2)
+        return np.exp(-0.5 * distances / length_scale ** 2)
+
+    K = kernel(x_train, x_train) + noise * np.eye(len(x_train))
+    L = np.linalg.cholesky(K)
+    alpha = np.linalg.solve(L.T, np.linalg.solve(L, y))
+    K_star = kernel(x_candidates, x_train)
+    mu = K_star @ alpha
+    v = np.linalg.solve(L, K_star.T)
+    sigma = np.sqrt(np.maximum(1 - (v ** 2).sum(axis=0), 1e-12))
+
+    improvement = y.min() - mu
+    z = improvement / sigma
+    cdf = 0.5 * (1 + np.vectorize(math.erf)(z / math.sqrt(2)))
+    pdf = np.exp(-0.5 * z ** 2) / math.sqrt(2 * math.pi)
+    return improvement * cdf + sigma * pdf
+
+
+def bayesian_sweep(space, initial=8, iterations=4, batch_size=4, candidates=2000, seed=0,
+                   objectives=OBJECTIVES, **evaluate_options):
+    """
+    Sweep by Bayesian optimization: a Latin hypercube start, then batches of points chosen by
+    expected improvement of a Gaussian process on random weightings of the normalized objectives
+    (ParEGO), so successive batches spread along the Pareto front
+    """
+    rng = np.random.default_rng(seed)
+    results = evaluate(latin_hypercube(space, initial, rng), seed=seed, **evaluate_options)
+    for _ in range(iterations):
+        valid = [result for result in results if np.isfinite(objective_matrix([result], objectives)).all()]
+        if len(valid) < 2:
+            break
+        x_train = point_units(space, [result['point'] for result in valid])
+        values = objective_matrix(valid, objectives)
+        span = values.max(axis=0) - values.min(axis=0)
+        normalized = (values - values.min(axis=0)) / np.where(span > 0, span, 1)
+
+        batch = []
+        pool = rng.random((candidates, len(space)))
+        for _ in range(batch_size):
+            weights = rng.dirichlet(np.ones(len(objectives)))
+            scalarized = (normalized * weights).max(axis=1) + 0.05 * (normalized * weights).sum(axis=1)
+            ei = expected_improvement(x_train, scalarized, pool)
+            best = int(np.argmax(ei))
+            batch.append(pool[best])
+            pool = np.delete(pool, best, axis=0)
+        results += evaluate(unit_points(space, np.array(batch)), seed=seed, **evaluate_options)
+    return results
+
+
+def run_sweep(method='lhs', space=None, samples=16, levels=3, iterations=4, batch_size=4, seed=0,
+              objectives=OBJECTIVES, **evaluate_options):
+    """
+    Run a grid, Latin hypercube ('lhs') or Bayesian sweep of space
+    Returns (all results, Pareto front); evaluate_options are passed on to evaluate
+    """
+    space = dict(space or SWEEP_SPACE)
+    if method == 'grid':
+        results = evaluate(grid_points(space, levels), seed=seed, **evaluate_options)
+    elif method == 'lhs':
+        results = evaluate(latin_hypercube(space, samples, np.random.default_rng(seed)), seed=seed,
+                           **evaluate_options)
+    elif method == 'bayesian':
+        results = bayesian_sweep(space, samples, iterations, batch_size, seed=seed, objectives=objectives,
+                                 **evaluate_options)
+    else:
+        raise ValueError(f"Unknown sweep method: {method}")
+    return results, pareto_front(results, objectives)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog='python -m sweep', description='Sweep feeding strategies and '
+                                     'print the Pareto front of days to market, feed per pig and fat-free lean.')
+    parser.add_argument('--config', help='JSON file of the base scenario parameters')
+    parser.add_argument('--method', choices=SWEEP_METHODS, default='lhs', help='Sweep method')
+    parser.add_argument('--param', nargs=3, action='append', metavar=('NAME', 'LOW', 'HIGH'),
+                        help='Swept parameter and range (repeatable; default: SWEEP_SPACE)')
+    parser.add_argument('--samples', type=int, default=16, help='Points of a Latin hypercube or Bayesian start')
+    parser.add_argument('--levels', type=int, default=3, help='Values per parameter of a grid sweep')
+    parser.add_argument('--iterations', type=int, default=4, help='Bayesian iterations')
+    parser.add_argument('--batch-size', dest='batch_size', type=int, default=4, help='Points per Bayesian iteration')
+    parser.add_argument('--replicates', type=int, default=1, help='Seeds per point')
+    parser.add_argument('--seed', type=int, default=0, help='Base seed of the sweep')
+    parser.add_argument('--workers', type=int, help='Worker processes')
+    parser.add_argument('--cache', help='JSON lines file caching run results across sweeps')
+    parser.add_argument('--all', action='store_true', help='Print every result, not only the Pareto front')
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    base_scenario = {}
+    if args.config:
+        with open(args.config) as config_file:
+            base_scenario = json.load(config_file)
+    unknown = set(base_scenario) - set(DEFAULT_SCENARIO)
+    if unknown:
+        raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+    space = None
+    if args.param:
+        space = {name: (float(low), float(high)) for name, low, high in args.param}
+        unknown = set(space) - set(DEFAULT_SCENARIO)
+        if unknown:
+            raise ValueError(f"Unknown scenario parameters: {', '.join(sorted(unknown))}")
+
+    results, front = run_sweep(args.method, space, args.samples, args.levels, args.iterations, args.batch_size,
+                               args.seed, base_scenario=base_scenario, replicates=args.replicates,
+                               max_workers=args.workers, cache=SweepCache(args.cache))
+    for result in results if args.all else front:
+        print(json.dumps(result))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,129 @@
+# tables.py
+
+from collections import OrderedDict
+
+import numpy as np
+
+from herd import intake_curves, maintenance_curves, requirement_curves
+
+
+class CurveTable:
+    """
+    Piecewise linear lookup table of a set of weight curves on uniform weight bins
+
+    curves maps an array of weights to a dict of arrays, as the herd.*_curves functions
+    do. Bins are halved until linear interpolation is within tolerance of the exact
+    curves at every bin midpoint, relative to each curve's largest magnitude over the
+    table. Weights outside [weight_min, weight_max) fall back to the exact curves.
+    """
+    def __init__(self, curves, weight_min=1, weight_max=300, tolerance=1e-6, bins=256, max_bins=2 ** 22):
+        self.curves = curves
+        self.weight_min = weight_min
+        self.weight_max = weight_max
+        self.tolerance = tolerance
+
+        while True:
+            weights = np.linspace(weight_min, weight_max, bins + 1)
+            exact = curves(weights)
+            self.names = tuple(exact)
+            values = np.array([exact[name] for name in self.names])
+            self.error = self.check((weights[:-1] + weights[1:]) / 2, values)
+            if self.error <= tolerance:
+                break
+            if bins >= max_bins:
+                raise ValueError(f"CurveTable cannot reach tolerance {tolerance} with {max_bins} bins")
+            bins *= 2
+
+        self.bins = bins
+        self.inverse_step = bins / (weight_max - weight_min)
+        self.values = values[:, :-1].copy()
+        self.slopes = np.diff(values, axis=1)
+
+    def check(self, weights, values=None):
+        """
+        Return the largest error of the table at the given weights, relative to each curve's magnitude
+        """
+        if values is None:
+            values = np.column_stack([self.values, self.values[:, -1] + self.slopes[:, -1]])
+        exact = self.curves(weights)
+        position = (weights - self.weight_min) / (self.weight_max - self.weight_min) * (values.shape[1] - 1)
+        index = np.clip(position.astype(np.int64), 0, values.shape[1] - 2)
+        fraction = position - index
+        error = 0.0
+        for j, name in enumerate(self.names):
+            scale = np.abs(values[j]).max()
+            if scale == 0:
+                continue
+            interpolated = values[j, index] + fraction * (values[j, index + 1] - values[j, index])
+            error = max(error, float(np.abs(interpolated - exact[name]).max() / scale))
+        return error
+
+    def lookup(self, weight):
+        """
+        Return the curves at the given weights, as the curves function would
+        """
+        position = (weight - self.weight_min) * self.inverse_step
+        inside = None
+        if len(position) and not (position.min() >= 0 and position.max() < self.bins):
+            inside = (position >= 0) & (position < self.bins)
+            position = np.where(inside, position, 0)
+        index = position.astype(np.int64)
+        fraction = position - index
+        result = {name: self.values[j].take(index) + fraction * self.slopes[j].take(index)
+                  for j, name in enumerate(self.names)}
+
+        if inside is not None:
+            outside = ~inside
+            exact = self.curves(weight[outside])
+            for name, values in result.items():
+                values[outside] = exact[name]
+        return result
+
+
+class GrowthTables:
+    """
+    CurveTables for the weight curves of VectorizedHerd.feed, built on first use
+
+    Pass an instance as VectorizedHerd(rng, tables) to replace the transcendental
+    weight formulas of the daily equation chain by table lookups. Tables are keyed
+    by breed and the ME_content or temperature they depend on, and kept in a bounded
+    LRU so sweeps over many conditions do not grow memory without bound.
+    """
+    def __init__(self, tolerance=1e-6, weight_min=1, weight_max=300, cache_size=32):
+        self.tolerance = tolerance
+        self.weight_min = weight_min
+        self.weight_max = weight_max
+        self.cache_size = cache_size
+        self.cache = OrderedDict()
+
+    def table(self, key, curves):
+        """
+        Return the cached table for key, building it from curves if needed
+        """
+        table = self.cache.get(key)
+        if table is not None:
+            self.cache.move_to_end(key)
+            return table
+        table = CurveTable(curves, self.weight_min, self.weight_max, self.tolerance)
+        self.cache[key] = table
+        if len(self.cache) > self.cache_size:
+            self.cache.popitem(last=False)
+        return table
+
+    def intake(self, breed, ME_content):
+        """
+        Table of herd.intake_curves
+        """
+        return self.table(('intake', breed, ME_content), lambda weight: intake_curves(breed, weight, ME_content))
+
+    def maintenance(self, breed, T):
+        """
+        Table of herd.maintenance_curves
+        """
+        return self.table(('maintenance', breed, T), lambda weight: maintenance_curves(breed, weight, T))
+
+    def requirements(self):
+        """
+        Table of herd.requirement_curves
+        """
+        return self.table(('requirements',), requirement_curves)
@@ -0,0 +1,33 @@
+import json
+
+import numpy as np
+
+from cache import ResultCache, cached_run, result_key
+from simulation import DEFAULT_SCENARIO
+
+
+def test_equal_scenarios_give_equal_keys():
+    key = result_key({}, 1)
+    assert result_key({'init_weight': 20}, 1) == key
+    assert result_key({'init_weight': 20.0}, 1) == key
+    assert result_key({'init_weight': np.float64(20), 'T': np.int64(20)}, np.int64(1)) == key
+    assert result_key({'pigs_per_region': [5.0, 5, 5, 5, 5]}, 1) == key
+    assert result_key(dict(DEFAULT_SCENARIO), 1) == key
+
+
+def test_different_scenarios_give_different_keys():
+    key = result_key({}, 1)
+    assert result_key({}, 2) != key
+    assert result_key({'init_weight': 20.5}, 1) != key
+    assert result_key({'RAC': True}, 1) != key
+    assert result_key({'pigs_per_region': (5, 5, 5, 5, 6)}, 1) != key
+
+
+def test_cached_run_hits_for_an_equal_scenario(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    scenario = {'days': 10, 'pigs_per_region': (2, 2, 2, 2, 2), 'init_weight': 20}
+    result, cached = cached_run(scenario, 5, cache)
+    assert not cached
+    again, cached = cached_run(dict(scenario, init_weight=20.0, pigs_per_region=[2.0] * 5), 5, cache)
+    assert cached
+    assert json.dumps(again) == json.dumps(result)
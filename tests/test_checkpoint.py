@@ -0,0 +1,86 @@
+import numpy as np
+import pytest
+
+from checkpoint import load_checkpoint, run_checkpointed, save_checkpoint
+from eventlog import silenced
+from recorder import HerdRecorder
+from sharded import DAY_PARAMETERS
+from simulation import DEFAULT_SCENARIO, create_simulation
+
+ENGINES = ('object', 'vectorized', 'deterministic', 'event')
+VARIABLES = ('weight', 'Prd_1', 'RAC_day', 'SID_lys', 'Zinc', 'final_weight')
+
+
+def new_simulation(params):
+    simulation = create_simulation(params, 7)
+    simulation.add_recorder(HerdRecorder(('weight', 'SID_lys'), days=params['days']))
+    simulation.setup(*params['pigs_per_region'])
+    return simulation
+
+
+def run_days(simulation, params, days):
+    for _ in range(days):
+        if not simulation.go(*(params[name] for name in DAY_PARAMETERS)):
+            break
+
+
+def state(simulation):
+    ids, breeds, regions, columns = simulation.herd_columns(VARIABLES)
+    recorder = simulation.recorders[0]
+    return {
+        'summary': simulation.summary(),
+        'series': (simulation.days_data, simulation.total_feed_intake_data, simulation.pig_count_data,
+                   simulation.sold_count_data),
+        'tracked': simulation.tracked_pig_data,
+        'rng': simulation.rng.get_state(),
+        'arrays': [np.array(values) for values in (ids, breeds, regions)] +
+                  [np.array(columns[name]) for name in VARIABLES] + [recorder.series('weight')[1]],
+    }
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+@pytest.mark.parametrize('split', (0, 45))
+@pytest.mark.parametrize('scenario', ({'stochastic_weight_gain': True}, {'RAC': True, 'selling_rate': 60}))
+def test_resume_is_bit_exact(tmp_path, engine, split, scenario):
+    params = dict(DEFAULT_SCENARIO, **scenario, engine=engine, pigs_per_region=(5, 5, 5, 5, 5), days=140)
+    with silenced():
+        expected = new_simulation(params)
+        run_days(expected, params, params['days'])
+
+        interrupted = new_simulation(params)
+        run_days(interrupted, params, split)
+        save_checkpoint(interrupted, tmp_path / 'run.ckpt')
+        resumed = load_checkpoint(tmp_path / 'run.ckpt')
+        run_days(resumed, params, params['days'] - split)
+
+    expected, resumed = state(expected), state(resumed)
+    assert repr(resumed['summary']) == repr(expected['summary'])
+    assert resumed['series'] == expected['series']
+    assert resumed['tracked'] == expected['tracked']
+    assert resumed['rng'] == expected['rng']
+    for actual, wanted in zip(resumed['arrays'], expected['arrays']):
+        np.testing.assert_array_equal(actual, wanted)
+
+
+@pytest.mark.parametrize('engine', ENGINES)
+# go() stops the second scenario on day 140, before its last day
+@pytest.mark.parametrize('scenario', ({'days': 57}, {'days': 150}))
+def test_run_checkpointed_saves_the_last_day(tmp_path, engine, scenario):
+    params = dict(DEFAULT_SCENARIO, **scenario, engine=engine, pigs_per_region=(3, 3, 3, 3, 3))
+    path = tmp_path / 'run.ckpt'
+    with silenced():
+        finished = run_checkpointed(params, new_simulation(params), path, every=15, setup=False)
+        resumed = load_checkpoint(path)
+    assert finished.days % 15
+    assert resumed.days == finished.days
+    assert repr(resumed.summary()) == repr(finished.summary())
+
+    if finished.days < params['days']:
+        return
+
+    # A rerun of the finished job resumes on its last day and runs nothing
+    mtime = path.stat().st_mtime_ns
+    with silenced():
+        rerun = run_checkpointed(params, resumed, path, every=15, setup=False)
+    assert rerun.days == finished.days
+    assert path.stat().st_mtime_ns == mtime
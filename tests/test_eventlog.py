@@ -0,0 +1,37 @@
+import io
+import logging
+import threading
+
+from eventlog import LOGGER_NAME, configure_logging, get_logger, log_event, silenced
+
+logger = get_logger('tests')
+
+
+def test_silenced_only_drops_the_events_of_its_thread():
+    stream = io.StringIO()
+    handler = configure_logging('debug', stream=stream)
+    entered, logged = threading.Event(), threading.Event()
+
+    def worker():
+        with silenced():
+            entered.set()
+            log_event(logger, logging.INFO, 'worker', "worker event")
+            logged.wait()
+        log_event(logger, logging.INFO, 'worker', "worker event after")
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    entered.wait()
+    log_event(logger, logging.INFO, 'main', "main event")
+    logged.set()
+    thread.join()
+    with silenced(), silenced(logging.ERROR):
+        log_event(logger, logging.WARNING, 'main', "nested warning")
+    with silenced():
+        log_event(logger, logging.WARNING, 'main', "warning")
+    handler.flush()
+    handler.close()
+    logging.getLogger(LOGGER_NAME).removeHandler(handler)
+    logging.getLogger(LOGGER_NAME).setLevel(logging.NOTSET)
+
+    assert stream.getvalue().splitlines() == ["main event", "worker event after", "warning"]
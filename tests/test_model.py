@@ -0,0 +1,20 @@
+import pandas as pd
+
+from model import BatchPigModel, PigModel
+
+
+def run(model_class, steps=40):
+    model = model_class(6, 5, 4, sell_weight=24, seed=3)
+    for _ in range(steps):
+        model.step()
+    return model
+
+
+def test_batch_model_matches_pig_model():
+    expected = run(PigModel)
+    model = run(BatchPigModel)
+    assert model.num_sold == expected.num_sold > 0
+    pd.testing.assert_frame_equal(model.datacollector.get_model_vars_dataframe(),
+                                  expected.datacollector.get_model_vars_dataframe())
+    pd.testing.assert_frame_equal(model.datacollector.get_agent_vars_dataframe().sort_index(),
+                                  expected.datacollector.get_agent_vars_dataframe().sort_index())